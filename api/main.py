@@ -9,9 +9,11 @@ WeChat Official Account (微信公众号):
 import os
 import sys
 import json
+import asyncio
 from typing import List, Optional, Dict, Any
 from fastapi import FastAPI, HTTPException, Query, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # Add project root to path
@@ -29,6 +31,9 @@ class SearchRequest(BaseModel):
 class DownloadRequest(BaseModel):
     song_infos: List[Dict[str, Any]]
 
+class ResolveRequest(BaseModel):
+    song_infos: List[Dict[str, Any]]
+
 class PlaylistRequest(BaseModel):
     playlist_url: str
     music_sources: Optional[List[str]] = None
@@ -65,10 +70,22 @@ def get_music_client(music_sources: Optional[List[str]] = None, init_music_clien
     if music_client is None or (music_sources and music_client.music_sources != music_sources):
         music_client = musicdl.MusicClient(
             music_sources=music_sources or ['MiguMusicClient', 'NeteaseMusicClient', 'QQMusicClient', 'KuwoMusicClient', 'QianqianMusicClient'],
-            init_music_clients_cfg=init_music_clients_cfg or {}
+            init_music_clients_cfg=init_music_clients_cfg or {}, progress_cfg={'mode': 'null'},
         )
     return music_client
 
+def serialize_song_info(item: SongInfo) -> Dict[str, Any]:
+    # Convert to serializable format
+    song_info = {}
+    for key, value in item.__dict__.items():
+        if isinstance(value, (str, int, float, bool, type(None))):
+            song_info[key] = value
+        elif isinstance(value, dict):
+            song_info[key] = value
+        elif isinstance(value, list):
+            song_info[key] = value
+    return song_info
+
 '''routes'''
 @app.get("/api/music-sources")
 async def get_music_sources():
@@ -84,24 +101,13 @@ async def search_music(request: SearchRequest):
     
     try:
         client = get_music_client(music_sources=request.music_sources)
-        # 设置搜索超时
-        import asyncio
-        results = await asyncio.to_thread(client.search, keyword=request.keyword)
+        results = await client.asearch(keyword=request.keyword)
         
         # Flatten results
         flat_results = []
         for source, items in results.items():
             for i, item in enumerate(items):
-                # Convert to serializable format
-                song_info = {}
-                for key, value in item.__dict__.items():
-                    if isinstance(value, (str, int, float, bool, type(None))):
-                        song_info[key] = value
-                    elif isinstance(value, dict):
-                        song_info[key] = value
-                    elif isinstance(value, list):
-                        song_info[key] = value
-                flat_results.append({"source": source, "index": i, "song_info": song_info})
+                flat_results.append({"source": source, "index": i, "song_info": serialize_song_info(item)})
         
         elapsed_time = time.time() - start_time
         print(f"[SEARCH] Completed in {elapsed_time:.2f}s, found {len(flat_results)} results")
@@ -111,6 +117,29 @@ async def search_music(request: SearchRequest):
         print(f"[SEARCH] Failed in {elapsed_time:.2f}s: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/search/stream")
+async def search_music_stream(request: SearchRequest):
+    """Search music, streaming results as NDJSON lines as soon as each search page of each source completes"""
+    client = get_music_client(music_sources=request.music_sources)
+    async def iter_lines():
+        indices = {}
+        async for source, items in client.aitersearch(keyword=request.keyword):
+            for item in items:
+                indices[source] = indices.get(source, -1) + 1
+                yield json.dumps({"source": source, "index": indices[source], "song_info": serialize_song_info(item)}, ensure_ascii=False) + "\n"
+    return StreamingResponse(iter_lines(), media_type="application/x-ndjson")
+
+@app.post("/api/resolve")
+async def resolve_music(request: ResolveRequest):
+    """Resolve download urls of rows returned by a lazy search, /api/download resolves them on its own as well"""
+    try:
+        music_sources = list(dict.fromkeys(song_info['source'] for song_info in request.song_infos if 'source' in song_info))
+        client = get_music_client(music_sources=music_sources or None)
+        song_infos = await asyncio.to_thread(client.resolve, [SongInfo.fromdict(song_info_dict) for song_info_dict in request.song_infos])
+        return {"results": [serialize_song_info(item) for item in song_infos]}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/download")
 async def download_music(request: DownloadRequest):
     """Download music"""
@@ -151,9 +180,8 @@ async def download_music(request: DownloadRequest):
             print(f"[DOWNLOAD] Song {i}: {song_info.song_name} from {song_info.source}")
         
         # Download music (异步处理)
-        import asyncio
         print("[DOWNLOAD] Starting download...")
-        await asyncio.to_thread(client.download, song_infos=song_info_objects)
+        await client.adownload(song_infos=song_info_objects)
         print("[DOWNLOAD] Download completed successfully")
         
         elapsed_time = time.time() - start_time
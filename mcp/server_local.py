@@ -23,7 +23,7 @@ def getclient(music_sources=None, init_music_clients_cfg=None, clients_threading
     if _client is None:
         _client = musicdl_pkg.MusicClient(
             music_sources=music_sources or ['NeteaseMusicClient'], init_music_clients_cfg=init_music_clients_cfg or {}, clients_threadings=clients_threadings or {},
-            requests_overrides=requests_overrides or {}, search_rules=search_rules or {},
+            requests_overrides=requests_overrides or {}, search_rules=search_rules or {}, progress_cfg={'mode': 'null'},
         )
     return _client
 
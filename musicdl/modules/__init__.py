@@ -1,8 +1,8 @@
 '''initialize'''
-from .sources import MusicClientBuilder, BaseMusicClient, BuildMusicClient
+from .sources import MusicClientBuilder, BaseMusicClient, AsyncBaseMusicClient, BuildMusicClient
 from .utils import (
-    BaseModuleBuilder, LoggerHandle, AudioLinkTester, WhisperLRC, QuarkParser, SongInfo, SongInfoUtils, RandomIPGenerator, SodaTimedLyricsParser, LanZouYParser,
-    HLSDownloader, cachecookies, resp2json, isvalidresp, safeextractfromdict, replacefile, printfullline, smarttrunctable, usesearchheaderscookies, byte2mb, seconds2hms,
+    BaseModuleBuilder, LoggerHandle, AudioLinkTester, WhisperLRC, QuarkParser, SongInfo, SearchResults, SearchDeadline, SongInfoUtils, RandomIPGenerator, SodaTimedLyricsParser, LanZouYParser,
+    HLSDownloader, HLSEngine, SessionPool, LinkStatusCache, QualityLadderResolver, MirrorScoreboard, MirrorRacer, HostPolicyRegistry, HostPolicy, TokenBucket, CircuitBreaker, CircuitOpenError, SingleFlight, TaskScheduler, ScheduledExecutor, SegmentedRangeDownloader, RangeNotSupportedError, ResumeJournal, ResourceChangedError, DownloadLibrary, SpooledContents, ProgressSink, ThrottledProgress, NullProgress, EventProgress, ProgressTask, buildprogress, PostProcessPool, StartupProbeCache, shareduseragent, cachecookies, resp2json, isvalidresp, safeextractfromdict, replacefile, printfullline, smarttrunctable, usesearchheaderscookies, userequestcontext, RequestContext, byte2mb, seconds2hms,
     usedownloadheaderscookies, useparseheaderscookies, cookies2dict, cookies2string, touchdir, estimatedurationwithfilesizebr, estimatedurationwithfilelink,
     extractdurationsecondsfromlrc, searchdictbykey, colorize, optionalimportfrom, legalizestring, kuwolyricslisttolrc, shortenpathsinsonginfos, cursorpickintable, 
     printtable, optionalimport, obtainhostname, hostmatchessuffix, cleanlrc
@@ -88,14 +88,13 @@ class LizhiMusicClient(BaseMusicClient):
                 singers=legalizestring(safeextractfromdict(download_result, ['data', 'userVoice', 'userInfo', 'name'], '')), album=legalizestring(safeextractfromdict(download_result, ['data', 'userVoice', 'userInfo', 'name'], '')), 
                 ext=download_url.split('?')[0].split('.')[-1], file_size_bytes=None, file_size='NULL', identifier=song_id, duration_s=safeextractfromdict(download_result, ['data', 'userVoice', 'voiceInfo', 'duration'], ''), 
                 duration=seconds2hms(safeextractfromdict(download_result, ['data', 'userVoice', 'voiceInfo', 'duration'], '')), lyric=None, cover_url=safeextractfromdict(download_result, ['data', 'userVoice', 'voiceInfo', 'imageUrl'], None), 
-                download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
             if not song_info.with_valid_download_url: song_info.update(dict(
-                download_url=download_url.replace('//cdn101.lizhi.fm/audio/', '//cdn5.lizhi.fm/audio/'), download_url_status=self.audio_link_tester.test(download_url.replace('//cdn101.lizhi.fm/audio/', '//cdn5.lizhi.fm/audio/'), request_overrides)
+                download_url=download_url.replace('//cdn101.lizhi.fm/audio/', '//cdn5.lizhi.fm/audio/'), download_url_status=self.audio_link_tester.inspect(download_url.replace('//cdn101.lizhi.fm/audio/', '//cdn5.lizhi.fm/audio/'), request_overrides)
             ))
             if song_info.with_valid_download_url: break
         if not song_info.with_valid_download_url: return song_info
-        song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
         song_info.file_size = song_info.download_url_status['probe_status']['file_size']
         # return
         return song_info
@@ -118,14 +117,13 @@ class LizhiMusicClient(BaseMusicClient):
                     singers=legalizestring(safeextractfromdict(search_result, ['userInfo', 'name'], '')), album=legalizestring(safeextractfromdict(search_result, ['userInfo', 'name'], '')), 
                     ext=download_url.split('?')[0].split('.')[-1], file_size_bytes=None, file_size='NULL', identifier=song_id, duration_s=safeextractfromdict(search_result, ['voiceInfo', 'duration'], ''), 
                     duration=seconds2hms(safeextractfromdict(search_result, ['voiceInfo', 'duration'], '')), lyric=None, cover_url=safeextractfromdict(search_result, ['voiceInfo', 'imageUrl'], None), 
-                    download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                    download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
                 )
                 if not song_info.with_valid_download_url: song_info.update(dict(
-                    download_url=download_url.replace('//cdn101.lizhi.fm/audio/', '//cdn5.lizhi.fm/audio/'), download_url_status=self.audio_link_tester.test(download_url.replace('//cdn101.lizhi.fm/audio/', '//cdn5.lizhi.fm/audio/'), request_overrides)
+                    download_url=download_url.replace('//cdn101.lizhi.fm/audio/', '//cdn5.lizhi.fm/audio/'), download_url_status=self.audio_link_tester.inspect(download_url.replace('//cdn101.lizhi.fm/audio/', '//cdn5.lizhi.fm/audio/'), request_overrides)
                 ))
                 if song_info.with_valid_download_url: break
             if not song_info.with_valid_download_url: continue
-            song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
             song_infos.append(song_info)
             if self.strict_limit_search_size_per_page and len(song_infos) >= self.search_size_per_page: break
@@ -178,14 +176,13 @@ class LizhiMusicClient(BaseMusicClient):
                             singers=legalizestring(safeextractfromdict(track, ['userInfo', 'name'], '')), album=legalizestring(safeextractfromdict(track, ['userInfo', 'name'], '')), 
                             ext=download_url.split('?')[0].split('.')[-1], file_size='NULL', identifier=eps_id, duration_s=safeextractfromdict(track, ['voiceInfo', 'duration'], ''), 
                             duration=seconds2hms(safeextractfromdict(track, ['voiceInfo', 'duration'], '')), lyric=None, cover_url=safeextractfromdict(track, ['voiceInfo', 'imageUrl'], None), 
-                            download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                            download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
                         )
                         if not eps_info.with_valid_download_url: eps_info.update(dict(
-                            download_url=download_url.replace('//cdn101.lizhi.fm/audio/', '//cdn5.lizhi.fm/audio/'), download_url_status=self.audio_link_tester.test(download_url.replace('//cdn101.lizhi.fm/audio/', '//cdn5.lizhi.fm/audio/'), request_overrides)
+                            download_url=download_url.replace('//cdn101.lizhi.fm/audio/', '//cdn5.lizhi.fm/audio/'), download_url_status=self.audio_link_tester.inspect(download_url.replace('//cdn101.lizhi.fm/audio/', '//cdn5.lizhi.fm/audio/'), request_overrides)
                         ))
                         if eps_info.with_valid_download_url: break
                     if not eps_info.with_valid_download_url: continue
-                    eps_info.download_url_status['probe_status'] = self.audio_link_tester.probe(eps_info.download_url, request_overrides)
                     eps_info.file_size = eps_info.download_url_status['probe_status']['file_size']
                     song_info.episodes.append(eps_info)
             if not song_info.with_valid_download_url: continue
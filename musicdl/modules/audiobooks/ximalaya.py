@@ -86,9 +86,8 @@ class XimalayaMusicClient(BaseMusicClient):
             raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(search_result.get('title')), singers=legalizestring(search_result.get('nickname')),
             album=legalizestring(search_result.get('album_title') or search_result.get('albumTitle')), ext=download_url.split('?')[0].split('.')[-1], file_size_bytes=file_size_bytes, file_size=file_size, identifier=song_id,
             duration_s=int(float(search_result.get('duration', 0) or 0)), duration=seconds2hms(search_result.get('duration', 0) or 0), lyric=None, cover_url=safeextractfromdict(search_result, ['cover_path'], None),
-            download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+            download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
         )
-        song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
         song_info.file_size = song_info.download_url_status['probe_status']['file_size']
         song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL',)) else song_info.ext
         return song_info
@@ -103,23 +102,22 @@ class XimalayaMusicClient(BaseMusicClient):
         download_result = resp2json(resp=resp)
         track_info = safeextractfromdict(download_result, ['trackInfo'], {})
         if not track_info or not isinstance(track_info, dict): return song_info
-        for encrypted_url in sorted(safeextractfromdict(track_info, ['playUrlList'], []), key=lambda x: int(x['fileSize']), reverse=True):
-            if not isinstance(encrypted_url, dict): continue
+        def _resolvequality(encrypted_url: dict):
+            if not isinstance(encrypted_url, dict): return None
             download_url: str = self._crackplayurl(encrypted_url.get('url', ''))
-            if not download_url or not str(download_url).startswith('http'): continue
+            if not download_url or not str(download_url).startswith('http'): return None
             song_info = SongInfo(
                 raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(search_result.get('title')), singers=legalizestring(search_result.get('nickname')),
                 album=legalizestring(search_result.get('album_title') or search_result.get('albumTitle')), ext=download_url.split('?')[0].split('.')[-1] or 'mp3', file_size_bytes=float(encrypted_url.get('fileSize', 0) or 0), 
                 file_size=byte2mb(encrypted_url.get('fileSize', 0)), identifier=song_id, duration_s=int(float(search_result.get('duration', 0) or 0)), duration=seconds2hms(search_result.get('duration', 0) or 0), lyric=None, 
-                cover_url=safeextractfromdict(search_result, ['cover_path'], None), download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                cover_url=safeextractfromdict(search_result, ['cover_path'], None), download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
-            if not song_info.with_valid_download_url: continue
-            song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
+            if not song_info.with_valid_download_url: return None
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
             song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL',)) else song_info.ext
-            if song_info.with_valid_download_url: break
+            return song_info
         # return
-        return song_info
+        return self._resolvequalityladder(sorted(safeextractfromdict(track_info, ['playUrlList'], []), key=lambda x: int(x['fileSize']), reverse=True), _resolvequality, default=song_info, stop_on_error=False)
     '''_parsebytrack'''
     def _parsebytrack(self, search_results, song_infos: list = [], request_overrides: dict = None, progress: Progress = None):
         request_overrides = request_overrides or {}
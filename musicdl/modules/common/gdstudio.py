@@ -51,7 +51,8 @@ class GDStudioMusicClient(BaseMusicClient):
     def _yieldcrc32(self, id_value: str, hostname: str = 'music.gdstudio.xyz', version: str = "2025.11.4"):
         # timestamp
         try:
-            resp = self.get('https://www.ximalaya.com/revision/time')
+            # every page and every song asks for the same coarse timestamp (only its first 9 digits are used), one request per second is plenty
+            resp = self.get('https://www.ximalaya.com/revision/time', single_flight=True, memo_ttl=1.0)
             resp.raise_for_status()
             ts_ms = resp.text.strip()
         except:
@@ -133,7 +134,7 @@ class GDStudioMusicClient(BaseMusicClient):
                     download_url = download_result['url']
                     if not download_url.startswith('http'): download_url = f'https://music.gdstudio.xyz/' + download_url
                     if search_result['source'] in {'bilibili'}: download_url = f'https://music-proxy.gdstudio.org/{download_url}'
-                    download_url_status = self.audio_link_tester.test(download_url, request_overrides); download_url = download_url_status['final_url']
+                    download_url_status = self.audio_link_tester.inspect(download_url, request_overrides); download_url = download_url_status['final_url']
                     song_info = SongInfo(
                         raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['name'], None)),
                         singers=legalizestring(', '.join(safeextractfromdict(search_result, ['artist'], []) or [])), album=legalizestring(safeextractfromdict(search_result, ['album'], None)),
@@ -145,7 +146,6 @@ class GDStudioMusicClient(BaseMusicClient):
                     if search_result['source'] in {'bilibili'}: song_info.download_url_status['ok'] = True if song_info.download_url_status['clen'] > 0 else False # use proxy url, general test method will fail
                     if song_info.with_valid_download_url: break
                 if not song_info.with_valid_download_url: continue
-                song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
                 song_info.file_size = song_info.download_url_status['probe_status']['file_size']
                 if song_info.ext == 'm4s': song_info.ext = 'm4a'
                 # --lyric results
@@ -77,10 +77,9 @@ class JBSouMusicClient(BaseMusicClient):
                     raw_data={'search': search_result, 'download': {}, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['name'], None)),
                     singers=legalizestring(str(safeextractfromdict(search_result, ['artist'], "")).replace('/', ', ')), album=legalizestring(search_result.get('album')),
                     ext=download_url.split('?')[0].split('.')[-1], file_size='NULL', identifier=search_result['songid'], duration='-:-:-', lyric=None, cover_url=cover_url, 
-                    download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides), root_source=search_result['source'],
+                    download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides), root_source=search_result['source'],
                 )
                 if not song_info.with_valid_download_url: continue
-                song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
                 song_info.file_size = song_info.download_url_status['probe_status']['file_size']
                 song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL', )) else song_info.ext
                 # --lyric results
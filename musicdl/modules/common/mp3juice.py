@@ -125,12 +125,12 @@ class MP3JuiceMusicClient(BaseMusicClient):
                 song_info = SongInfo(
                     raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['title'], None)),
                     singers='NULL', album='NULL', ext='mp3', file_size='NULL', identifier=search_result['id'], duration='-:-:-', lyric='NULL', cover_url=None, download_url=download_url, 
-                    download_url_status=self.audio_link_tester.test(download_url, request_overrides), root_source=search_result['root_source'],
+                    download_url_status=self.audio_link_tester.inspect(download_url, request_overrides), root_source=search_result['root_source'],
                 )
                 if not song_info.with_valid_download_url: continue
                 # ----you have to download the music contents immediately, otherwise the links will fail.
-                song_info.downloaded_contents = self.get(download_url, **request_overrides).content
-                song_info.file_size_bytes = song_info.downloaded_contents.__sizeof__()
+                song_info.downloaded_contents = self._fetchcontents(download_url, request_overrides)
+                song_info.file_size_bytes = len(song_info.downloaded_contents)
                 song_info.file_size = byte2mb(song_info.file_size_bytes)
                 # --append to song_infos
                 song_infos.append(song_info)
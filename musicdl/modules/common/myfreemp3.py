@@ -66,10 +66,9 @@ class MyFreeMP3MusicClient(BaseMusicClient):
             raw_data={'search': search_result, 'download': {}, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['title'], None)),
             singers=legalizestring(safeextractfromdict(search_result, ['author'], None)), album='NULL', ext=download_url.split('?')[0].split('.')[-1], file_size='NULL', 
             identifier=search_result['id'], duration_s=duration_s, duration=seconds2hms(duration_s), lyric=lyric, cover_url=search_result.get('pic'), download_url=download_url, 
-            download_url_status=self.audio_link_tester.test(download_url, request_overrides), root_source='netease',
+            download_url_status=self.audio_link_tester.inspect(download_url, request_overrides), root_source='netease',
         )
         if not song_info.with_valid_download_url: return SongInfo(source=self.source)
-        song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
         song_info.file_size = song_info.download_url_status['probe_status']['file_size']
         song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL', )) else song_info.ext
         return song_info
@@ -88,10 +87,9 @@ class MyFreeMP3MusicClient(BaseMusicClient):
         song_info = SongInfo(
             raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(song_name), singers=legalizestring(singers), album='NULL', ext='mp3', 
             file_size='NULL', identifier=search_result['id'], duration_s=duration_s, duration=seconds2hms(duration_s), lyric=lyric, cover_url=search_result.get('pic'), download_url=download_url, 
-            download_url_status=self.quark_audio_link_tester.test(download_url, request_overrides), root_source='quark', default_download_headers=self.quark_default_download_headers,
+            download_url_status=self.quark_audio_link_tester.inspect(download_url, request_overrides), root_source='quark', default_download_headers=self.quark_default_download_headers,
         )
         if not song_info.with_valid_download_url: return SongInfo(source=self.source)
-        song_info.download_url_status['probe_status'] = self.quark_audio_link_tester.probe(song_info.download_url, request_overrides)
         song_info.file_size = song_info.download_url_status['probe_status']['file_size']
         song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL', )) else song_info.ext
         return song_info
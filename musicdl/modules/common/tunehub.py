@@ -106,10 +106,9 @@ class TuneHubMusicClient(BaseMusicClient):
                             raw_data={'search': search_result, 'download': {}, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['name'], None)),
                             singers=legalizestring(safeextractfromdict(search_result, ['artist'], None)), album=legalizestring(safeextractfromdict(search_result, ['album'], None)),
                             ext=download_url.split('?')[0].split('.')[-1], file_size='NULL', identifier=search_result['id'], duration='-:-:-', lyric=None, cover_url=cover_url, 
-                            download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides), root_source=search_result['source'],
+                            download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides), root_source=search_result['source'],
                         )
                         if song_info.root_source in ['tencent']: song_info.root_source = 'qq'
-                        song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
                         song_info.file_size = song_info.download_url_status['probe_status']['file_size']
                         song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL', )) else song_info.ext
                         if song_info.with_valid_download_url: break
@@ -124,10 +123,9 @@ class TuneHubMusicClient(BaseMusicClient):
                             raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['name'], None)), singers=legalizestring(safeextractfromdict(search_result, ['artist'], None)), 
                             album=legalizestring(safeextractfromdict(search_result, ['album'], None)), ext=download_url.split('?')[0].split('.')[-1], file_size='NULL', identifier=search_result['id'], duration_s=safeextractfromdict(download_result, ['data', 'data', 0, 'info', 'duration'], 0),
                             duration=seconds2hms(safeextractfromdict(download_result, ['data', 'data', 0, 'info', 'duration'], 0)), lyric=cleanlrc(safeextractfromdict(download_result, ['data', 'data', 0, 'lyrics'], 0)), cover_url=safeextractfromdict(download_result, ['data', 'data', 0, 'cover'], 0),
-                            download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides), root_source=search_result['source'],
+                            download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides), root_source=search_result['source'],
                         )
                         if str(song_info.lyric).startswith('http'): search_result['lrc'] = song_info.lyric
-                        song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
                         song_info.file_size = song_info.download_url_status['probe_status']['file_size']
                         song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL', )) else song_info.ext
                         if song_info.with_valid_download_url: break
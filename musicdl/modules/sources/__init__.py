@@ -3,6 +3,7 @@ from .qq import QQMusicClient
 from .mitu import MituMusicClient
 from .joox import JooxMusicClient
 from .base import BaseMusicClient
+from .asyncbase import AsyncBaseMusicClient
 from .kuwo import KuwoMusicClient
 from .migu import MiguMusicClient
 from .kkws import KKWSMusicClient
@@ -14,7 +14,7 @@ from .base import BaseMusicClient
 from urllib.parse import urlencode
 from rich.progress import Progress
 from ..utils.appleutils import AppleMusicClientDownloadSongUtils, AppleMusicClientAPIUtils, AppleMusicClientItunesApiUtils, DownloadItem, SongCodec, RemuxMode
-from ..utils import touchdir, legalizestring, resp2json, seconds2hms, usesearchheaderscookies, safeextractfromdict, usedownloadheaderscookies, cleanlrc, SongInfo, SongInfoUtils
+from ..utils import touchdir, legalizestring, resp2json, seconds2hms, usesearchheaderscookies, safeextractfromdict, usedownloadheaderscookies, cleanlrc, SongInfo
 
 
 '''AppleMusicClient'''
@@ -52,7 +52,7 @@ class AppleMusicClient(BaseMusicClient):
             progress.update(song_progress_id, total=os.path.getsize(song_info.save_path), kind='download')
             progress.advance(song_progress_id, os.path.getsize(song_info.save_path))
             progress.update(song_progress_id, description=f"{self.source}.download >>> {song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]} (Success)")
-            downloaded_song_infos.append(SongInfoUtils.fillsongtechinfo(copy.deepcopy(song_info), logger_handle=self.logger_handle, disable_print=self.disable_print))
+            downloaded_song_infos.append(self._finishdownload(song_info))
             shutil.rmtree(tmp_dir, ignore_errors=True)
         except Exception as err:
             progress.update(song_progress_id, description=f"{self.source}.download >>> {song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]} (Error: {err})")
@@ -109,11 +109,10 @@ class AppleMusicClient(BaseMusicClient):
             singers=legalizestring(safeextractfromdict(search_result, ['attributes', 'artistName'], None)), album=legalizestring(safeextractfromdict(search_result, ['attributes', 'albumName'], None)),
             ext=download_url.split('?')[0].split('.')[-1], file_size='NULL', identifier=search_result['id'], duration_s=float(safeextractfromdict(search_result, ['attributes', 'durationInMillis'], 0)) / 1000,
             duration=seconds2hms(float(safeextractfromdict(search_result, ['attributes', 'durationInMillis'], 0)) / 1000), lyric=None, cover_url=safeextractfromdict(search_result, ['attributes', 'artwork', 'url'], ""),
-            download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+            download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
         )
         if not song_info.with_valid_download_url: return song_info
         if song_info.cover_url and song_info.cover_url.startswith('http'): song_info.cover_url = song_info.cover_url.format(w=600, h=600, f='jpg')
-        song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
         song_info.file_size = song_info.download_url_status['probe_status']['file_size']
         song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL',)) else song_info.ext
         # return
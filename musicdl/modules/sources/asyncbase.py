@@ -0,0 +1,142 @@
+'''
+Function:
+    Implementation of AsyncBaseMusicClient
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import asyncio
+import random
+from threading import Lock
+from itertools import chain
+from rich.progress import Progress
+from contextvars import ContextVar
+from .base import BaseMusicClient
+from ..utils import CircuitOpenError, SearchDeadline, SongInfo, optionalimport, shareduseragent
+
+
+'''phase of the running coroutine, the asyncio counterpart of BaseMusicClient.requestcontext which is thread-local'''
+ASYNC_REQUEST_PHASE: ContextVar[str] = ContextVar('musicdl_async_request_phase', default='search')
+'''deadline of the running search, the asyncio counterpart of BaseMusicClient.usedeadline which is thread-local'''
+ASYNC_SEARCH_DEADLINE: ContextVar[SearchDeadline | None] = ContextVar('musicdl_async_search_deadline', default=None)
+
+
+'''AsyncBaseMusicClient'''
+class AsyncBaseMusicClient(BaseMusicClient):
+    source = 'AsyncBaseMusicClient'
+    def __init__(self, **kwargs):
+        super(AsyncBaseMusicClient, self).__init__(**kwargs)
+        # one curl_cffi AsyncSession per event loop, an AsyncSession can not be shared across loops
+        self._async_sessions, self._async_sessions_lock = {}, Lock()
+        self.async_max_clients = self.session_pool.pool_size
+    '''_asyncsession'''
+    def _asyncsession(self):
+        curl_cffi, loop = optionalimport('curl_cffi'), asyncio.get_running_loop()
+        with self._async_sessions_lock:
+            for closed_loop in [l for l in self._async_sessions if l.is_closed()]: self._async_sessions.pop(closed_loop, None)
+            if (session := self._async_sessions.get(loop)) is None:
+                session = self._async_sessions[loop] = curl_cffi.requests.AsyncSession(max_clients=self.async_max_clients)
+        return session
+    '''_athread'''
+    async def _athread(self, func, *args, **kwargs):
+        # blocking helpers run off the event loop, inside the request context of the current phase and under the deadline of the running search
+        phase, deadline = ASYNC_REQUEST_PHASE.get(), ASYNC_SEARCH_DEADLINE.get()
+        def _run():
+            with self.requestcontext(phase), self.usedeadline(deadline): return func(*args, **kwargs)
+        return await asyncio.to_thread(_run)
+    '''_arequest'''
+    async def _arequest(self, method: str, url: str, **kwargs):
+        # without curl_cffi there is no asyncio http backend, fall back to the pooled blocking client off the event loop
+        if optionalimport('curl_cffi') is None: return await self._athread(self._request, method, url, **kwargs)
+        phase, deadline = ASYNC_REQUEST_PHASE.get(), ASYNC_SEARCH_DEADLINE.get()
+        headers = dict(getattr(self, f'default_{phase}_headers'))
+        if self.random_update_ua: headers.update({'User-Agent': shareduseragent().random})
+        headers.update(kwargs.pop('headers', None) or {})
+        if 'cookies' not in kwargs: kwargs['cookies'] = getattr(self, f'default_{phase}_cookies')
+        if 'impersonate' not in kwargs and getattr(self, f'enable_{phase}_curl_cffi'): kwargs['impersonate'] = random.choice(self.cc_impersonates)
+        resp, proxies_override, session = None, kwargs.pop('proxies', None), self._asyncsession()
+        for attempt in range(self.max_retries):
+            # a search out of budget stops issuing requests, the ones still allowed never wait beyond the deadline
+            if deadline is not None and deadline.expired: break
+            request_kwargs = kwargs if deadline is None else {**kwargs, 'timeout': deadline.clamptimeout(kwargs.get('timeout'))}
+            try:
+                if (delay := self.host_policy.admit(url, max_wait=deadline.remaining() if deadline is not None else None)) is None: break
+                if delay > 0: await asyncio.sleep(delay)
+            except CircuitOpenError as err:
+                self.logger_handle.error(f'{self.source}.a{method.lower()} >>> {url} (Error: {err})', disable_print=self.disable_print); break
+            try:
+                self._autosetproxies()
+                proxies = proxies_override or self.session.proxies
+                (resp := await session.request(method, url, headers=headers, proxies=proxies, **request_kwargs)).raise_for_status()
+            except Exception as err:
+                self.logger_handle.error(f'{self.source}.a{method.lower()} >>> {url} (Error: {err}; status={getattr(locals().get("resp"), "status_code", None)})', disable_print=self.disable_print)
+                # an answer such as 403 / 404 from a healthy host is final, only transient failures are retried
+                if not self.host_policy.recordoutcome(url, err): break
+                if attempt + 1 < self.max_retries: await asyncio.sleep(min(self.host_policy.backoffdelay(url, attempt, err), deadline.remaining() if deadline is not None else float('inf')))
+                continue
+            self.host_policy.recordoutcome(url)
+            return resp
+        return resp
+    '''aget'''
+    async def aget(self, url, **kwargs):
+        return await self._arequest('GET', url, **kwargs)
+    '''apost'''
+    async def apost(self, url, **kwargs):
+        return await self._arequest('POST', url, **kwargs)
+    '''_alistorresolve'''
+    async def _alistorresolve(self, candidates: list[tuple[dict, dict]], request_overrides: dict = None, song_infos: list = [], aresolve=None) -> list[SongInfo]:
+        # candidates are the (search_result, resolve kwargs) of one page in page order, the asyncio counterpart of looping over BaseMusicClient._listorresolve.
+        # lazy rows are listed without any request. eager rows are resolved concurrently in batches of the still missing size, with the native coroutine
+        # aresolve(search_result, request_overrides, **kwargs) if the source has one, otherwise with the blocking _listorresolve off the event loop
+        while candidates and not (self.strict_limit_search_size_per_page and len(song_infos) >= self.search_size_per_page):
+            num_missing = (self.search_size_per_page - len(song_infos)) if self.strict_limit_search_size_per_page else len(candidates)
+            batch, candidates = candidates[:num_missing], candidates[num_missing:]
+            if self.lazy_search: resolved = [self._listorresolve(search_result, request_overrides, **kwargs) for search_result, kwargs in batch]
+            elif aresolve is None: resolved = await asyncio.gather(*[self._athread(self._listorresolve, search_result, request_overrides, **kwargs) for search_result, kwargs in batch])
+            else: resolved = await asyncio.gather(*[aresolve(search_result, request_overrides, **kwargs) for search_result, kwargs in batch])
+            for (search_result, kwargs), song_info in zip(batch, resolved):
+                if song_info is None: continue
+                if aresolve is not None and not self.lazy_search: song_info.raw_data.setdefault('search', search_result); song_info.raw_data['resolve_kwargs'] = kwargs
+                song_infos.append(song_info)
+        return song_infos
+    '''_asearch'''
+    async def _asearch(self, keyword: str = '', search_url: str = '', request_overrides: dict = None, song_infos: list = [], progress: Progress = None, progress_id: int = 0):
+        # sources override this with a native implementation based on aget / apost and _alistorresolve
+        return await self._athread(self._search, keyword, search_url, request_overrides, song_infos, progress, progress_id)
+    '''asearch'''
+    async def asearch(self, keyword: str, num_threadings: int = 5, request_overrides: dict = None, rule: dict = None, main_process_context: Progress = None, main_progress_id: int = None, main_progress_lock: Lock = None, budget_ms: float = None, deadline: SearchDeadline = None):
+        # init, a deadline handed in (e.g., by MusicClient.asearch) is shared with the other sources, budget_ms only builds a private one
+        rule, request_overrides = rule or {}, request_overrides or {}
+        deadline = deadline if deadline is not None else SearchDeadline.frombudgetms(budget_ms)
+        phase_token, deadline_token = ASYNC_REQUEST_PHASE.set('search'), ASYNC_SEARCH_DEADLINE.set(deadline)
+        # logging
+        self.logger_handle.info(f'Start to search music files using {self.source}.', disable_print=self.disable_print)
+        session_stats_before = self.sessionstats()
+        # construct search urls
+        with self.requestcontext('search'), self.usedeadline(deadline): search_urls = self._constructsearchurls(keyword=keyword, rule=rule, request_overrides=request_overrides)
+        # bounded fan-out over search pages, num_threadings keeps its meaning as the max number of in-flight pages
+        main_process_context, main_progress_lock, progress_id, owns_progress = self._startsearchprogress(search_urls, main_process_context, main_progress_id, main_progress_lock)
+        song_infos, semaphore = [[] for _ in search_urls], asyncio.Semaphore(max(1, num_threadings))
+        async def _searchpage(search_url_idx: int, search_url):
+            async with semaphore: await self._asearch(keyword, search_url, request_overrides, song_infos[search_url_idx], main_process_context, progress_id)
+            self._advancesearchprogress(len(search_urls), main_process_context, main_progress_lock, progress_id, main_progress_id)
+        try:
+            tasks = [asyncio.ensure_future(_searchpage(search_url_idx, search_url)) for search_url_idx, search_url in enumerate(search_urls)]
+            done, pending = await asyncio.wait(tasks, timeout=(None if deadline is None else deadline.remaining())) if tasks else (set(), set())
+            # out of budget, pending pages are cancelled at their current await and keep what they resolved so far, blocking helpers still running stop at their next request
+            for task in pending: task.cancel()
+            if pending:
+                deadline.cancel(); await asyncio.gather(*pending, return_exceptions=True)
+                self.logger_handle.warning(f'{self.source}.asearch >>> {keyword} (Warning: search budget of {deadline.budget_s * 1000:.0f}ms exhausted, {len(done)}/{len(tasks)} pages completed, partial results are returned)', disable_print=self.disable_print)
+            for task in done: task.result()
+            song_infos = await asyncio.to_thread(self._finishsearch, keyword, list(chain.from_iterable(song_infos)), session_stats_before)
+        finally:
+            ASYNC_REQUEST_PHASE.reset(phase_token); ASYNC_SEARCH_DEADLINE.reset(deadline_token)
+            if owns_progress: main_process_context.__exit__(None, None, None)
+        # return
+        return song_infos
+    '''aclose'''
+    async def aclose(self):
+        with self._async_sessions_lock: session = self._async_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None: await session.close()
@@ -9,21 +9,25 @@ WeChat Official Account (微信公众号):
 import os
 import re
 import copy
+import time
 import random
 import pickle
+import hashlib
+import asyncio
 import requests
+import functools
 from pathlib import Path
-from threading import Lock
+from threading import Lock, local
+from contextlib import contextmanager
 from rich.text import Text
 from itertools import chain
 from datetime import datetime
 from rich.progress import Task
 from collections import defaultdict
-from fake_useragent import UserAgent
 from pathvalidate import sanitize_filepath
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, DownloadColumn, TransferSpeedColumn, TimeRemainingColumn, MofNCompleteColumn, ProgressColumn
-from ..utils import LoggerHandle, AudioLinkTester, SongInfo, SongInfoUtils, HLSDownloader, touchdir, usedownloadheaderscookies, usesearchheaderscookies, useparseheaderscookies, cookies2dict, cookies2string, shortenpathsinsonginfos, optionalimport
+from ..utils import LoggerHandle, AudioLinkTester, SongInfo, SearchDeadline, SongInfoUtils, HLSDownloader, HLSEngine, SessionPool, LinkStatusCache, QualityLadderResolver, MirrorScoreboard, MirrorRacer, HostPolicyRegistry, CircuitOpenError, SingleFlight, TaskScheduler, SegmentedRangeDownloader, ResumeJournal, ResourceChangedError, DownloadLibrary, SpooledContents, ProgressSink, PostProcessPool, StartupProbeCache, RequestContext, shareduseragent, touchdir, usedownloadheaderscookies, usesearchheaderscookies, useparseheaderscookies, cookies2dict, cookies2string, shortenpathsinsonginfos, optionalimport, replacefile, buildprogress
 
 
 '''AudioAwareColumn'''
@@ -52,9 +56,42 @@ class BaseMusicClient():
     def __init__(self, search_size_per_source: int = 5, auto_set_proxies: bool = False, random_update_ua: bool = False, enable_search_curl_cffi: bool = False, enable_parse_curl_cffi: bool = False,
                  enable_download_curl_cffi: bool = False, maintain_session: bool = False, logger_handle: LoggerHandle = None, disable_print: bool = False, work_dir: str = 'musicdl_outputs',
                  max_retries: int = 3, freeproxy_settings: dict = None, default_search_cookies: dict | str = None, default_download_cookies: dict | str = None, default_parse_cookies: dict | str = None,
-                 strict_limit_search_size_per_page: bool = True, search_size_per_page: int = 10, quark_parser_config: dict = None):
+                 strict_limit_search_size_per_page: bool = True, search_size_per_page: int = 10, quark_parser_config: dict = None, session_pool_size: int = 10,
+                 link_status_cache: LinkStatusCache | dict = None, quality_ladder_window: int = 3, mirror_race_cfg: dict = None, host_policy_cfg: dict = None, single_flight_cfg: dict = None,
+                 lazy_search: bool = False, scheduler: TaskScheduler = None, segmented_download_cfg: dict = None,
+                 download_library: DownloadLibrary | dict | bool = None, spool_cfg: dict = None, progress_cfg: dict = None,
+                 hls_cfg: dict = None, postprocess_cfg: dict = None, postprocess_pool: PostProcessPool = None):
         # set up work dir
         touchdir(work_dir)
+        # thread-local stack of phase request contexts, see BaseMusicClient.requestcontext
+        self._context_tls, self._context_generation = local(), 0
+        # validated download links, shared process-wide by default and per MusicClient when it injects its own instance
+        self.link_status_cache = LinkStatusCache(**link_status_cache) if isinstance(link_status_cache, dict) else (link_status_cache or LinkStatusCache.shared())
+        # per-host rate limits, circuit breakers and retry backoff shared by get / post and the hls downloader
+        self.host_policy = HostPolicyRegistry(host_policy_cfg)
+        # opt-in coalescing of identical concurrent get / post calls, see BaseMusicClient._request
+        self.single_flight_cfg = {'enable': False, 'memo_ttl': 0.0, 'max_memo_entries': 256, **(single_flight_cfg or {})}
+        self.single_flight = SingleFlight(memo_ttl=self.single_flight_cfg['memo_ttl'], max_memo_entries=self.single_flight_cfg['max_memo_entries'])
+        # two-phase search, rows only carry listing metadata until resolve (see BaseMusicClient._listorresolve / speculativeresolve)
+        self.lazy_search = lazy_search
+        self._speculative_pool, self._speculative_lock = None, Lock()
+        # bounded scheduler shared with the MusicClient and all other sources, None keeps private pools per call site (see BaseMusicClient._executor)
+        self.scheduler = scheduler
+        # http songs on range capable servers are fetched as num_segments parallel byte ranges, num_segments <= 1 keeps the single stream
+        self.segmented_download_cfg = {'num_segments': 4, 'min_segment_size': 4 * 1024 * 1024, **(segmented_download_cfg or {})}
+        # opt-in index of everything downloaded before, keyed by (source, identifier, quality) and by content hash, songs found there are linked instead of fetched again.
+        # True shares DownloadLibrary.shared() (library.json under the user data dir) with the other clients, a dict builds a private one, None / False disables it
+        self.download_library = DownloadLibrary(**download_library) if isinstance(download_library, dict) else (DownloadLibrary.shared() if download_library is True else (download_library or DownloadLibrary(enable=False)))
+        # audio bodies fetched at search time stay in memory up to max_memory_size bytes, larger ones spill to spool_dir (None for work_dir/.spool, next to the outputs so they can be renamed into place)
+        self.spool_cfg = {'max_memory_size': 1024 * 1024, 'spool_dir': None, **(spool_cfg or {})}
+        # download progress: 'rich' renders with coalesced updates, 'null' is headless, 'events' hands structured updates to a callback (see buildprogress)
+        self.progress_cfg = {'mode': 'rich', 'min_interval': 0.1, **(progress_cfg or {})}
+        # hls downloads: concurrency of the segment pool shared by all hls songs of the client (see HLSEngine), plus the streaming / byterange coalescing knobs of HLSDownloader
+        self.hls_cfg = {'concurrency': 16, 'streaming': True, 'reorder_window': 64, 'coalesce_max_bytes': 8 * 1024 * 1024, **(hls_cfg or {})}
+        # tech info, tags and library bookkeeping of finished files run on max_workers threads behind the downloads, at most max_queue_size files wait for them.
+        # a pool injected by the MusicClient is shared by all sources (postprocess_cfg is then ignored), otherwise the client builds its own
+        self.postprocess_cfg = {'max_workers': 4, 'max_queue_size': 64, **(postprocess_cfg or {})}
+        self.postprocess_pool = postprocess_pool or PostProcessPool(max_workers=self.postprocess_cfg['max_workers'], max_queue_size=self.postprocess_cfg['max_queue_size'], thread_name_prefix=f'{self.source}.postprocess')
         # set attributes
         self.search_size_per_source = search_size_per_source
         self.auto_set_proxies = auto_set_proxies
@@ -72,15 +109,18 @@ class BaseMusicClient():
         self.search_size_per_page = min(search_size_per_source, search_size_per_page)
         self.strict_limit_search_size_per_page = strict_limit_search_size_per_page
         self.quark_parser_config = quark_parser_config or {}
+        self.quality_ladder_window = quality_ladder_window
+        self.mirror_race_cfg = {'top_k': 2, 'hedge_delay': 1.5, 'persist_scores': True, **(mirror_race_cfg or {})}
+        self.mirror_racer = MirrorRacer(scoreboard=MirrorScoreboard.shared() if self.mirror_race_cfg['persist_scores'] else MirrorScoreboard(), top_k=self.mirror_race_cfg['top_k'], hedge_delay=self.mirror_race_cfg['hedge_delay'])
         self.enable_search_curl_cffi = enable_search_curl_cffi
         self.enable_download_curl_cffi = enable_download_curl_cffi
         self.enable_parse_curl_cffi = enable_parse_curl_cffi
         self.enable_curl_cffi = self.enable_search_curl_cffi
-        self.cc_impersonates = self._listccimpersonates() if (enable_search_curl_cffi or enable_download_curl_cffi) else None
+        self.cc_impersonates = self._listccimpersonates() if (enable_search_curl_cffi or enable_download_curl_cffi or enable_parse_curl_cffi) else None
         # init requests.Session
-        self.default_search_headers = {'User-Agent': UserAgent().random}
-        self.default_download_headers = {'User-Agent': UserAgent().random}
-        self.default_parse_headers = {'User-Agent': UserAgent().random}
+        self.default_search_headers = {'User-Agent': shareduseragent().random}
+        self.default_download_headers = {'User-Agent': shareduseragent().random}
+        self.default_parse_headers = {'User-Agent': shareduseragent().random}
         self.quark_default_download_headers = {
             'user-agent': 'Mozilla/5.0 (Windows NT 10.0; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/94.0.4606.71 Safari/537.36 Core/1.94.225.400 QQBrowser/12.2.5544.400',
             'origin': 'https://pan.quark.cn', 'referer': 'https://pan.quark.cn/', 'accept-language': 'zh-CN,zh;q=0.9', 'cookie': cookies2string(self.quark_parser_config.get('cookies', '')),
@@ -88,6 +128,10 @@ class BaseMusicClient():
         self.quark_default_download_cookies = {} # placeholder, useless now
         self.default_headers = self.default_search_headers
         self._initsession()
+        # keep-alive sessions keyed by host, used by get / post when maintain_session is False
+        self.session_pool = SessionPool(pool_size=session_pool_size)
+        # segment pool, keep-alive sessions (the pool above) and aes keys shared by every hls download of this client
+        self.hls_engine = HLSEngine(concurrency=self.hls_cfg['concurrency'], session_pool=self.session_pool)
         # proxied_session_client
         self.proxied_session_client = None
         if auto_set_proxies:
@@ -97,18 +141,112 @@ class BaseMusicClient():
             self.proxied_session_client = freeproxy.ProxiedSessionClient(**default_freeproxy_settings)
     '''_listccimpersonates'''
     def _listccimpersonates(self):
+        # scanning the binaries takes ~1s, the result is cached on disk per curl_cffi version / install
         curl_cffi = optionalimport('curl_cffi')
+        return StartupProbeCache.shared().fetch('curl_cffi.impersonates', StartupProbeCache.packagefingerprint(curl_cffi), lambda: self._scanccimpersonates(curl_cffi))
+    '''_scanccimpersonates'''
+    @staticmethod
+    def _scanccimpersonates(curl_cffi):
         root = Path(curl_cffi.__file__).resolve().parent
         exts = {".py", ".so", ".pyd", ".dll", ".dylib"}
         pat = re.compile(rb"\b(?:chrome|edge|safari|firefox|tor)(?:\d+[a-z_]*|_android|_ios)?\b")
         return sorted({m.decode("utf-8", "ignore") for p in root.rglob("*") if p.suffix in exts for m in pat.findall(p.read_bytes())})
+    '''_newsession'''
+    def _newsession(self, enable_curl_cffi: bool = False, headers: dict = None):
+        curl_cffi = optionalimport('curl_cffi')
+        session = requests.Session() if not enable_curl_cffi else curl_cffi.requests.Session()
+        session.headers = headers if headers is not None else {}
+        return session
     '''_initsession'''
     def _initsession(self):
-        curl_cffi = optionalimport('curl_cffi')
-        self.session = requests.Session() if not self.enable_curl_cffi else curl_cffi.requests.Session()
-        self.session.headers = self.default_headers
-        self.audio_link_tester = AudioLinkTester(headers=copy.deepcopy(self.default_download_headers), cookies=copy.deepcopy(self.default_download_cookies))
-        self.quark_audio_link_tester = AudioLinkTester(headers=copy.deepcopy(self.quark_default_download_headers), cookies=copy.deepcopy(self.quark_default_download_cookies))
+        # phase contexts resolved before are outdated once headers / cookies are re-configured, they will be re-resolved lazily per thread
+        self._context_generation += 1
+        self.session = self._newsession(self.enable_curl_cffi, self.default_headers)
+        self.audio_link_tester = AudioLinkTester(headers=copy.deepcopy(self.default_download_headers), cookies=copy.deepcopy(self.default_download_cookies), link_status_cache=self.link_status_cache)
+        self.quark_audio_link_tester = AudioLinkTester(headers=copy.deepcopy(self.quark_default_download_headers), cookies=copy.deepcopy(self.quark_default_download_cookies), link_status_cache=self.link_status_cache)
+    '''_contexttls'''
+    def _contexttls(self):
+        tls = self._context_tls
+        if not hasattr(tls, 'stack'): tls.stack, tls.contexts, tls.deadlines = [], {}, []
+        return tls
+    '''_resolverequestcontext'''
+    def _resolverequestcontext(self, phase: str) -> RequestContext:
+        tls = self._contexttls()
+        context = tls.contexts.get(phase)
+        if context is not None and context.generation == self._context_generation: return context
+        headers, cookies, enable_curl_cffi = getattr(self, f'default_{phase}_headers'), getattr(self, f'default_{phase}_cookies'), bool(getattr(self, f'enable_{phase}_curl_cffi'))
+        context = RequestContext(phase=phase, headers=headers, cookies=cookies, enable_curl_cffi=enable_curl_cffi, session=self._newsession(enable_curl_cffi, headers), generation=self._context_generation)
+        tls.contexts[phase] = context
+        return context
+    '''_currentrequestcontext'''
+    def _currentrequestcontext(self) -> RequestContext | None:
+        stack = getattr(self._context_tls, 'stack', None)
+        if not stack: return None
+        if stack[-1].generation != self._context_generation: stack[-1] = self._resolverequestcontext(stack[-1].phase)
+        return stack[-1]
+    '''requestcontext'''
+    @contextmanager
+    def requestcontext(self, phase: str):
+        tls = self._contexttls()
+        context = self._resolverequestcontext(phase)
+        tls.stack.append(context)
+        try: yield context
+        finally: tls.stack.pop()
+    '''usedeadline'''
+    @contextmanager
+    def usedeadline(self, deadline: SearchDeadline = None):
+        tls = self._contexttls()
+        if deadline is not None: tls.deadlines.append(deadline)
+        try: yield deadline
+        finally:
+            if deadline is not None: tls.deadlines.pop()
+    '''currentdeadline'''
+    def currentdeadline(self) -> SearchDeadline | None:
+        deadlines = getattr(self._context_tls, 'deadlines', None)
+        return deadlines[-1] if deadlines else None
+    '''bindrequestcontext'''
+    def bindrequestcontext(self, func):
+        # worker threads inherit both the phase request context and the search deadline of the submitting thread
+        context, deadline = self._currentrequestcontext(), self.currentdeadline()
+        if context is None and deadline is None: return func
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.usedeadline(deadline):
+                if context is None: return func(*args, **kwargs)
+                with self.requestcontext(context.phase): return func(*args, **kwargs)
+        return wrapper
+    '''default_headers'''
+    @property
+    def default_headers(self) -> dict:
+        context = self._currentrequestcontext()
+        return context.headers if context is not None else self._default_headers
+    @default_headers.setter
+    def default_headers(self, value: dict):
+        self._default_headers = value
+    '''default_cookies'''
+    @property
+    def default_cookies(self) -> dict:
+        context = self._currentrequestcontext()
+        return context.cookies if context is not None else self._default_cookies
+    @default_cookies.setter
+    def default_cookies(self, value: dict):
+        self._default_cookies = value
+    '''enable_curl_cffi'''
+    @property
+    def enable_curl_cffi(self) -> bool:
+        context = self._currentrequestcontext()
+        return context.enable_curl_cffi if context is not None else self._enable_curl_cffi
+    @enable_curl_cffi.setter
+    def enable_curl_cffi(self, value: bool):
+        self._enable_curl_cffi = value
+    '''session'''
+    @property
+    def session(self):
+        context = self._currentrequestcontext()
+        return context.session if context is not None else self._session
+    @session.setter
+    def session(self, value):
+        self._session = value
     '''_constructsearchurls'''
     def _constructsearchurls(self, keyword: str, rule: dict = None, request_overrides: dict = None):
         raise NotImplementedError('not to be implemented')
@@ -130,16 +268,25 @@ class BaseMusicClient():
     @usesearchheaderscookies
     def _search(self, keyword: str = '', search_url: str = '', request_overrides: dict = None, song_infos: list = [], progress: Progress = None, progress_id: int = 0):
         raise NotImplementedError('not be implemented')
-    '''search'''
+    '''_listsearchresult'''
+    def _listsearchresult(self, search_result: dict) -> SongInfo:
+        raise NotImplementedError(f'Lazy search is not supported now for {self.source}')
+    '''_resolvesearchresult'''
     @usesearchheaderscookies
-    def search(self, keyword: str, num_threadings: int = 5, request_overrides: dict = None, rule: dict = None, main_process_context: Progress = None, main_progress_id: int = None, main_progress_lock: Lock = None):
-        # init
-        rule, request_overrides = rule or {}, request_overrides or {}
-        # logging
-        self.logger_handle.info(f'Start to search music files using {self.source}.', disable_print=self.disable_print)
-        # construct search urls
-        search_urls = self._constructsearchurls(keyword=keyword, rule=rule, request_overrides=request_overrides)
-        # multi threadings for searching music files
+    def _resolvesearchresult(self, search_result: dict, request_overrides: dict = None, **kwargs) -> SongInfo | None:
+        raise NotImplementedError(f'Lazy search is not supported now for {self.source}')
+    '''_listorresolve'''
+    def _listorresolve(self, search_result: dict, request_overrides: dict = None, **kwargs) -> SongInfo | None:
+        # lazy search only turns the listing into a row, download url / quality / lyric are resolved later for the rows that are picked
+        # eager rows keep what is needed to resolve them again, e.g., when a signed download url expired (see BaseMusicClient._refreshdownloadurl)
+        if not self.lazy_search:
+            if (song_info := self._resolvesearchresult(search_result, request_overrides, **kwargs)) is not None: song_info.raw_data.setdefault('search', search_result); song_info.raw_data['resolve_kwargs'] = kwargs
+            return song_info
+        song_info = self._listsearchresult(search_result)
+        song_info.is_lazy = True; song_info.raw_data.update({'search': search_result, 'resolve_kwargs': kwargs})
+        return song_info
+    '''_startsearchprogress'''
+    def _startsearchprogress(self, search_urls: list, main_process_context: Progress = None, main_progress_id: int = None, main_progress_lock: Lock = None):
         if main_process_context is None:
             owns_progress = True
             main_process_context = Progress(TextColumn("{task.description}"), BarColumn(bar_width=None), MofNCompleteColumn(), TimeRemainingColumn(), refresh_per_second=10)
@@ -153,26 +300,26 @@ class BaseMusicClient():
                 cur_total = main_process_context.tasks[main_progress_id].total or 0
                 main_process_context.update(main_progress_id, total=cur_total + len(search_urls))
                 main_process_context.update(main_progress_id, description=f"ALL sources >>> completed ({int(main_process_context.tasks[main_progress_id].completed)}/{cur_total + len(search_urls)})")
-        song_infos, submitted_tasks = {}, []
-        with ThreadPoolExecutor(max_workers=num_threadings) as pool:
-            for search_url_idx, search_url in enumerate(search_urls):
-                song_infos[str(search_url_idx)] = []
-                submitted_tasks.append(pool.submit(self._search, keyword, search_url, request_overrides, song_infos[str(search_url_idx)], main_process_context, progress_id))
-            for future in as_completed(submitted_tasks):
-                future.result()
-                with main_progress_lock:
-                    main_process_context.advance(progress_id, 1)
-                    num_searched_urls = int(main_process_context.tasks[progress_id].completed)
-                    main_process_context.update(progress_id, description=f"{self.source}.search >>> completed ({num_searched_urls}/{len(search_urls)})")
-                    if main_progress_id is None: continue
-                    main_process_context.advance(main_progress_id, 1)
-                    main_process_context.update(main_progress_id, description=f"ALL sources >>> completed ({int(main_process_context.tasks[main_progress_id].completed)}/{int(main_process_context.tasks[main_progress_id].total or 0)})")
-        song_infos = list(chain.from_iterable(song_infos.values()))
-        song_infos = self._removeduplicates(song_infos=song_infos)
-        work_dir = self._constructuniqueworkdir(keyword=keyword)
+        return main_process_context, main_progress_lock, progress_id, owns_progress
+    '''_advancesearchprogress'''
+    def _advancesearchprogress(self, num_search_urls: int, main_process_context: Progress, main_progress_lock: Lock, progress_id: int, main_progress_id: int = None):
+        with main_progress_lock:
+            main_process_context.advance(progress_id, 1)
+            num_searched_urls = int(main_process_context.tasks[progress_id].completed)
+            main_process_context.update(progress_id, description=f"{self.source}.search >>> completed ({num_searched_urls}/{num_search_urls})")
+            if main_progress_id is None: return
+            main_process_context.advance(main_progress_id, 1)
+            main_process_context.update(main_progress_id, description=f"ALL sources >>> completed ({int(main_process_context.tasks[main_progress_id].completed)}/{int(main_process_context.tasks[main_progress_id].total or 0)})")
+    '''_assignworkdir'''
+    def _assignworkdir(self, song_infos: list[SongInfo], work_dir: str):
         for song_info in song_infos:
             song_info.work_dir = work_dir; episodes = song_info.episodes if isinstance(song_info.episodes, list) else []
             for eps_info in episodes: eps_info.work_dir = sanitize_filepath(os.path.join(work_dir, song_info.song_name)); touchdir(work_dir)
+        return song_infos
+    '''_finishsearch'''
+    def _finishsearch(self, keyword: str, song_infos: list[SongInfo], session_stats_before: dict, work_dir: str = None) -> list[SongInfo]:
+        song_infos = self._removeduplicates(song_infos=song_infos)
+        self._assignworkdir(song_infos, work_dir or self._constructuniqueworkdir(keyword=keyword))
         # logging
         if len(song_infos) > 0:
             work_dir_to_song_info, work_dir = defaultdict(list), ', '.join(list(set([str(s.work_dir) for s in song_infos])))
@@ -180,10 +327,96 @@ class BaseMusicClient():
             for w, items in work_dir_to_song_info.items(): touchdir(w); self._savetopkl(items, os.path.join(w, "search_results.pkl"))
         else:
             work_dir = self.work_dir
-        self.logger_handle.info(f'Finished searching music files using {self.source}. Search results have been saved to {work_dir}, valid items: {len(song_infos)}.', disable_print=self.disable_print)
-        if owns_progress: main_process_context.__exit__(None, None, None)
+        session_stats_after = self.sessionstats()
+        num_reuses, num_handshakes = session_stats_after['reuses'] - session_stats_before['reuses'], session_stats_after['handshakes'] - session_stats_before['handshakes']
+        self.logger_handle.info(f'Finished searching music files using {self.source}. Search results have been saved to {work_dir}, valid items: {len(song_infos)}, reused connections: {num_reuses}, new handshakes: {num_handshakes}.', disable_print=self.disable_print)
         # return
         return song_infos
+    '''_runwithdeadline'''
+    def _runwithdeadline(self, deadline: SearchDeadline, func, *args, **kwargs):
+        with self.usedeadline(deadline): return func(*args, **kwargs)
+    '''_itersearchpages'''
+    def _itersearchpages(self, keyword: str, num_threadings: int = 5, request_overrides: dict = None, rule: dict = None, main_process_context: Progress = None, main_progress_id: int = None, main_progress_lock: Lock = None,
+                         budget_ms: float = None, deadline: SearchDeadline = None, metadata: dict = None):
+        # init
+        rule, request_overrides = rule or {}, request_overrides or {}
+        deadline = deadline if deadline is not None else SearchDeadline.frombudgetms(budget_ms)
+        metadata = metadata if metadata is not None else {}
+        # logging
+        self.logger_handle.info(f'Start to search music files using {self.source}.', disable_print=self.disable_print)
+        session_stats_before = self.sessionstats()
+        # construct search urls, the search context is not held across yields since the consumer runs on this thread in between
+        with self.requestcontext('search'), self.usedeadline(deadline): search_urls = self._constructsearchurls(keyword=keyword, rule=rule, request_overrides=request_overrides)
+        metadata.update(num_pages=len(search_urls), num_completed_pages=0, timed_out=False, elapsed_s=0.0)
+        # multi threadings for searching music files, every page is handed out (deduplicated, with work_dir set) as soon as it completes
+        main_process_context, main_progress_lock, progress_id, owns_progress = self._startsearchprogress(search_urls, main_process_context, main_progress_id, main_progress_lock)
+        work_dir, identifiers, song_infos, page_song_infos, yielded_futures = self._constructuniqueworkdir(keyword=keyword), set(), [], {}, set()
+        pool = self._executor(num_threadings)
+        takebatch = lambda page: self._assignworkdir([s for s in list(page) if not (s.identifier in identifiers or identifiers.add(s.identifier))], work_dir)
+        try:
+            for search_url_idx, search_url in enumerate(search_urls):
+                page = []
+                page_song_infos[pool.submit(self._runwithdeadline, deadline, self._search, keyword, search_url, request_overrides, page, main_process_context, progress_id)] = (search_url_idx, page)
+            try:
+                for future in as_completed(page_song_infos, timeout=(deadline.remaining() if deadline is not None else None)):
+                    yielded_futures.add(future)
+                    future.result()
+                    self._advancesearchprogress(len(search_urls), main_process_context, main_progress_lock, progress_id, main_progress_id)
+                    metadata['num_completed_pages'] += 1
+                    search_url_idx, page = page_song_infos[future]
+                    song_infos.extend(batch := takebatch(page))
+                    if batch: yield search_url_idx, batch
+            except FuturesTimeoutError:
+                # out of budget, unfinished pages hand over whatever they resolved so far and their requests stop before the next attempt
+                deadline.cancel(); metadata['timed_out'] = True
+                for future, (search_url_idx, page) in sorted(page_song_infos.items(), key=lambda item: item[1][0]):
+                    if future in yielded_futures: continue
+                    song_infos.extend(batch := takebatch(page))
+                    if batch: yield search_url_idx, batch
+                self.logger_handle.warning(f'{self.source}.search >>> {keyword} (Warning: search budget of {deadline.budget_s * 1000:.0f}ms exhausted, {metadata["num_completed_pages"]}/{len(search_urls)} pages completed, partial results are returned)', disable_print=self.disable_print)
+        finally:
+            # a consumer that stops early leaves the pages not started yet unsearched
+            pool.shutdown(wait=False, cancel_futures=True)
+            if owns_progress: main_process_context.__exit__(None, None, None)
+            if deadline is not None: metadata['elapsed_s'] = round(deadline.elapsed(), 3)
+        self._finishsearch(keyword, song_infos, session_stats_before, work_dir=work_dir)
+    '''itersearch'''
+    def itersearch(self, keyword: str, num_threadings: int = 5, request_overrides: dict = None, rule: dict = None, main_process_context: Progress = None, main_progress_id: int = None, main_progress_lock: Lock = None, budget_ms: float = None):
+        # yields list[SongInfo] per search page in completion order
+        for _, batch in self._itersearchpages(keyword, num_threadings, request_overrides, rule, main_process_context, main_progress_id, main_progress_lock, budget_ms=budget_ms): yield batch
+    '''search'''
+    def search(self, keyword: str, num_threadings: int = 5, request_overrides: dict = None, rule: dict = None, main_process_context: Progress = None, main_progress_id: int = None, main_progress_lock: Lock = None, budget_ms: float = None, deadline: SearchDeadline = None):
+        # collector over the streamed pages, results keep the order of the search pages
+        pages = sorted(self._itersearchpages(keyword, num_threadings, request_overrides, rule, main_process_context, main_progress_id, main_progress_lock, budget_ms=budget_ms, deadline=deadline), key=lambda page: page[0])
+        return list(chain.from_iterable(batch for _, batch in pages))
+    '''asearch'''
+    async def asearch(self, keyword: str, num_threadings: int = 5, request_overrides: dict = None, rule: dict = None, main_process_context: Progress = None, main_progress_id: int = None, main_progress_lock: Lock = None, budget_ms: float = None, deadline: SearchDeadline = None):
+        # sources without a native asyncio implementation (see AsyncBaseMusicClient) run their threaded search off the event loop
+        return await asyncio.to_thread(self.search, keyword, num_threadings, request_overrides, rule, main_process_context, main_progress_id, main_progress_lock, budget_ms, deadline)
+    '''_resolvesonginfo'''
+    def _resolvesonginfo(self, song_info: SongInfo, request_overrides: dict = None) -> SongInfo | None:
+        if not song_info.is_lazy: return song_info
+        search_result, resolve_kwargs = song_info.raw_data.get('search'), song_info.raw_data.get('resolve_kwargs') or {}
+        # a speculative resolution of the same row still in flight is joined instead of being repeated
+        try: resolved = self.single_flight.do(('resolve', self.source, str(song_info.identifier)), lambda: self._resolvesearchresult(search_result, request_overrides, **resolve_kwargs))
+        except Exception as err: self.logger_handle.error(f'{self.source}.resolve >>> {song_info.song_name} (Error: {err})', disable_print=self.disable_print); return None
+        if resolved is None: return None
+        # resolved in place so rows already handed out (e.g., shown in the table) see the result too, the work_dir of the search is kept
+        return song_info.update({k: getattr(resolved, k) for k in SongInfo.fieldnames() - {'work_dir', '_save_path'}})
+    '''resolve'''
+    def resolve(self, song_infos: list[SongInfo], num_threadings: int = 5, request_overrides: dict = None) -> list[SongInfo]:
+        # rows of a lazy search get their download url here, resolved rows pass through untouched and rows that fail to resolve are dropped
+        request_overrides = request_overrides or {}
+        if not any(s.is_lazy for s in song_infos): return list(song_infos)
+        with self._executor(num_threadings) as pool: resolved_song_infos = list(pool.map(lambda s: self._resolvesonginfo(s, request_overrides), song_infos))
+        if (num_failures := sum(r is None for r in resolved_song_infos)): self.logger_handle.warning(f'{self.source}.resolve >>> {num_failures}/{len(song_infos)} items have no valid download url and are skipped.', disable_print=self.disable_print)
+        return [s for s in resolved_song_infos if s is not None]
+    '''speculativeresolve'''
+    def speculativeresolve(self, song_infos: list[SongInfo], top_k: int = 3, request_overrides: dict = None) -> list[Future]:
+        # the top rows start resolving in the background while the user is still picking, resolve / download join or reuse the results
+        with self._speculative_lock:
+            if self._speculative_pool is None: self._speculative_pool = self._executor(max(1, top_k), thread_name_prefix=f'{self.source}.resolve')
+        return [self._speculative_pool.submit(self._resolvesonginfo, s, request_overrides) for s in song_infos[:top_k] if s.is_lazy]
     '''_download'''
     @usedownloadheaderscookies
     def _download(self, song_info: SongInfo, request_overrides: dict = None, downloaded_song_infos: list[SongInfo] = [], progress: Progress = None, song_progress_id: int = 0):
@@ -194,71 +427,242 @@ class BaseMusicClient():
                 hls_downloader = HLSDownloader(
                     output_dir=song_info.work_dir, proxies=request_overrides.pop('proxies', None) or self.session.proxies, headers=song_info.default_download_headers or request_overrides.pop('headers', {}) or self.default_headers,
                     cookies=request_overrides.pop('cookies', {}) or self.default_cookies, logger_handle=self.logger_handle, verify_tls=request_overrides.pop('verify', True), timeout=request_overrides.pop('timeout', (10, 30)),
-                    disable_print=self.disable_print, request_overrides=request_overrides
+                    disable_print=self.disable_print, request_overrides=request_overrides, host_policy=self.host_policy, engine=self.hls_engine,
+                    **{k: v for k, v in self.hls_cfg.items() if k in {'streaming', 'reorder_window', 'coalesce_max_bytes'}},
                 )
                 hls_downloader.download(song_info.download_url, song_info.save_path, quality='best', keep_segments=False, temp_subdir=str(song_info.identifier), progress=progress, progress_id=song_progress_id)
-                downloaded_song_infos.append(SongInfoUtils.fillsongtechinfo(copy.deepcopy(song_info), logger_handle=self.logger_handle, disable_print=self.disable_print))
+                downloaded_song_infos.append(self._finishdownload(song_info))
             except Exception as err:
                 progress.update(song_progress_id, description=f"{self.source}.download >>> {song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]} (Error: {err})")
         elif song_info.protocol.upper() in {'HTTP'} and song_info.downloaded_contents:
             try:
                 touchdir(song_info.work_dir)
-                total_size = song_info.downloaded_contents.__sizeof__()
+                contents = song_info.downloaded_contents if isinstance(song_info.downloaded_contents, SpooledContents) else SpooledContents.frombytes(song_info.downloaded_contents)
+                total_size, sha256 = len(contents), contents.sha256
                 progress.update(song_progress_id, total=total_size)
-                with open(song_info.save_path, "wb") as fp: fp.write(song_info.downloaded_contents)
+                # spilled bodies are renamed into place instead of being written a second time, the contents are consumed by that
+                contents.movetofile(song_info.save_path); song_info.downloaded_contents = None
                 progress.advance(song_progress_id, total_size)
                 progress.update(song_progress_id, description=f"{self.source}.download >>> {song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]} (Success)")
-                downloaded_song_infos.append(SongInfoUtils.fillsongtechinfo(copy.deepcopy(song_info), logger_handle=self.logger_handle, disable_print=self.disable_print))
+                downloaded_song_infos.append(self._finishdownload(song_info, sha256=sha256))
             except Exception as err:
                 progress.update(song_progress_id, description=f"{self.source}.download >>> {song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]} (Error: {err})")
         elif song_info.protocol.upper() in {'HTTP'}:
             try:
                 touchdir(song_info.work_dir)
                 if song_info.default_download_headers: request_overrides['headers'] = song_info.default_download_headers
-                with self.get(song_info.download_url, stream=True, **request_overrides) as resp:
-                    resp.raise_for_status()
-                    total_size, chunk_size, downloaded_size = int(resp.headers.get('content-length', 0)), song_info.get('chunk_size', 1024), 0
-                    progress.update(song_progress_id, total=total_size)
-                    with open(song_info.save_path, "wb") as fp:
-                        for chunk in resp.iter_content(chunk_size=chunk_size):
-                            if not chunk: continue
-                            fp.write(chunk)
-                            downloaded_size = downloaded_size + len(chunk)
-                            if total_size > 0:
-                                downloading_text = "%0.2fMB/%0.2fMB" % (downloaded_size / 1024 / 1024, total_size / 1024 / 1024)
-                            else:
-                                progress.update(song_progress_id, total=downloaded_size)
-                                downloading_text = "%0.2fMB/%0.2fMB" % (downloaded_size / 1024 / 1024, downloaded_size / 1024 / 1024)
-                            progress.advance(song_progress_id, len(chunk))
-                            progress.update(song_progress_id, description=f"{self.source}.download >>> {song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]} (Downloading: {downloading_text})")
-                    progress.update(song_progress_id, description=f"{self.source}.download >>> {song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]} (Success)")
-                    downloaded_song_infos.append(SongInfoUtils.fillsongtechinfo(copy.deepcopy(song_info), logger_handle=self.logger_handle, disable_print=self.disable_print))
+                try:
+                    sha256 = self._downloadhttp(song_info, request_overrides, progress, song_progress_id)
+                except Exception as err:
+                    # signed urls expire (e.g., a run resumed the next day), the row is resolved again once and the journal keeps the bytes already on disk
+                    if getattr(getattr(err, 'response', None), 'status_code', None) not in {401, 403, 404, 410}: raise
+                    if not self._refreshdownloadurl(song_info, {k: v for k, v in request_overrides.items() if k != 'headers'}): raise
+                    if song_info.default_download_headers: request_overrides['headers'] = song_info.default_download_headers
+                    sha256 = self._downloadhttp(song_info, request_overrides, progress, song_progress_id)
+                progress.update(song_progress_id, description=f"{self.source}.download >>> {song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]} (Success)")
+                downloaded_song_infos.append(self._finishdownload(song_info, sha256=sha256))
             except Exception as err:
                 progress.update(song_progress_id, description=f"{self.source}.download >>> {song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]} (Error: {err})")
         return downloaded_song_infos
+    '''_librarykey'''
+    def _librarykey(self, song_info: SongInfo) -> str | None:
+        if song_info.identifier in {None, '', 'NULL'}: return None
+        quality = song_info.raw_data.get('quality') if isinstance(song_info.raw_data, dict) else None
+        return DownloadLibrary.keyfor(self.source, song_info.identifier, '.'.join(str(q) for q in (quality, song_info.ext) if q))
+    '''_fetchfromlibrary'''
+    def _fetchfromlibrary(self, song_info: SongInfo, downloaded_song_infos: list[SongInfo], progress: Progress, song_progress_id: int) -> bool:
+        # a song downloaded before (any run, any work_dir) is hard linked / copied into place, its tags were written back then
+        if (key := self._librarykey(song_info)) is None: return False
+        try: mode = self.download_library.fetch(key, song_info.save_path)
+        except Exception as err: self.logger_handle.warning(f'{self.source}.download >>> {song_info.song_name} (Warning: download library lookup failed, {err})', disable_print=self.disable_print); return False
+        if mode is None: return False
+        total_size = os.path.getsize(song_info.save_path)
+        progress.update(song_progress_id, total=total_size, completed=total_size, description=f"{self.source}.download >>> {song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]} (Library: {mode})")
+        downloaded_song_infos.append(functools.partial(SongInfoUtils.fillsongtechinfo, copy.deepcopy(song_info), logger_handle=self.logger_handle, disable_print=self.disable_print, auto_write_tags_to_downloaded_audio=False))
+        return True
+    '''_finishdownload'''
+    def _finishdownload(self, song_info: SongInfo, sha256: str = None) -> functools.partial:
+        # deferred, _downloadorlink hands it to the post-processing pool once _download (and whatever a subclass does after it, e.g., moving save_path) returned
+        return functools.partial(self._postprocess, song_info, sha256)
+    '''_postprocess'''
+    def _postprocess(self, song_info: SongInfo, sha256: str = None) -> SongInfo:
+        # the library is keyed by the digest of the downloaded body, so it is taken before the tags are written (streamed downloads hand it in)
+        if (key := self._librarykey(song_info)) is not None and self.download_library.enable and sha256 is None: sha256 = DownloadLibrary.hashfile(song_info.save_path)
+        downloaded_song_info = SongInfoUtils.fillsongtechinfo(copy.deepcopy(song_info), logger_handle=self.logger_handle, disable_print=self.disable_print)
+        if key is None: return downloaded_song_info
+        try: self.download_library.add(key, downloaded_song_info.save_path, sha256=sha256)
+        except Exception as err: self.logger_handle.warning(f'{self.source}.download >>> {song_info.song_name} (Warning: adding to the download library failed, {err})', disable_print=self.disable_print)
+        return downloaded_song_info
+    '''_downloadorlink'''
+    def _downloadorlink(self, song_info: SongInfo, request_overrides: dict = None, downloaded_song_infos: list[SongInfo] = [], progress: Progress = None, song_progress_id: int = 0):
+        # this worker only gets the bytes on disk, the deferred post-processing of the finished file (see _finishdownload) is queued on the post-processing pool
+        started_at, finished = time.monotonic(), []
+        if not self._fetchfromlibrary(song_info, finished, progress, song_progress_id): self._download(song_info, request_overrides, finished, progress, song_progress_id)
+        num_bytes = os.path.getsize(song_info.save_path) if finished and os.path.exists(song_info.save_path) else 0
+        self.postprocess_pool.record('download', started_at, time.monotonic(), num_bytes=num_bytes, failed=not finished)
+        # the untagged SongInfo travels with its future, the song was downloaded even if post-processing fails later
+        downloaded_song_infos.extend([(self.postprocess_pool.submit(item), item.args[0]) if isinstance(item, functools.partial) else item for item in finished])
+        return downloaded_song_infos
+    '''_collectpostprocessed'''
+    def _collectpostprocessed(self, downloaded_song_infos: list) -> list[SongInfo]:
+        collected_song_infos = []
+        for item in downloaded_song_infos:
+            if not isinstance(item, tuple): collected_song_infos.append(item); continue
+            future, song_info = item
+            try: collected_song_infos.append(future.result())
+            except Exception as err:
+                # the file is on disk already, it is reported as downloaded without tech info / tags instead of being dropped
+                self.logger_handle.warning(f'{self.source}.download >>> {song_info.song_name} (Warning: post-processing failed, the file is kept untagged, {err})', disable_print=self.disable_print)
+                collected_song_infos.append(song_info)
+        return collected_song_infos
+    '''_fetchcontents'''
+    def _fetchcontents(self, url: str, request_overrides: dict = None) -> SpooledContents:
+        # for parsers whose links die right after parsing, the body is streamed into SongInfo.downloaded_contents instead of being held as one bytes object
+        spool_dir = self.spool_cfg['spool_dir'] or os.path.join(self.work_dir, '.spool')
+        with self.get(url, stream=True, **(request_overrides or {})) as resp:
+            resp.raise_for_status()
+            return SpooledContents.fromresponse(resp, max_memory_size=self.spool_cfg['max_memory_size'], spool_dir=spool_dir)
+    '''_partpath'''
+    def _partpath(self, song_info: SongInfo) -> str:
+        # stable across searches and runs (the work_dir of a search is not), so downloading the same song again picks up the same .part file
+        key = hashlib.sha1(f'{self.source}|{song_info.identifier or song_info.download_url}|{song_info.ext}'.encode('utf-8')).hexdigest()[:20]
+        return os.path.join(self.work_dir, '.parts', self.source, f'{key}.{song_info.ext}.part')
+    '''_refreshdownloadurl'''
+    def _refreshdownloadurl(self, song_info: SongInfo, request_overrides: dict = None) -> bool:
+        # resolves the row again from its search result, only for sources that split listing and resolving (see BaseMusicClient._listorresolve)
+        if type(self)._resolvesearchresult is BaseMusicClient._resolvesearchresult or not isinstance(song_info.raw_data, dict) or not song_info.raw_data.get('search'): return False
+        try: resolved = self._resolvesearchresult(song_info.raw_data['search'], request_overrides, **(song_info.raw_data.get('resolve_kwargs') or {}))
+        except Exception as err: self.logger_handle.warning(f'{self.source}.download >>> {song_info.song_name} (Warning: refreshing the download url failed, {err})', disable_print=self.disable_print); return False
+        if resolved is None or not resolved.with_valid_download_url: return False
+        self.logger_handle.info(f'{self.source}.download >>> {song_info.song_name} (Info: download url expired and was resolved again)', disable_print=self.disable_print)
+        song_info.update(dict(download_url=resolved.download_url, download_url_status=resolved.download_url_status, default_download_headers=resolved.default_download_headers))
+        return True
+    '''_downloadhttp'''
+    def _downloadhttp(self, song_info: SongInfo, request_overrides: dict, progress: Progress, song_progress_id: int) -> str | None:
+        # bytes land in a .part file next to a resume journal, which survive failures and interrupts, the song only appears at save_path once complete
+        part_path = self._partpath(song_info); touchdir(os.path.dirname(part_path))
+        link_status = song_info.download_url_status if isinstance(song_info.download_url_status, dict) else {}
+        journal = ResumeJournal.load(f'{part_path}.json')
+        if not os.path.exists(part_path): journal.reset()
+        if not journal.validate(link_status.get('clen')) and os.path.exists(part_path): os.remove(part_path)
+        journal.url = song_info.download_url
+        try:
+            # large files on range capable servers are fetched as parallel byte ranges, the single stream is the fallback for everything else
+            # the single stream hashes the body on the fly when it starts from byte 0, returned for the download library
+            sha256 = None
+            if not self._downloadsegmented(song_info, request_overrides, progress, song_progress_id, part_path, journal): sha256 = self._downloadstream(song_info, request_overrides, progress, song_progress_id, part_path, journal)
+        except BaseException:
+            # nothing on disk yet leaves nothing to resume from
+            journal.save(force=True) if journal.ranges else journal.discard(); raise
+        journal.discard()
+        replacefile(part_path, song_info.save_path)
+        return sha256
+    '''_downloadstream'''
+    def _downloadstream(self, song_info: SongInfo, request_overrides: dict, progress: Progress, song_progress_id: int, part_path: str, journal: ResumeJournal) -> str | None:
+        song_name = song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]
+        for _ in range(2):
+            # resumes after the bytes already on disk, If-Range makes the server answer with the whole (changed) resource instead of a stale tail
+            offset, headers = journal.contiguousprefix, {k: v for k, v in (request_overrides.get('headers') or self.default_headers).items() if str(k).lower() not in {'range', 'if-range'}}
+            if offset > 0: headers.update({'Range': f'bytes={offset}-', **({'If-Range': validator} if (validator := journal.etag or journal.last_modified) else {})})
+            with self.get(song_info.download_url, stream=True, **{**request_overrides, 'headers': headers}) as resp:
+                resp.raise_for_status()
+                try: journal.observe(resp.headers)
+                except ResourceChangedError: journal.reset(); continue
+                # a full body (no range support, or If-Range saw a change) starts over, ranges the journal recorded past the prefix are dropped with the file
+                if offset == 0 or not (resp.status_code == 206 and str(resp.headers.get('Content-Range') or '').startswith(f'bytes {offset}-')): offset = 0; journal.reset(); journal.observe(resp.headers)
+                total_size, chunk_size, downloaded_size = int(resp.headers.get('content-length', 0)), song_info.get('chunk_size', 1024), offset
+                total_size = total_size + offset if total_size > 0 else 0
+                journal.validate(total_size or None)
+                hasher = hashlib.sha256() if offset == 0 else None
+                progress.update(song_progress_id, total=total_size, completed=offset)
+                with open(part_path, "r+b" if offset > 0 else "wb") as fp:
+                    fp.seek(offset)
+                    for chunk in resp.iter_content(chunk_size=chunk_size):
+                        if not chunk: continue
+                        fp.write(chunk)
+                        if hasher is not None: hasher.update(chunk)
+                        journal.addrange(downloaded_size, downloaded_size + len(chunk) - 1); journal.save()
+                        downloaded_size = downloaded_size + len(chunk)
+                        if total_size > 0:
+                            downloading_text = "%0.2fMB/%0.2fMB" % (downloaded_size / 1024 / 1024, total_size / 1024 / 1024)
+                        else:
+                            progress.update(song_progress_id, total=downloaded_size)
+                            downloading_text = "%0.2fMB/%0.2fMB" % (downloaded_size / 1024 / 1024, downloaded_size / 1024 / 1024)
+                        progress.advance(song_progress_id, len(chunk))
+                        progress.update(song_progress_id, description=f"{self.source}.download >>> {song_name} (Downloading: {downloading_text})")
+                    fp.truncate()
+            if total_size > 0 and downloaded_size < total_size: raise IOError(f'connection closed after {downloaded_size} of {total_size} bytes')
+            return hasher.hexdigest() if hasher is not None else None
+        raise ResourceChangedError('resource keeps changing while downloading')
+    '''_downloadsegmented'''
+    def _downloadsegmented(self, song_info: SongInfo, request_overrides: dict, progress: Progress, song_progress_id: int, part_path: str, journal: ResumeJournal) -> bool:
+        # only when the link probe saw range support and a known length, returns False whenever the single stream should take over, the journal keeps finished bytes
+        link_status = song_info.download_url_status if isinstance(song_info.download_url_status, dict) else {}
+        if not link_status.get('range') or not link_status.get('clen'): return False
+        total_size = int(link_status['clen'])
+        ranges = SegmentedRangeDownloader.plan(total_size, self.segmented_download_cfg['num_segments'], self.segmented_download_cfg['min_segment_size'])
+        if not ranges: return False
+        # resuming only fetches the pieces of each segment the journal has not seen yet
+        if not (ranges := SegmentedRangeDownloader.intersect(ranges, journal.missingranges(total_size))): return True
+        song_name, counter_lock, downloaded_size = song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13], Lock(), [journal.completedbytes]
+        def _fetchrange(start: int, end: int):
+            headers = {k: v for k, v in (request_overrides.get('headers') or self.default_headers).items() if str(k).lower() not in {'range', 'if-range'}}
+            resp = self.get(song_info.download_url, stream=True, **{**request_overrides, 'headers': {**headers, 'Range': f'bytes={start}-{end}'}})
+            try: journal.observe(resp.headers)
+            except Exception: resp.close(); raise
+            return resp
+        def _onwritten(offset: int, num_bytes: int):
+            journal.addrange(offset, offset + num_bytes - 1); journal.save()
+        def _onprogress(num_bytes: int):
+            with counter_lock: downloaded_size[0] += num_bytes; downloading_text = "%0.2fMB/%0.2fMB" % (downloaded_size[0] / 1024 / 1024, total_size / 1024 / 1024)
+            progress.advance(song_progress_id, num_bytes)
+            progress.update(song_progress_id, description=f"{self.source}.download >>> {song_name} (Downloading x{len(ranges)}: {downloading_text})")
+        progress.update(song_progress_id, total=total_size, completed=downloaded_size[0])
+        try:
+            downloader = SegmentedRangeDownloader(chunk_size=song_info.get('chunk_size', 1024 * 1024), executor=self._executor(len(ranges)))
+            downloader.download(_fetchrange, part_path, total_size, ranges, onprogress=_onprogress, onwritten=_onwritten, resume=True)
+            return True
+        except Exception as err:
+            # a changed resource invalidates everything on disk, the single stream then starts over
+            if isinstance(err, ResourceChangedError): journal.reset()
+            self.logger_handle.warning(f'{self.source}.download >>> {song_info.song_name} (Warning: segmented download failed, falling back to a single stream, {err})', disable_print=self.disable_print)
+            progress.update(song_progress_id, completed=journal.contiguousprefix)
+            return False
+    '''downloadprogress'''
+    @staticmethod
+    def downloadprogress(progress_cfg: dict = None) -> ProgressSink:
+        columns = lambda: [SpinnerColumn(), TextColumn("{task.description}"), BarColumn(bar_width=None), TaskProgressColumn(), AudioAwareColumn(), TransferSpeedColumn(), TimeRemainingColumn()]
+        return buildprogress(progress_cfg, richprogressfactory=lambda: Progress(*columns(), refresh_per_second=20, expand=True))
     '''download'''
     @usedownloadheaderscookies
-    def download(self, song_infos: list[SongInfo], num_threadings: int = 5, request_overrides: dict = None):
-        # init
+    def download(self, song_infos: list[SongInfo], num_threadings: int = 5, request_overrides: dict = None, progress: Progress = None):
+        # init, rows of a lazy search are resolved for the picked items only
         request_overrides = request_overrides or {}
+        song_infos = self.resolve(song_infos, num_threadings=num_threadings, request_overrides=request_overrides)
         shortenpathsinsonginfos(song_infos=song_infos)
         # logging
         self.logger_handle.info(f'Start to download music files using {self.source}.', disable_print=self.disable_print)
-        # multi threadings for downloading music files
-        columns = [SpinnerColumn(), TextColumn("{task.description}"), BarColumn(bar_width=None), TaskProgressColumn(), AudioAwareColumn(), TransferSpeedColumn(), TimeRemainingColumn()]
-        with Progress(*columns, refresh_per_second=20, expand=True) as progress:
+        # multi threadings for downloading music files, a progress handed in (see MusicClient.download) is shared with the other sources
+        owns_progress = progress is None
+        if owns_progress: progress = self.downloadprogress(self.progress_cfg); progress.__enter__()
+        try:
             songs_progress_id = progress.add_task(f"{self.source}.download >>> completed (0/{len(song_infos)})", total=len(song_infos), kind='overall')
             song_progress_ids, downloaded_song_infos, submitted_tasks = [], [], []
             for _, song_info in enumerate(song_infos):
                 desc = f"{self.source}.download >>> {song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]} (Preparing)"
                 song_progress_ids.append(progress.add_task(desc, total=None, kind='download'))
-            with ThreadPoolExecutor(max_workers=num_threadings) as pool:
+            with self._executor(num_threadings) as pool:
                 for song_progress_id, song_info in zip(song_progress_ids, song_infos):
-                    submitted_tasks.append(pool.submit(self._download, song_info, request_overrides, downloaded_song_infos, progress, song_progress_id))
+                    submitted_tasks.append(pool.submit(self._downloadorlink, song_info, request_overrides, downloaded_song_infos, progress, song_progress_id))
                 for _ in as_completed(submitted_tasks):
                     progress.advance(songs_progress_id, 1)
                     num_downloaded_songs = int(progress.tasks[songs_progress_id].completed)
                     progress.update(songs_progress_id, description=f"{self.source}.download >>> completed ({num_downloaded_songs}/{len(song_infos)})")
+        finally:
+            if owns_progress: progress.__exit__(None, None, None)
+        downloaded_song_infos = self._collectpostprocessed(downloaded_song_infos)
+        # library changes of this batch are written out once, after the post-processing that records them finished
+        self.download_library.flush()
         # logging
         if len(downloaded_song_infos) > 0:
             work_dir_to_song_info, work_dir = defaultdict(list), ', '.join(list(set([str(s.work_dir) for s in downloaded_song_infos])))
@@ -269,6 +673,28 @@ class BaseMusicClient():
         self.logger_handle.info(f'Finished downloading music files using {self.source}. Download results have been saved to {work_dir}, valid downloads: {len(downloaded_song_infos)}.', disable_print=self.disable_print)
         # return
         return downloaded_song_infos
+    '''adownload'''
+    async def adownload(self, song_infos: list[SongInfo], num_threadings: int = 5, request_overrides: dict = None):
+        return await asyncio.to_thread(self.download, song_infos, num_threadings, request_overrides)
+    '''_executor'''
+    def _executor(self, max_workers: int = None, thread_name_prefix: str = '', urgent: bool = False):
+        # with a scheduler every pool of the client becomes a view of it (global cap, per source quota, fair queuing), otherwise a private pool
+        # of max_workers as before, None then lets the call site fall back to its own default pool. urgent views are for callers that wait with
+        # a timeout, their tasks never run inline while the scheduler has a worker or a reserved one left (see TaskScheduler.submiturgent)
+        if self.scheduler is not None: return self.scheduler.executor(self.source, urgent=urgent)
+        return None if max_workers is None else ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+    '''_resolvequalityladder'''
+    def _resolvequalityladder(self, qualities: list, resolvefunc, default: SongInfo = None, stop_on_error: bool = True):
+        # per-quality request builders run concurrently within quality_ladder_window, the best tier that validates wins. the tiers go through an urgent
+        # scheduler view, so they count against the global cap but are not serialized inline while the scheduler is busy
+        resolver = QualityLadderResolver(window=self.quality_ladder_window, stop_on_error=stop_on_error)
+        return resolver.resolve(qualities, self.bindrequestcontext(resolvefunc), default=default if default is not None else SongInfo(source=self.source), executor=self._executor(urgent=True))
+    '''_racethirdpartapis'''
+    def _racethirdpartapis(self, imp_funcs: list, *args, default: SongInfo = None, **kwargs):
+        # third-party mirrors are hedged against each other in the order of their persisted scores, the first valid SongInfo wins. hedging waits with a timeout,
+        # so the mirrors go through an urgent scheduler view (see TaskScheduler.submiturgent), a mirror run inline would block the hedge
+        resolvers = [(f'{self.source}.{imp_func.__name__}', self.bindrequestcontext(functools.partial(imp_func, *args, **kwargs))) for imp_func in imp_funcs]
+        return self.mirror_racer.race(resolvers, default=default if default is not None else SongInfo(source=self.source), executor=self._executor(urgent=True))
     '''parseplaylist'''
     @useparseheaderscookies
     def parseplaylist(self, playlist_url: str):
@@ -280,36 +706,70 @@ class BaseMusicClient():
             except Exception as err: self.logger_handle.error(f'{self.source}._autosetproxies >>> freeproxy lib failed to auto fetch proxies (Error: {err})', disable_print=self.disable_print); self.session.proxies = {}
         else:
             self.session.proxies = {}
-    '''get'''
-    def get(self, url, **kwargs):
+    '''_request'''
+    def _request(self, method: str, url: str, **kwargs):
+        # identical in-flight requests share one response when single-flight is enabled client-wide or asked for by the caller
+        single_flight, memo_ttl = kwargs.pop('single_flight', None), kwargs.pop('memo_ttl', None)
+        if not (self.single_flight_cfg['enable'] if single_flight is None else single_flight) or kwargs.get('stream'): return self._requestwithretries(method, url, **kwargs)
+        key = SingleFlight.requestkey(method, url, **{**kwargs, 'headers': {**dict(self.default_headers or {}), **dict(kwargs.get('headers') or {})}, 'cookies': kwargs.get('cookies', self.default_cookies)})
+        return self.single_flight.do(key, lambda: self._requestwithretries(method, url, **kwargs), memo_ttl=memo_ttl)
+    '''_requestwithretries'''
+    def _requestwithretries(self, method: str, url: str, **kwargs):
         if 'cookies' not in kwargs: kwargs['cookies'] = self.default_cookies
         if 'impersonate' not in kwargs and self.enable_curl_cffi: kwargs['impersonate'] = random.choice(self.cc_impersonates)
-        resp = None
-        for _ in range(self.max_retries):
-            if not self.maintain_session:
-                self._initsession()
-                if self.random_update_ua: self.session.headers.update({'User-Agent': UserAgent().random})
-            self._autosetproxies()
-            proxies = kwargs.pop('proxies', None) or self.session.proxies
-            try: (resp := self.session.get(url, proxies=proxies, **kwargs)).raise_for_status()
-            except Exception as err: self.logger_handle.error(f'{self.source}.get >>> {url} (Error: {err}; status={getattr(locals().get("resp"), "status_code", None)})', disable_print=self.disable_print); continue
-            return resp
+        resp, proxies_override, enable_curl_cffi, deadline = None, kwargs.pop('proxies', None), self.enable_curl_cffi, self.currentdeadline()
+        for attempt in range(self.max_retries):
+            # a search out of budget stops issuing requests, the ones still allowed never wait beyond the deadline
+            if deadline is not None and deadline.expired: break
+            request_kwargs = kwargs if deadline is None else {**kwargs, 'timeout': deadline.clamptimeout(kwargs.get('timeout'))}
+            # hosts behind an open circuit are skipped without a request, the rest wait for their rate limit token but never beyond the deadline
+            try:
+                if not self.host_policy.acquire(url, max_wait=deadline.remaining() if deadline is not None else None): break
+            except CircuitOpenError as err:
+                self.logger_handle.error(f'{self.source}.{method.lower()} >>> {url} (Error: {err})', disable_print=self.disable_print); break
+            # pooled sessions are checked out by one thread at a time, so resetting headers and cookie jar keeps the old per-request semantics without a new handshake
+            if self.maintain_session:
+                session = self.session
+            else:
+                session = self.session_pool.acquire(url, enable_curl_cffi=enable_curl_cffi)
+                session.headers = dict(self.default_headers); session.cookies.clear()
+                if self.random_update_ua: session.headers.update({'User-Agent': shareduseragent().random})
+            try:
+                self._autosetproxies()
+                proxies = proxies_override or self.session.proxies
+                (resp := session.request(method, url, proxies=proxies, **request_kwargs)).raise_for_status()
+            except Exception as err:
+                self.logger_handle.error(f'{self.source}.{method.lower()} >>> {url} (Error: {err}; status={getattr(locals().get("resp"), "status_code", None)})', disable_print=self.disable_print)
+                retryable, last_err = self.host_policy.recordoutcome(url, err), err
+            else:
+                self.host_policy.recordoutcome(url); return resp
+            finally:
+                if not self.maintain_session: self.session_pool.release(url, session, enable_curl_cffi=enable_curl_cffi)
+            # only transient failures (connection errors, timeouts, 429 and 5xx) are retried, an answer such as 403 / 404 from a healthy host is final
+            if not retryable: break
+            if attempt + 1 < self.max_retries: time.sleep(min(self.host_policy.backoffdelay(url, attempt, last_err), deadline.remaining() if deadline is not None else float('inf')))
         return resp
+    '''get'''
+    def get(self, url, **kwargs):
+        return self._request('GET', url, **kwargs)
     '''post'''
     def post(self, url, **kwargs):
-        if 'cookies' not in kwargs: kwargs['cookies'] = self.default_cookies
-        if 'impersonate' not in kwargs and self.enable_curl_cffi: kwargs['impersonate'] = random.choice(self.cc_impersonates)
-        resp = None
-        for _ in range(self.max_retries):
-            if not self.maintain_session:
-                self._initsession()
-                if self.random_update_ua: self.session.headers.update({'User-Agent': UserAgent().random})
-            self._autosetproxies()
-            proxies = kwargs.pop('proxies', None) or self.session.proxies
-            try: (resp := self.session.post(url, proxies=proxies, **kwargs)).raise_for_status()
-            except Exception as err: self.logger_handle.error(f'{self.source}.post >>> {url} (Error: {err}; status={getattr(locals().get("resp"), "status_code", None)})', disable_print=self.disable_print); continue
-            return resp
-        return resp
+        return self._request('POST', url, **kwargs)
+    '''sessionstats'''
+    def sessionstats(self) -> dict:
+        return self.session_pool.stats()
+    '''hostpolicystats'''
+    def hostpolicystats(self) -> dict:
+        return self.host_policy.stats()
+    '''postprocessstats'''
+    def postprocessstats(self) -> dict:
+        return self.postprocess_pool.stats()
+    '''hlsstats'''
+    def hlsstats(self) -> dict:
+        return self.hls_engine.stats()
+    '''linkcachestats'''
+    def linkcachestats(self) -> dict:
+        return self.link_status_cache.stats()
     '''_savetopkl'''
     def _savetopkl(self, data, file_path, auto_sanitize=True):
         if auto_sanitize: file_path = sanitize_filepath(file_path)
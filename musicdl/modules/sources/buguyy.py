@@ -69,10 +69,9 @@ class BuguyyMusicClient(BaseMusicClient):
                 raw_data={'search': search_result, 'download': download_result, 'lyric': lyric_result}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['title'], None)), 
                 singers=legalizestring(safeextractfromdict(search_result, ['singer'], None)), album=legalizestring(safeextractfromdict(lyric_result, ['data', 'album'], None)), ext='wav',
                 file_size='NULL', identifier=search_result['id'], duration_s=duration_s, duration=seconds2hms(duration_s), lyric=cleanlrc(safeextractfromdict(lyric_result, ['data', 'lrc'], '')),
-                cover_url=safeextractfromdict(search_result, ['picurl'], None), download_url=download_url, download_url_status=self.quark_audio_link_tester.test(download_url, request_overrides),
+                cover_url=safeextractfromdict(search_result, ['picurl'], None), download_url=download_url, download_url_status=self.quark_audio_link_tester.inspect(download_url, request_overrides),
                 default_download_headers=self.quark_default_download_headers
             )
-            song_info.download_url_status['probe_status'] = self.quark_audio_link_tester.probe(song_info.download_url, request_overrides)
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
             song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL', )) else song_info.ext
             if song_info.with_valid_download_url: break
@@ -102,9 +101,8 @@ class BuguyyMusicClient(BaseMusicClient):
             raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['title'], None)), 
             singers=legalizestring(safeextractfromdict(search_result, ['singer'], None)), album=legalizestring(safeextractfromdict(download_result, ['data', 'album'], None)), ext=download_url.split('?')[0].split('.')[-1],
             file_size='NULL', identifier=search_result['id'], duration=None, lyric=cleanlrc(safeextractfromdict(download_result, ['data', 'lrc'], '')), cover_url=safeextractfromdict(search_result, ['picurl'], None), 
-            download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+            download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
         )
-        song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
         song_info.file_size = song_info.download_url_status['probe_status']['file_size']
         song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL', )) else song_info.ext
         if not song_info.duration or song_info.duration == '-:-:-':
@@ -74,9 +74,8 @@ class FiveSingMusicClient(BaseMusicClient):
                         singers=legalizestring(safeextractfromdict(search_result, ['singer'], None)), album='NULL', ext=safeextractfromdict(download_result, ['data', f'{quality}ext'], 'mp3') or 'mp3',
                         file_size_bytes=int(float(safeextractfromdict(download_result, ['data', f'{quality}size'], 0) or 0)), file_size=byte2mb(safeextractfromdict(download_result, ['data', f'{quality}size'], 0)),
                         identifier=search_result['songId'], duration='-:-:-', lyric=None, cover_url=safeextractfromdict(download_result, ['data', 'user', 'I'], None), download_url=download_url, 
-                        download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                        download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
                     )
-                    song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
                     song_info.file_size = song_info.download_url_status['probe_status']['file_size']
                     song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL',)) else song_info.ext
                     if song_info.with_valid_download_url: break
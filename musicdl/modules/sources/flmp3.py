@@ -98,9 +98,8 @@ class FLMP3MusicClient(BaseMusicClient):
                         raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['title'], None)),
                         singers=legalizestring(safeextractfromdict(search_result, ['artist'], None)), album='NULL', ext='mp3', file_size='NULL', identifier=download_result['song_id'], duration_s=duration_s,
                         duration=seconds2hms(duration_s), lyric='NULL', cover_url=safeextractfromdict(search_result, ['img_url'], None), download_url=download_url, 
-                        download_url_status=self.quark_audio_link_tester.test(download_url, request_overrides), default_download_headers=self.quark_default_download_headers,
+                        download_url_status=self.quark_audio_link_tester.inspect(download_url, request_overrides), default_download_headers=self.quark_default_download_headers,
                     )
-                    song_info.download_url_status['probe_status'] = self.quark_audio_link_tester.probe(song_info.download_url, request_overrides)
                     song_info.file_size = song_info.download_url_status['probe_status']['file_size']
                     song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL', )) else song_info.ext
                     if song_info.with_valid_download_url: break
@@ -107,10 +107,9 @@ class HTQYYMusicClient(BaseMusicClient):
                 song_info = SongInfo(
                     raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['title'], None)), singers=legalizestring(safeextractfromdict(search_result, ['artist'], None)), 
                     album=legalizestring(safeextractfromdict(search_result, ['album'], None)), ext=download_result.get('format', 'mp3') or download_url.split('?')[0].split('.')[-1], file_size='NULL', identifier=search_result.get('id') or search_result.get('sid'), duration='-:-:-', 
-                    lyric='NULL', cover_url=safeextractfromdict(download_result, ['imgUrl'], None), download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                    lyric='NULL', cover_url=safeextractfromdict(download_result, ['imgUrl'], None), download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
                 )
                 if not song_info.with_valid_download_url: continue
-                song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
                 song_info.file_size = song_info.download_url_status['probe_status']['file_size']
                 song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL', )) else song_info.ext
                 # --append to song_infos
@@ -90,11 +90,10 @@ class JamendoMusicClient(BaseMusicClient):
                         singers=legalizestring(safeextractfromdict(search_result, ['artist', 'name'], None)), album=legalizestring(safeextractfromdict(search_result, ['album', 'name'], None)),
                         ext='mp3', file_size='NULL', identifier=search_result['id'], duration_s=safeextractfromdict(search_result, ['duration'], 0), duration=seconds2hms(search_result.get('duration', 0)),
                         lyric=download_result.get('lyrics') or 'NULL', cover_url=f"https://usercontent.jamendo.com?type=album&id={safeextractfromdict(search_result, ['album', 'id'], None)}&width=300&trackid={search_result['id']}",
-                        download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                        download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
                     )
                     if song_info.with_valid_download_url: break
                 if not song_info.with_valid_download_url: continue
-                song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
                 song_info.file_size = song_info.download_url_status['probe_status']['file_size']
                 song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL', )) else song_info.ext
                 # --append to song_infos
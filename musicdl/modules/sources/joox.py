@@ -82,9 +82,8 @@ class JooxMusicClient(BaseMusicClient):
                         singers=legalizestring(', '.join([singer.get('name') for singer in (safeextractfromdict(search_result, ['artist_list'], []) or []) if isinstance(singer, dict) and singer.get('name')])),
                         album=legalizestring(safeextractfromdict(search_result, ['album_name'], None)), ext=str(candidate['url']).split('?')[0].split('.')[-1], file_size='NULL', identifier=search_result['id'],
                         duration_s=download_result.get('minterval') or 0, duration=seconds2hms(download_result.get('minterval') or 0), lyric=None, cover_url=safeextractfromdict(download_result, ['imgSrc'], None), 
-                        download_url=candidate['url'], download_url_status=self.audio_link_tester.test(candidate['url'], request_overrides),
+                        download_url=candidate['url'], download_url_status=self.audio_link_tester.inspect(candidate['url'], request_overrides),
                     )
-                    song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
                     song_info.file_size = song_info.download_url_status['probe_status']['file_size']
                     song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL',)) else song_info.ext
                     if song_info.with_valid_download_url: break
@@ -12,7 +12,7 @@ import base64
 import hashlib
 import warnings
 import json_repair
-from .base import BaseMusicClient
+from .asyncbase import AsyncBaseMusicClient
 from urllib.parse import urlencode
 from rich.progress import Progress
 from ..utils.kugouutils import KugouMusicClientUtils, MUSIC_QUALITIES
@@ -21,7 +21,7 @@ warnings.filterwarnings('ignore')
 
 
 '''KugouMusicClient'''
-class KugouMusicClient(BaseMusicClient):
+class KugouMusicClient(AsyncBaseMusicClient):
     source = 'KugouMusicClient'
     def __init__(self, **kwargs):
         super(KugouMusicClient, self).__init__(**kwargs)
@@ -42,25 +42,23 @@ class KugouMusicClient(BaseMusicClient):
         # safe fetch filesize func
         safe_fetch_filesize_func = lambda meta: (lambda s: (lambda: float(s))() if s.replace('.', '', 1).isdigit() else 0)(str(meta.get('size', '0.00MB')).removesuffix('MB').strip()) if isinstance(meta, dict) else 0
         # parse
-        for quality in MUSIC_QUALITIES:
-            try: resp = curl_cffi.requests.get(f"https://music-api2.cenguigui.cn/?kg=&id={file_hash}&type=song&format=json&level={quality}", timeout=10, impersonate="chrome131", verify=False, **request_overrides); resp.raise_for_status()
-            except Exception: break
+        def _resolvequality(quality):
+            resp = curl_cffi.requests.get(f"https://music-api2.cenguigui.cn/?kg=&id={file_hash}&type=song&format=json&level={quality}", timeout=10, impersonate="chrome131", verify=False, **request_overrides); resp.raise_for_status()
             download_result = json_repair.loads(resp.text)
-            if 'data' not in download_result or (safe_fetch_filesize_func(download_result['data']) < 1): continue
+            if 'data' not in download_result or (safe_fetch_filesize_func(download_result['data']) < 1): return None
             download_url = safeextractfromdict(download_result, ['data', 'url'], '')
-            if not download_url: continue
+            if not download_url: return None
             song_info = SongInfo(
                 raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(download_result, ['data', 'name'], None)),
                 singers=legalizestring(safeextractfromdict(download_result, ['data', 'artist'], None)), album=legalizestring(search_result.get('album_name')), ext=download_url.split('?')[0].split('.')[-1], 
                 file_size=str(safeextractfromdict(download_result, ['data', 'size'], "")).removesuffix('MB').strip() + ' MB', identifier=file_hash, duration_s=safeextractfromdict(search_result, ['duration'], 0), 
                 duration=seconds2hms(safeextractfromdict(search_result, ['duration'], 0)), lyric='NULL', cover_url=safeextractfromdict(download_result, ['data', 'pic'], ""), download_url=download_url, 
-                download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
-            song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-            if song_info.with_valid_download_url: break
+            return song_info
         # return
-        return song_info
+        return self._resolvequalityladder(MUSIC_QUALITIES, _resolvequality)
     '''_parsewiththirdpartapis'''
     def _parsewiththirdpartapis(self, file_hash: str, search_result: dict, request_overrides: dict = None):
         if self.default_cookies or request_overrides.get('cookies'): return SongInfo(source=self.source)
@@ -89,12 +87,84 @@ class KugouMusicClient(BaseMusicClient):
             count += page_size
         # return
         return search_urls
+    '''_listsearchresult'''
+    def _listsearchresult(self, search_result: dict) -> SongInfo:
+        return SongInfo(
+            source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['songname'], None) or safeextractfromdict(search_result, ['songname_original'], None) or safeextractfromdict(search_result, ['filename'], None)),
+            singers=legalizestring(safeextractfromdict(search_result, ['singername'], None)), album=legalizestring(safeextractfromdict(search_result, ['album_name'], None)), file_size='NULL', identifier=search_result['hash'],
+            duration_s=safeextractfromdict(search_result, ['duration'], 0), duration=seconds2hms(search_result.get('duration')),
+        )
+    '''_resolvesearchresult'''
+    @usesearchheaderscookies
+    def _resolvesearchresult(self, search_result: dict, request_overrides: dict = None) -> SongInfo | None:
+        # init
+        request_overrides = request_overrides or {}
+        safe_fetch_filesize_func = lambda size: (lambda s: (lambda: float(s))() if s.replace('.', '', 1).isdigit() else 0)(size.removesuffix('MB').strip()) if isinstance(size, str) else 0
+        # --download results
+        song_info = SongInfo(source=self.source)
+        song_info_flac = self._parsewiththirdpartapis(file_hash=search_result['hash'], search_result=search_result, request_overrides=request_overrides)
+        # ----a lossless third-party result wins outright, otherwise the official quality tiers are resolved concurrently
+        def _resolvequality(quality, search_result=search_result, song_info_flac=song_info_flac):
+            try:
+                per_request_overrides = copy.deepcopy(request_overrides)
+                if 'impersonate' not in per_request_overrides and self.enable_curl_cffi: per_request_overrides['impersonate'] = random.choice(self.cc_impersonates)
+                self._autosetproxies()
+                per_request_overrides['proxies'] = per_request_overrides.pop('proxies', None) or self.session.proxies
+                download_result: dict = KugouMusicClientUtils.getsongurl(self.session, hash_value=search_result['hash'], quality=quality, request_overrides=per_request_overrides, cookies=copy.deepcopy(request_overrides.get('cookies') or self.default_cookies))
+                download_url = safeextractfromdict(download_result, ['url'], '') or safeextractfromdict(download_result, ['backupUrl'], '')
+            except:
+                download_result, download_url = {}, None
+            if not download_url:
+                md5_hex = hashlib.md5((search_result['hash'] + 'kgcloudv2').encode("utf-8")).hexdigest()
+                try:
+                    resp = self.get(f"https://trackercdn.kugou.com/i/v2/?cdnBackup=1&behavior=download&pid=1&cmd=21&appid=1001&hash={search_result['hash']}&key={md5_hex}", **request_overrides)
+                    resp.raise_for_status()
+                    download_result: dict = resp2json(resp)
+                    download_url = (
+                        safeextractfromdict(download_result, ['url'], '') or safeextractfromdict(download_result, ['backup_url'], '') or safeextractfromdict(download_result, ['backupUrl'], '') or 
+                        safeextractfromdict(download_result, ['mp3Url'], '') or safeextractfromdict(download_result, ['backupMp3Url'], '')
+                    )
+                except:
+                    return None
+            if download_url and isinstance(download_url, (list, tuple)): download_url = list(download_url)[0]
+            if not download_url or not str(download_url).startswith('http'): return None
+            song_info = SongInfo(
+                raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['songname'], None) or safeextractfromdict(search_result, ['songname_original'], None) or safeextractfromdict(search_result, ['filename'], None)),
+                singers=legalizestring(safeextractfromdict(search_result, ['singername'], None)), album=legalizestring(safeextractfromdict(search_result, ['album_name'], None)), ext=download_result.get('extName') or download_url.split('?')[0].split('.')[-1] or 'mp3', file_size_bytes=download_result.get('fileSize', 0),
+                file_size=byte2mb(download_result.get('fileSize', 0)), identifier=search_result['hash'], duration_s=safeextractfromdict(search_result, ['duration'], 0), duration=seconds2hms(search_result.get('duration')), lyric='NULL', cover_url=safeextractfromdict(search_result, ['trans_param', 'union_cover'], ""),
+                download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
+            )
+            song_info.file_size = song_info.download_url_status['probe_status']['file_size']
+            song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] != 'NULL') else song_info.ext
+            if song_info.cover_url and isinstance(song_info.cover_url, str): song_info.cover_url = song_info.cover_url.format(size=300)
+            if song_info_flac.with_valid_download_url and (safe_fetch_filesize_func(song_info.file_size) < safe_fetch_filesize_func(song_info_flac.file_size)): song_info = song_info_flac
+            return song_info
+        if song_info_flac.with_valid_download_url and song_info_flac.ext in ('flac',): song_info = song_info_flac
+        else: song_info = self._resolvequalityladder(MUSIC_QUALITIES, _resolvequality, default=song_info, stop_on_error=False)
+        if not song_info.with_valid_download_url: song_info = song_info_flac
+        if not song_info.with_valid_download_url: return None
+        # --lyric results
+        params = {'keyword': search_result.get('filename', ''), 'duration': search_result.get('duration', '99999'), 'hash': search_result['hash']}
+        try:
+            resp = self.get('http://lyrics.kugou.com/search', params=params, **request_overrides)
+            resp.raise_for_status()
+            lyric_result = resp2json(resp=resp)
+            resp = self.get(f"http://lyrics.kugou.com/download?ver=1&client=pc&id={lyric_result['candidates'][0]['id']}&accesskey={lyric_result['candidates'][0]['accesskey']}&fmt=lrc&charset=utf8", **request_overrides)
+            resp.raise_for_status()
+            lyric_result['lyrics.kugou.com/download'] = resp2json(resp=resp)
+            lyric = lyric_result['lyrics.kugou.com/download']['content']
+            lyric = cleanlrc(base64.b64decode(lyric).decode('utf-8'))
+        except:
+            lyric_result, lyric = dict(), 'NULL'
+        song_info.raw_data['lyric'] = lyric_result
+        song_info.lyric = lyric
+        # return
+        return song_info
     '''_search'''
     @usesearchheaderscookies
     def _search(self, keyword: str = '', search_url: str = '', request_overrides: dict = None, song_infos: list = [], progress: Progress = None, progress_id: int = 0):
         # init
         request_overrides = request_overrides or {}
-        safe_fetch_filesize_func = lambda size: (lambda s: (lambda: float(s))() if s.replace('.', '', 1).isdigit() else 0)(size.removesuffix('MB').strip()) if isinstance(size, str) else 0
         # successful
         try:
             # --search results
@@ -102,64 +172,9 @@ class KugouMusicClient(BaseMusicClient):
             resp.raise_for_status()
             search_results = resp2json(resp)['data']['info']
             for search_result in search_results:
-                # --download results
+                # --lazy search only lists the row, otherwise download url and lyric are resolved right away
                 if not isinstance(search_result, dict) or ('hash' not in search_result): continue
-                song_info = SongInfo(source=self.source)
-                song_info_flac = self._parsewiththirdpartapis(file_hash=search_result['hash'], search_result=search_result, request_overrides=request_overrides)
-                for quality in MUSIC_QUALITIES:
-                    if song_info_flac.with_valid_download_url and song_info_flac.ext in ('flac',): song_info = song_info_flac; break
-                    try:
-                        per_request_overrides = copy.deepcopy(request_overrides)
-                        if 'impersonate' not in per_request_overrides and self.enable_curl_cffi: per_request_overrides['impersonate'] = random.choice(self.cc_impersonates)
-                        self._autosetproxies()
-                        per_request_overrides['proxies'] = per_request_overrides.pop('proxies', None) or self.session.proxies
-                        download_result: dict = KugouMusicClientUtils.getsongurl(self.session, hash_value=search_result['hash'], quality=quality, request_overrides=per_request_overrides, cookies=copy.deepcopy(request_overrides.get('cookies') or self.default_cookies))
-                        download_url = safeextractfromdict(download_result, ['url'], '') or safeextractfromdict(download_result, ['backupUrl'], '')
-                    except:
-                        download_result, download_url = {}, None
-                    if not download_url:
-                        md5_hex = hashlib.md5((search_result['hash'] + 'kgcloudv2').encode("utf-8")).hexdigest()
-                        try:
-                            resp = self.get(f"https://trackercdn.kugou.com/i/v2/?cdnBackup=1&behavior=download&pid=1&cmd=21&appid=1001&hash={search_result['hash']}&key={md5_hex}", **request_overrides)
-                            resp.raise_for_status()
-                            download_result: dict = resp2json(resp)
-                            download_url = (
-                                safeextractfromdict(download_result, ['url'], '') or safeextractfromdict(download_result, ['backup_url'], '') or safeextractfromdict(download_result, ['backupUrl'], '') or 
-                                safeextractfromdict(download_result, ['mp3Url'], '') or safeextractfromdict(download_result, ['backupMp3Url'], '')
-                            )
-                        except:
-                            continue
-                    if download_url and isinstance(download_url, (list, tuple)): download_url = list(download_url)[0]
-                    if not download_url or not str(download_url).startswith('http'): continue
-                    song_info = SongInfo(
-                        raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['songname'], None) or safeextractfromdict(search_result, ['songname_original'], None) or safeextractfromdict(search_result, ['filename'], None)),
-                        singers=legalizestring(safeextractfromdict(search_result, ['singername'], None)), album=legalizestring(safeextractfromdict(search_result, ['album_name'], None)), ext=download_result.get('extName') or download_url.split('?')[0].split('.')[-1] or 'mp3', file_size_bytes=download_result.get('fileSize', 0),
-                        file_size=byte2mb(download_result.get('fileSize', 0)), identifier=search_result['hash'], duration_s=safeextractfromdict(search_result, ['duration'], 0), duration=seconds2hms(search_result.get('duration')), lyric='NULL', cover_url=safeextractfromdict(search_result, ['trans_param', 'union_cover'], ""),
-                        download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
-                    )
-                    song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
-                    song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-                    song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] != 'NULL') else song_info.ext
-                    if song_info.cover_url and isinstance(song_info.cover_url, str): song_info.cover_url = song_info.cover_url.format(size=300)
-                    if song_info_flac.with_valid_download_url and (safe_fetch_filesize_func(song_info.file_size) < safe_fetch_filesize_func(song_info_flac.file_size)): song_info = song_info_flac
-                    if song_info.with_valid_download_url: break
-                if not song_info.with_valid_download_url: song_info = song_info_flac
-                if not song_info.with_valid_download_url: continue
-                # --lyric results
-                params = {'keyword': search_result.get('filename', ''), 'duration': search_result.get('duration', '99999'), 'hash': search_result['hash']}
-                try:
-                    resp = self.get('http://lyrics.kugou.com/search', params=params, **request_overrides)
-                    resp.raise_for_status()
-                    lyric_result = resp2json(resp=resp)
-                    resp = self.get(f"http://lyrics.kugou.com/download?ver=1&client=pc&id={lyric_result['candidates'][0]['id']}&accesskey={lyric_result['candidates'][0]['accesskey']}&fmt=lrc&charset=utf8", **request_overrides)
-                    resp.raise_for_status()
-                    lyric_result['lyrics.kugou.com/download'] = resp2json(resp=resp)
-                    lyric = lyric_result['lyrics.kugou.com/download']['content']
-                    lyric = cleanlrc(base64.b64decode(lyric).decode('utf-8'))
-                except:
-                    lyric_result, lyric = dict(), 'NULL'
-                song_info.raw_data['lyric'] = lyric_result
-                song_info.lyric = lyric
+                if (song_info := self._listorresolve(search_result, request_overrides)) is None: continue
                 # --append to song_infos
                 song_infos.append(song_info)
                 # --judgement for search_size
@@ -170,4 +185,22 @@ class KugouMusicClient(BaseMusicClient):
         except Exception as err:
             progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Error: {err})")
         # return
+        return song_infos
+    '''_asearch'''
+    async def _asearch(self, keyword: str = '', search_url: str = '', request_overrides: dict = None, song_infos: list = [], progress: Progress = None, progress_id: int = 0):
+        # init
+        request_overrides = request_overrides or {}
+        # successful
+        try:
+            # --search results, lazy rows are only listed, eager ones are resolved off the event loop (see AsyncBaseMusicClient._alistorresolve)
+            resp = await self.aget(search_url, **request_overrides)
+            resp.raise_for_status()
+            candidates = [(r, {}) for r in resp2json(resp)['data']['info'] if isinstance(r, dict) and ('hash' in r)]
+            await self._alistorresolve(candidates, request_overrides, song_infos)
+            # --update progress
+            progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Success)")
+        # failure
+        except Exception as err:
+            progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Error: {err})")
+        # return
         return song_infos
\ No newline at end of file
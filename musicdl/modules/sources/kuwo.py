@@ -12,7 +12,7 @@ import copy
 import random
 import base64
 import warnings
-from .base import BaseMusicClient
+from .asyncbase import AsyncBaseMusicClient
 from rich.progress import Progress
 from pathvalidate import sanitize_filepath
 from ..utils.hosts import KUWO_MUSIC_HOSTS
@@ -24,7 +24,7 @@ warnings.filterwarnings('ignore')
 
 
 '''KuwoMusicClient'''
-class KuwoMusicClient(BaseMusicClient):
+class KuwoMusicClient(AsyncBaseMusicClient):
     source = 'KuwoMusicClient'
     MUSIC_QUALITIES = [(22000, 'flac'), (320, 'mp3')] # playable flac and mp3 formats
     ENC_MUSIC_QUALITIES = [(4000, '4000kflac'), (2000, '2000kflac'), (320, '320kmp3'), (192, '192kmp3'), (128, '128kmp3')] # encrypted mgg format
@@ -44,23 +44,21 @@ class KuwoMusicClient(BaseMusicClient):
         REQUEST_KEYS = ['em41NHhnUzNOVTBjT0tFTzB5UQ==', 'eHdUNVl6UkV2SXdLOExWWjcybg==']
         MUSIC_QUALITIES = ["hires", "lossless", "SQ", "exhigh", "standard"]
         # parse
-        for quality in MUSIC_QUALITIES:
-            try: resp = self.get(f"https://api.yaohud.cn/api/music/kuwo?key={decrypt_func(random.choice(REQUEST_KEYS))}&msg={keyword}&n={num}&size={quality}", timeout=10, **request_overrides); resp.raise_for_status()
-            except Exception: break
+        def _resolvequality(quality):
+            resp = self.get(f"https://api.yaohud.cn/api/music/kuwo?key={decrypt_func(random.choice(REQUEST_KEYS))}&msg={keyword}&n={num}&size={quality}", timeout=10, **request_overrides); resp.raise_for_status()
             download_result = resp2json(resp=resp)
             download_url = safeextractfromdict(download_result, ['data', 'vipmusic', 'url'], '')
-            if not download_url: continue
+            if not download_url: return None
             song_info = SongInfo(
                 raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(download_result, ['data', 'name'], None)), 
                 singers=legalizestring(safeextractfromdict(download_result, ['data', 'songname'], None)), album=legalizestring(safeextractfromdict(download_result, ['data', 'album'], None)),
                 ext=download_url.split('?')[0].split('.')[-1], file_size='NULL', identifier=song_id, duration_s=search_result.get('DURATION', None) or search_result.get('duration', None) or 0, 
                 duration=seconds2hms(search_result.get('DURATION', None) or search_result.get('duration', None) or 0), lyric='NULL', cover_url=safeextractfromdict(download_result, ['data', 'picture'], ""),
-                download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
-            song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-            if song_info.with_valid_download_url: break
-        return song_info
+            return song_info
+        return self._resolvequalityladder(MUSIC_QUALITIES, _resolvequality)
     '''_parsewithcggapi'''
     def _parsewithcggapi(self, keyword: str, search_result: dict, request_overrides: dict = None, page_no: int = 1, num: int = 1):
         # init
@@ -70,35 +68,27 @@ class KuwoMusicClient(BaseMusicClient):
         # safe fetch filesize func
         safe_fetch_filesize_func = lambda meta: (lambda s: (lambda: float(s))() if s.replace('.', '', 1).isdigit() else 0)(str(meta.get('size', '0.00MB')).removesuffix('MB').strip()) if isinstance(meta, dict) else 0
         # parse
-        for quality in MUSIC_QUALITIES[::-1][3:]:
-            try: resp = curl_cffi.requests.get(f"https://kw-api.cenguigui.cn/?id={song_id}&type=song&level={quality}&format=json", timeout=10, impersonate="chrome131", verify=False, **request_overrides); resp.raise_for_status()
-            except Exception: break
+        def _resolvequality(quality):
+            resp = curl_cffi.requests.get(f"https://kw-api.cenguigui.cn/?id={song_id}&type=song&level={quality}&format=json", timeout=10, impersonate="chrome131", verify=False, **request_overrides); resp.raise_for_status()
             download_result = resp2json(resp=resp)
-            if 'data' not in download_result or (safe_fetch_filesize_func(download_result['data']) < 1): continue
+            if 'data' not in download_result or (safe_fetch_filesize_func(download_result['data']) < 1): return None
             download_url = safeextractfromdict(download_result, ['data', 'url'], '')
-            if not download_url: continue
+            if not download_url: return None
             song_info = SongInfo(
                 raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(download_result, ['data', 'name'], None)),
                 singers=legalizestring(safeextractfromdict(download_result, ['data', 'artist'], None)), album=legalizestring(safeextractfromdict(download_result, ['data', 'album'], None)), 
                 ext=download_url.split('?')[0].split('.')[-1], file_size=str(safeextractfromdict(download_result, ['data', 'size'], "")).removesuffix('MB').strip() + ' MB', identifier=song_id,
                 duration_s=safeextractfromdict(download_result, ['data', 'duration'], 0), duration=seconds2hms(safeextractfromdict(download_result, ['data', 'duration'], 0)),
                 lyric=cleanlrc(safeextractfromdict(download_result, ['data', 'lyric'], "")), cover_url=safeextractfromdict(download_result, ['data', 'pic'], ""), download_url=download_url,
-                download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
-            song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-            if song_info.with_valid_download_url: break
-        return song_info
+            return song_info
+        return self._resolvequalityladder(MUSIC_QUALITIES[::-1][3:], _resolvequality)
     '''_parsewiththirdpartapis'''
     def _parsewiththirdpartapis(self, keyword: str, search_result: dict, request_overrides: dict = None, page_no: int = 1, num: int = 1):
         if self.default_cookies or request_overrides.get('cookies'): return SongInfo(source=self.source)
-        for imp_func in [self._parsewithcggapi, self._parsewithyaohudapi]:
-            try:
-                song_info_flac = imp_func(keyword, search_result, request_overrides, page_no, num)
-                if song_info_flac.with_valid_download_url: break
-            except:
-                song_info_flac = SongInfo(source=self.source)
-        return song_info_flac
+        return self._racethirdpartapis([self._parsewithcggapi, self._parsewithyaohudapi], keyword, search_result, request_overrides, page_no, num)
     '''_constructsearchurls'''
     def _constructsearchurls(self, keyword: str, rule: dict = None, request_overrides: dict = None):
         # init
@@ -119,13 +109,62 @@ class KuwoMusicClient(BaseMusicClient):
             count += page_size
         # return
         return search_urls
+    '''_listsearchresult'''
+    def _listsearchresult(self, search_result: dict) -> SongInfo:
+        return SongInfo(
+            source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['SONGNAME'], None)), singers=legalizestring(safeextractfromdict(search_result, ['ARTIST'], None)), album=legalizestring(safeextractfromdict(search_result, ['ALBUM'], None)),
+            file_size='NULL', identifier=search_result['MUSICRID'].removeprefix('MUSIC_'), duration_s=safeextractfromdict(search_result, ['DURATION'], 0), duration=seconds2hms(safeextractfromdict(search_result, ['DURATION'], 0)), cover_url=safeextractfromdict(search_result, ['hts_MVPIC'], ""),
+        )
+    '''_resolvesearchresult'''
+    @usesearchheaderscookies
+    def _resolvesearchresult(self, search_result: dict, request_overrides: dict = None, keyword: str = '', page_no: int = 1, num: int = 1) -> SongInfo | None:
+        # init
+        request_overrides = request_overrides or {}
+        safe_fetch_filesize_func = lambda size: (lambda s: (lambda: float(s))() if s.replace('.', '', 1).isdigit() else 0)(size.removesuffix('MB').strip()) if isinstance(size, str) else 0
+        # --download results
+        song_info = SongInfo(source=self.source)
+        song_info_flac = self._parsewiththirdpartapis(keyword=keyword, search_result=search_result, request_overrides=request_overrides, page_no=page_no, num=num)
+        # ----a lossless third-party result wins outright, otherwise quality tiers are resolved concurrently
+        def _resolvequality(quality, search_result=search_result, song_info_flac=song_info_flac):
+            query = f"user=0&corp=kuwo&source=kwplayer_ar_5.1.0.0_B_jiakong_vh.apk&p2p=1&type=convert_url2&sig=0&format={quality[1]}&rid={search_result['MUSICRID'].removeprefix('MUSIC_')}"
+            try: (resp := self.get(f"http://mobi.kuwo.cn/mobi.s?f=kuwo&q={KuwoMusicClientUtils.encryptquery(query)}", headers={"user-agent": "okhttp/3.10.0"}, **request_overrides)).raise_for_status(); download_result = resp.text
+            except Exception: return None
+            download_url = re.search(r'http[^\s$\"]+', download_result)
+            if not download_url: return None
+            download_url = download_url.group(0)
+            song_info = SongInfo(
+                raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['SONGNAME'], None)),
+                singers=legalizestring(safeextractfromdict(search_result, ['ARTIST'], None)), album=legalizestring(safeextractfromdict(search_result, ['ALBUM'], None)), ext=download_url.split('?')[0].split('.')[-1], 
+                file_size='NULL', identifier=search_result['MUSICRID'].removeprefix('MUSIC_'), duration_s=safeextractfromdict(search_result, ['DURATION'], 0), duration=seconds2hms(safeextractfromdict(search_result, ['DURATION'], 0)),
+                lyric='NULL', cover_url=safeextractfromdict(search_result, ['hts_MVPIC'], ""), download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
+            )
+            song_info.file_size = song_info.download_url_status['probe_status']['file_size']
+            song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] != 'NULL') else song_info.ext
+            if song_info_flac.with_valid_download_url and (safe_fetch_filesize_func(song_info.file_size) < safe_fetch_filesize_func(song_info_flac.file_size)): song_info = song_info_flac
+            return song_info
+        if song_info_flac.with_valid_download_url and song_info_flac.ext in ('flac',): song_info = song_info_flac
+        else: song_info = self._resolvequalityladder(KuwoMusicClient.MUSIC_QUALITIES, _resolvequality, default=song_info, stop_on_error=False)
+        if not song_info.with_valid_download_url: song_info = song_info_flac
+        if not song_info.with_valid_download_url: return None
+        # --lyric results
+        params = {'musicId': search_result['MUSICRID'].removeprefix('MUSIC_'), 'httpsStatus': '1'}
+        try:
+            resp = self.get('http://m.kuwo.cn/newh5/singles/songinfoandlrc', params=params, **request_overrides)
+            resp.raise_for_status()
+            lyric_result: dict = resp2json(resp)
+            lyric = cleanlrc(kuwolyricslisttolrc(safeextractfromdict(lyric_result, ['data', 'lrclist'], [])))
+        except:
+            lyric_result, lyric = {}, 'NULL'
+        song_info.raw_data['lyric'] = lyric_result
+        song_info.lyric = lyric
+        # return
+        return song_info
     '''_search'''
     @usesearchheaderscookies
     def _search(self, keyword: str = '', search_url: str = '', request_overrides: dict = None, song_infos: list = [], progress: Progress = None, progress_id: int = 0):
         # init
         request_overrides = request_overrides or {}
         page_no = int(parse_qs(urlparse(search_url).query, keep_blank_values=True).get('pn')[0]) + 1
-        safe_fetch_filesize_func = lambda size: (lambda s: (lambda: float(s))() if s.replace('.', '', 1).isdigit() else 0)(size.removesuffix('MB').strip()) if isinstance(size, str) else 0
         # successful
         try:
             # --search results
@@ -133,42 +172,9 @@ class KuwoMusicClient(BaseMusicClient):
             resp.raise_for_status()
             search_results = resp2json(resp)['abslist']
             for search_result_idx, search_result in enumerate(search_results):
-                # --download results
+                # --lazy search only lists the row, otherwise download url and lyric are resolved right away
                 if not isinstance(search_result, dict) or ('MUSICRID' not in search_result): continue
-                song_info = SongInfo(source=self.source)
-                song_info_flac = self._parsewiththirdpartapis(keyword=keyword, search_result=search_result, request_overrides=request_overrides, page_no=page_no, num=search_result_idx+1)
-                for quality in KuwoMusicClient.MUSIC_QUALITIES:
-                    if song_info_flac.with_valid_download_url and song_info_flac.ext in ('flac',): song_info = song_info_flac; break
-                    query = f"user=0&corp=kuwo&source=kwplayer_ar_5.1.0.0_B_jiakong_vh.apk&p2p=1&type=convert_url2&sig=0&format={quality[1]}&rid={search_result['MUSICRID'].removeprefix('MUSIC_')}"
-                    try: (resp := self.get(f"http://mobi.kuwo.cn/mobi.s?f=kuwo&q={KuwoMusicClientUtils.encryptquery(query)}", headers={"user-agent": "okhttp/3.10.0"}, **request_overrides)).raise_for_status(); download_result = resp.text
-                    except Exception: continue
-                    download_url = re.search(r'http[^\s$\"]+', download_result)
-                    if not download_url: continue
-                    download_url = download_url.group(0)
-                    song_info = SongInfo(
-                        raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['SONGNAME'], None)),
-                        singers=legalizestring(safeextractfromdict(search_result, ['ARTIST'], None)), album=legalizestring(safeextractfromdict(search_result, ['ALBUM'], None)), ext=download_url.split('?')[0].split('.')[-1], 
-                        file_size='NULL', identifier=search_result['MUSICRID'].removeprefix('MUSIC_'), duration_s=safeextractfromdict(search_result, ['DURATION'], 0), duration=seconds2hms(safeextractfromdict(search_result, ['DURATION'], 0)),
-                        lyric='NULL', cover_url=safeextractfromdict(search_result, ['hts_MVPIC'], ""), download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
-                    )
-                    song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
-                    song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-                    song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] != 'NULL') else song_info.ext
-                    if song_info_flac.with_valid_download_url and (safe_fetch_filesize_func(song_info.file_size) < safe_fetch_filesize_func(song_info_flac.file_size)): song_info = song_info_flac
-                    if song_info.with_valid_download_url: break
-                if not song_info.with_valid_download_url: song_info = song_info_flac
-                if not song_info.with_valid_download_url: continue
-                # --lyric results
-                params = {'musicId': search_result['MUSICRID'].removeprefix('MUSIC_'), 'httpsStatus': '1'}
-                try:
-                    resp = self.get('http://m.kuwo.cn/newh5/singles/songinfoandlrc', params=params, **request_overrides)
-                    resp.raise_for_status()
-                    lyric_result: dict = resp2json(resp)
-                    lyric = cleanlrc(kuwolyricslisttolrc(safeextractfromdict(lyric_result, ['data', 'lrclist'], [])))
-                except:
-                    lyric_result, lyric = {}, 'NULL'
-                song_info.raw_data['lyric'] = lyric_result
-                song_info.lyric = lyric
+                if (song_info := self._listorresolve(search_result, request_overrides, keyword=keyword, page_no=page_no, num=search_result_idx+1)) is None: continue
                 # --append to song_infos
                 song_infos.append(song_info)
                 # --judgement for search_size
@@ -180,6 +186,25 @@ class KuwoMusicClient(BaseMusicClient):
             progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Error: {err})")
         # return
         return song_infos
+    '''_asearch'''
+    async def _asearch(self, keyword: str = '', search_url: str = '', request_overrides: dict = None, song_infos: list = [], progress: Progress = None, progress_id: int = 0):
+        # init
+        request_overrides = request_overrides or {}
+        page_no = int(parse_qs(urlparse(search_url).query, keep_blank_values=True).get('pn')[0]) + 1
+        # successful
+        try:
+            # --search results, lazy rows are only listed, eager ones are resolved off the event loop (see AsyncBaseMusicClient._alistorresolve)
+            resp = await self.aget(search_url, **request_overrides)
+            resp.raise_for_status()
+            candidates = [(r, dict(keyword=keyword, page_no=page_no, num=idx+1)) for idx, r in enumerate(resp2json(resp)['abslist']) if isinstance(r, dict) and ('MUSICRID' in r)]
+            await self._alistorresolve(candidates, request_overrides, song_infos)
+            # --update progress
+            progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Success)")
+        # failure
+        except Exception as err:
+            progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Error: {err})")
+        # return
+        return song_infos
     '''parseplaylist'''
     @useparseheaderscookies
     def parseplaylist(self, playlist_url: str, request_overrides: dict = None):
@@ -125,9 +125,8 @@ class LivePOOMusicClient(BaseMusicClient):
                 raw_data={'search': search_result, 'download': download_result, 'lyric': lyric_result}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['title'], None)), 
                 singers=legalizestring(safeextractfromdict(search_result, ['artist'], None)), album='NULL', ext='mp3', file_size='NULL', identifier=search_result['id'], duration_s=duration_s, 
                 duration=seconds2hms(duration_s), lyric=lyric, cover_url=safeextractfromdict(download_result, ['cover_url'], None), download_url=download_url,
-                download_url_status=self.quark_audio_link_tester.test(download_url, request_overrides), default_download_headers=self.quark_default_download_headers,
+                download_url_status=self.quark_audio_link_tester.inspect(download_url, request_overrides), default_download_headers=self.quark_default_download_headers,
             )
-            song_info.download_url_status['probe_status'] = self.quark_audio_link_tester.probe(song_info.download_url, request_overrides)
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
             song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL', )) else song_info.ext
             if song_info.with_valid_download_url: break
@@ -152,9 +151,8 @@ class LivePOOMusicClient(BaseMusicClient):
         song_info = SongInfo(
             raw_data={'search': search_result, 'download': download_result, 'lyric': lyric_result}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['title'], None)), 
             singers=legalizestring(safeextractfromdict(search_result, ['artist'], None)), album='NULL', ext=download_url.split('?')[0].split('.')[-1], file_size='NULL', identifier=search_result['id'], 
-            duration='-:-:-', lyric=lyric, cover_url=safeextractfromdict(download_result, ['cover_url'], None), download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides), 
+            duration='-:-:-', lyric=lyric, cover_url=safeextractfromdict(download_result, ['cover_url'], None), download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides), 
         )
-        song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
         song_info.file_size = song_info.download_url_status['probe_status']['file_size']
         song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL', )) else song_info.ext
         if not song_info.lyric or '歌词获取失败' in song_info.lyric: song_info.lyric = 'NULL'
@@ -9,14 +9,14 @@ WeChat Official Account (微信公众号):
 import re
 import copy
 import requests
-from .base import BaseMusicClient
+from .asyncbase import AsyncBaseMusicClient
 from rich.progress import Progress
 from urllib.parse import urlencode
 from ..utils import byte2mb, resp2json, seconds2hms, legalizestring, safeextractfromdict, usesearchheaderscookies, cleanlrc, SongInfo
 
 
 '''MiguMusicClient'''
-class MiguMusicClient(BaseMusicClient):
+class MiguMusicClient(AsyncBaseMusicClient):
     source = 'MiguMusicClient'
     MUSIC_QUALITIES = {'LQ': 'mp3', 'PQ': 'mp3', 'HQ': 'mp3', 'SQ': 'flac', 'ZQ': 'flac', 'Z3D': 'flac', 'ZQ24': 'flac', 'ZQ32': 'flac', }
     def __init__(self, **kwargs):
@@ -58,12 +58,90 @@ class MiguMusicClient(BaseMusicClient):
             count += page_size
         # return
         return search_urls
+    '''_safefetchfilesize'''
+    @staticmethod
+    def _safefetchfilesize(meta: dict):
+        return (lambda s: (lambda: float(s))() if s.replace('.', '', 1).isdigit() else 0)(str(meta.get('size') or meta.get('iosSize') or meta.get('androidSize') or '0').removesuffix('MB').strip()) if isinstance(meta, dict) else 0
+    '''_listrates'''
+    def _listrates(self, search_result: dict) -> list[dict]:
+        rates = sorted((search_result.get('rateFormats', []) or []) + (search_result.get('newRateFormats', []) or []), key=lambda x: int(self._safefetchfilesize(x)), reverse=True)
+        return [rate for rate in rates if isinstance(rate, dict) and byte2mb(self._safefetchfilesize(rate)) != 'NULL' and rate.get('formatType', '') and rate.get('resourceType', '')]
+    '''_constructlistenurl'''
+    def _constructlistenurl(self, search_result: dict, rate: dict) -> str:
+        return f"https://c.musicapp.migu.cn/MIGUM3.0/strategy/listen-url/v2.4?resourceType={rate['resourceType']}&netType=01&scene=&toneFlag={rate['formatType']}&contentId={search_result['contentId']}&copyrightId={search_result['copyrightId']}&lowerQualityContentId={search_result['contentId']}"
+    '''_constructsonginfo'''
+    def _constructsonginfo(self, search_result: dict, rate: dict, download_result: dict, request_overrides: dict = None) -> SongInfo | None:
+        request_overrides = request_overrides or {}
+        download_url = safeextractfromdict(download_result, ['data', 'url'], "") or f"https://app.pd.nf.migu.cn/MIGUM3.0/v1.0/content/sub/listenSong.do?channel=mx&copyrightId={search_result['copyrightId']}&contentId={search_result['contentId']}&toneFlag={rate['formatType']}&resourceType={rate['resourceType']}&userId=15548614588710179085069&netType=00"
+        if not download_url: return None
+        download_url = re.sub(r'(?<=/)MP3_128_16_Stero(?=/)', 'MP3_320_16_Stero', download_url)
+        song_info = SongInfo(
+            raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['name'], None)),
+            singers=legalizestring(', '.join([singer.get('name') for singer in (safeextractfromdict(search_result, ['singers'], []) or []) if isinstance(singer, dict) and singer.get('name')])),
+            album=legalizestring(', '.join([album.get('name') for album in (safeextractfromdict(search_result, ['albums'], []) or []) if isinstance(album, dict) and album.get('name')])),
+            ext=MiguMusicClient.MUSIC_QUALITIES.get(rate['formatType'], 'mp3'), file_size='NULL', identifier=search_result['contentId'], duration_s=safeextractfromdict(download_result, ['data', 'song', 'duration'], 0),
+            duration=seconds2hms(safeextractfromdict(download_result, ['data', 'song', 'duration'], 0)), lyric=None, cover_url=safeextractfromdict(search_result, ['imgItems', -1, 'img'], None), 
+            download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
+        )
+        song_info.file_size = song_info.download_url_status['probe_status']['file_size']
+        song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] != 'NULL') else song_info.ext
+        return song_info
+    '''_fetchlyric'''
+    def _fetchlyric(self, search_result: dict, song_info: SongInfo, request_overrides: dict = None) -> SongInfo:
+        request_overrides = request_overrides or {}
+        try:
+            lyric_url = safeextractfromdict(search_result, ['lyricUrl'], '').replace('http://', 'https://')
+            headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36", "Referer": "https://y.migu.cn/"}
+            resp = requests.get(lyric_url, headers=headers, allow_redirects=True, **request_overrides)
+            resp.raise_for_status()
+            resp.encoding = 'utf-8'
+            lyric, lyric_result = cleanlrc(resp.text), {'lyric': cleanlrc(resp.text)}
+        except:
+            lyric_result, lyric = {}, 'NULL'
+        song_info.raw_data['lyric'] = lyric_result
+        song_info.lyric = lyric
+        return song_info
+    '''_listsearchresult'''
+    def _listsearchresult(self, search_result: dict) -> SongInfo:
+        return SongInfo(
+            source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['name'], None)),
+            singers=legalizestring(', '.join([singer.get('name') for singer in (safeextractfromdict(search_result, ['singers'], []) or []) if isinstance(singer, dict) and singer.get('name')])),
+            album=legalizestring(', '.join([album.get('name') for album in (safeextractfromdict(search_result, ['albums'], []) or []) if isinstance(album, dict) and album.get('name')])),
+            file_size='NULL', identifier=search_result['contentId'], cover_url=safeextractfromdict(search_result, ['imgItems', -1, 'img'], None),
+        )
+    '''_resolvesearchresult'''
+    @usesearchheaderscookies
+    def _resolvesearchresult(self, search_result: dict, request_overrides: dict = None) -> SongInfo | None:
+        # init
+        request_overrides = request_overrides or {}
+        # --download results, the quality tiers are resolved concurrently and the best valid one wins
+        def _resolvequality(rate, search_result=search_result):
+            resp = self.get(self._constructlistenurl(search_result, rate), **request_overrides)
+            resp.raise_for_status()
+            return self._constructsonginfo(search_result, rate, resp2json(resp=resp), request_overrides)
+        song_info = self._resolvequalityladder(self._listrates(search_result), _resolvequality, stop_on_error=False)
+        if not song_info.with_valid_download_url: return None
+        # --lyric results
+        return self._fetchlyric(search_result, song_info, request_overrides)
+    '''_aresolvesearchresult'''
+    async def _aresolvesearchresult(self, search_result: dict, request_overrides: dict = None) -> SongInfo | None:
+        # native counterpart of _resolvesearchresult, listen-url lookups run on the event loop while link tests and lyrics stay blocking in worker threads
+        request_overrides = request_overrides or {}
+        for rate in self._listrates(search_result):
+            try:
+                resp = await self.aget(self._constructlistenurl(search_result, rate), **request_overrides)
+                resp.raise_for_status()
+                download_result = resp2json(resp=resp)
+            except:
+                continue
+            song_info = await self._athread(self._constructsonginfo, search_result, rate, download_result, request_overrides)
+            if song_info is not None and song_info.with_valid_download_url: return await self._athread(self._fetchlyric, search_result, song_info, request_overrides)
+        return None
     '''_search'''
     @usesearchheaderscookies
     def _search(self, keyword: str = '', search_url: str = '', request_overrides: dict = None, song_infos: list = [], progress: Progress = None, progress_id: int = 0):
         # init
         request_overrides = request_overrides or {}
-        safe_fetch_filesize_func = lambda meta: (lambda s: (lambda: float(s))() if s.replace('.', '', 1).isdigit() else 0)(str(meta.get('size') or meta.get('iosSize') or meta.get('androidSize') or '0').removesuffix('MB').strip()) if isinstance(meta, dict) else 0
         # successful
         try:
             # --search results
@@ -71,46 +149,9 @@ class MiguMusicClient(BaseMusicClient):
             resp.raise_for_status()
             search_results = resp2json(resp)['songResultData']['result']
             for search_result in search_results:
-                # --download results
+                # --lazy search only lists the row, otherwise download url and lyric are resolved right away
                 if not isinstance(search_result, dict) or ('copyrightId' not in search_result) or ('contentId' not in search_result): continue
-                song_info = SongInfo(source=self.source)
-                for rate in sorted((search_result.get('rateFormats', []) or []) + (search_result.get('newRateFormats', []) or []), key=lambda x: int(safe_fetch_filesize_func(x)), reverse=True):
-                    if not isinstance(rate, dict): continue
-                    if byte2mb(safe_fetch_filesize_func(rate)) == 'NULL' or (not rate.get('formatType', '')) or (not rate.get('resourceType', '')): continue
-                    try:
-                        resp = self.get(f"https://c.musicapp.migu.cn/MIGUM3.0/strategy/listen-url/v2.4?resourceType={rate['resourceType']}&netType=01&scene=&toneFlag={rate['formatType']}&contentId={search_result['contentId']}&copyrightId={search_result['copyrightId']}&lowerQualityContentId={search_result['contentId']}", **request_overrides)
-                        resp.raise_for_status()
-                        download_result = resp2json(resp=resp)
-                    except:
-                        continue
-                    download_url = safeextractfromdict(download_result, ['data', 'url'], "") or f"https://app.pd.nf.migu.cn/MIGUM3.0/v1.0/content/sub/listenSong.do?channel=mx&copyrightId={search_result['copyrightId']}&contentId={search_result['contentId']}&toneFlag={rate['formatType']}&resourceType={rate['resourceType']}&userId=15548614588710179085069&netType=00"
-                    if not download_url: continue
-                    download_url = re.sub(r'(?<=/)MP3_128_16_Stero(?=/)', 'MP3_320_16_Stero', download_url)
-                    song_info = SongInfo(
-                        raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['name'], None)),
-                        singers=legalizestring(', '.join([singer.get('name') for singer in (safeextractfromdict(search_result, ['singers'], []) or []) if isinstance(singer, dict) and singer.get('name')])),
-                        album=legalizestring(', '.join([album.get('name') for album in (safeextractfromdict(search_result, ['albums'], []) or []) if isinstance(album, dict) and album.get('name')])),
-                        ext=MiguMusicClient.MUSIC_QUALITIES.get(rate['formatType'], 'mp3'), file_size='NULL', identifier=search_result['contentId'], duration_s=safeextractfromdict(download_result, ['data', 'song', 'duration'], 0),
-                        duration=seconds2hms(safeextractfromdict(download_result, ['data', 'song', 'duration'], 0)), lyric=None, cover_url=safeextractfromdict(search_result, ['imgItems', -1, 'img'], None), 
-                        download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
-                    )
-                    song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
-                    song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-                    song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] != 'NULL') else song_info.ext
-                    if song_info.with_valid_download_url: break
-                if not song_info.with_valid_download_url: continue
-                # --lyric results
-                try:
-                    lyric_url = safeextractfromdict(search_result, ['lyricUrl'], '').replace('http://', 'https://')
-                    headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/143.0.0.0 Safari/537.36", "Referer": "https://y.migu.cn/"}
-                    resp = requests.get(lyric_url, headers=headers, allow_redirects=True, **request_overrides)
-                    resp.raise_for_status()
-                    resp.encoding = 'utf-8'
-                    lyric, lyric_result = cleanlrc(resp.text), {'lyric': cleanlrc(resp.text)}
-                except:
-                    lyric_result, lyric = {}, 'NULL'
-                song_info.raw_data['lyric'] = lyric_result
-                song_info.lyric = lyric
+                if (song_info := self._listorresolve(search_result, request_overrides)) is None: continue
                 # --append to song_infos
                 song_infos.append(song_info)
                 # --judgement for search_size
@@ -121,4 +162,22 @@ class MiguMusicClient(BaseMusicClient):
         except Exception as err:
             progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Error: {err})")
         # return
-        return song_infos
\ No newline at end of file
+        return song_infos
+    '''_asearch'''
+    async def _asearch(self, keyword: str = '', search_url: str = '', request_overrides: dict = None, song_infos: list = [], progress: Progress = None, progress_id: int = 0):
+        # init
+        request_overrides = request_overrides or {}
+        # successful
+        try:
+            # --search results, lazy rows are only listed, eager ones are resolved concurrently in batches of the still missing size (page order is kept)
+            resp = await self.aget(search_url, **request_overrides)
+            resp.raise_for_status()
+            candidates = [(r, {}) for r in resp2json(resp)['songResultData']['result'] if isinstance(r, dict) and ('copyrightId' in r) and ('contentId' in r)]
+            await self._alistorresolve(candidates, request_overrides, song_infos, aresolve=self._aresolvesearchresult)
+            # --update progress
+            progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Success)")
+        # failure
+        except Exception as err:
+            progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Error: {err})")
+        # return
+        return song_infos
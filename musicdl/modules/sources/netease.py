@@ -13,7 +13,7 @@ import copy
 import base64
 import random
 import warnings
-from .base import BaseMusicClient
+from .asyncbase import AsyncBaseMusicClient
 from pathvalidate import sanitize_filepath
 from urllib.parse import urlparse, parse_qs
 from ..utils.hosts import NETEASE_MUSIC_HOSTS, hostmatchessuffix, obtainhostname
@@ -24,7 +24,7 @@ warnings.filterwarnings('ignore')
 
 
 '''NeteaseMusicClient'''
-class NeteaseMusicClient(BaseMusicClient):
+class NeteaseMusicClient(AsyncBaseMusicClient):
     source = 'NeteaseMusicClient'
     def __init__(self, **kwargs):
         super(NeteaseMusicClient, self).__init__(**kwargs)
@@ -41,23 +41,21 @@ class NeteaseMusicClient(BaseMusicClient):
         # init
         request_overrides, song_id = request_overrides or {}, search_result['id']
         # parse
-        for quality in MUSIC_QUALITIES:
-            try: resp = self.post('https://wyapi-eo.toubiec.cn/api/getSongUrl', json={'id': song_id, 'level': quality}, timeout=10, verify=False, **request_overrides); resp.raise_for_status()
-            except Exception: break
+        def _resolvequality(quality):
+            resp = self.post('https://wyapi-eo.toubiec.cn/api/getSongUrl', json={'id': song_id, 'level': quality}, timeout=10, verify=False, **request_overrides); resp.raise_for_status()
             download_result = resp2json(resp=resp)
             download_url: str = safeextractfromdict(download_result, ['data', 'url'], '')
-            if not download_url or not download_url.startswith('http'): continue
+            if not download_url or not download_url.startswith('http'): return None
             ext = download_url.split('?')[0].split('.')[-1]
             song_info = SongInfo(
                 raw_data={'search': search_result, 'download': download_result, 'lyric': {}, 'quality': quality}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['name'], None)), singers=legalizestring(', '.join([singer.get('name') for singer in (safeextractfromdict(search_result, ['ar'], []) or []) if isinstance(singer, dict) and singer.get('name')])), 
                 album=legalizestring(safeextractfromdict(search_result, ['al', 'name'], None)), ext=ext, file_size='NULL', identifier=search_result['id'], duration_s=search_result.get('dt', 0) / 1000 if isinstance(search_result.get('dt', 0), (int, float)) else 0, duration=seconds2hms(search_result.get('dt', 0) / 1000 if isinstance(search_result.get('dt', 0), (int, float)) else 0), 
-                lyric=None, cover_url=safeextractfromdict(search_result, ['al', 'picUrl'], None), download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                lyric=None, cover_url=safeextractfromdict(search_result, ['al', 'picUrl'], None), download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
-            song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-            if song_info.with_valid_download_url: break
+            return song_info
         # return
-        return song_info
+        return self._resolvequalityladder(MUSIC_QUALITIES, _resolvequality, default=SongInfo(source=self.source, raw_data={'quality': MUSIC_QUALITIES[-1]}))
     '''_parsewithcggapi'''
     def _parsewithcggapi(self, search_result: dict, request_overrides: dict = None):
         # init
@@ -67,24 +65,22 @@ class NeteaseMusicClient(BaseMusicClient):
         # to seconds func
         to_seconds_func = lambda x: (lambda s: 0 if not s else (lambda p: p[-3]*3600+p[-2]*60+p[-1] if len(p)>=3 else p[0]*60+p[1] if len(p)==2 else p[0] if len(p)==1 else 0)([int(v) for v in re.findall(r'\d+', s.replace('：', ':'))]) if (':' in s or '：' in s) else (lambda h,m,sec,num: (lambda tot: tot if tot>0 else num)(h*3600+m*60+sec))(int(mo.group(1)) if (mo:=re.search(r'(\d+)\s*(?:小时|时|h|hr)', s)) else 0, int(mo.group(1)) if (mo:=re.search(r'(\d+)\s*(?:分钟|分|m|min)', s)) else 0, (int(mo.group(1)) if (mo:=re.search(r'(\d+)\s*(?:秒|s|sec)', s)) else (int(mo.group(1)) if (mo:=re.search(r'(?:分钟|分|m|min)\s*(\d+)\b', s)) else 0)), int(mo.group(0)) if (mo:=re.search(r'\d+', s)) else 0))(str(x).strip().lower())
         # parse
-        for quality in MUSIC_QUALITIES:
-            try: resp = self.get(url=f'https://api-v2.cenguigui.cn/api/netease/music_v1.php?id={song_id}&type=json&level={quality}', timeout=10, **request_overrides); resp.raise_for_status()
-            except Exception: break
+        def _resolvequality(quality):
+            resp = self.get(url=f'https://api-v2.cenguigui.cn/api/netease/music_v1.php?id={song_id}&type=json&level={quality}', timeout=10, **request_overrides); resp.raise_for_status()
             download_result = resp2json(resp=resp)
-            if 'data' not in download_result or (safe_fetch_filesize_func(download_result['data']) < 1): continue
+            if 'data' not in download_result or (safe_fetch_filesize_func(download_result['data']) < 1): return None
             download_url: str = safeextractfromdict(download_result, ['data', 'url'], '')
-            if not download_url or not download_url.startswith('http'): continue
+            if not download_url or not download_url.startswith('http'): return None
             song_info = SongInfo(
                 raw_data={'search': search_result, 'download': download_result, 'lyric': {}, 'quality': quality}, source=self.source, song_name=legalizestring(safeextractfromdict(download_result, ['data', 'name'], None)), singers=legalizestring(safeextractfromdict(download_result, ['data', 'artist'], None)),
                 album=legalizestring(safeextractfromdict(download_result, ['data', 'album'], None)), ext=download_url.split('?')[0].split('.')[-1] or 'mp3', file_size=str(safeextractfromdict(download_result, ['data', 'size'], "")).removesuffix('MB').strip() + ' MB', identifier=search_result['id'],
                 duration_s=to_seconds_func(safeextractfromdict(download_result, ['data', 'duration'], "")), duration=seconds2hms(to_seconds_func(safeextractfromdict(download_result, ['data', 'duration'], ""))), lyric=cleanlrc(safeextractfromdict(download_result, ['data', 'lyric'], "")) or 'NULL',
-                cover_url=safeextractfromdict(download_result, ['data', 'pic'], ""), download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                cover_url=safeextractfromdict(download_result, ['data', 'pic'], ""), download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
-            song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-            if song_info.with_valid_download_url: break
+            return song_info
         # return
-        return song_info
+        return self._resolvequalityladder(MUSIC_QUALITIES, _resolvequality, default=SongInfo(source=self.source, raw_data={'quality': MUSIC_QUALITIES[-1]}))
     '''_parsewithbugpkapi'''
     def _parsewithbugpkapi(self, search_result: dict, request_overrides: dict = None):
         # init
@@ -92,26 +88,24 @@ class NeteaseMusicClient(BaseMusicClient):
         # safe fetch filesize func
         safe_fetch_filesize_func = lambda meta: (lambda s: (lambda: float(s))() if s.replace('.', '', 1).isdigit() else 0)(str(meta.get('size', '0.00MB')).removesuffix('MB').strip()) if isinstance(meta, dict) else 0
         # parse
-        for quality in MUSIC_QUALITIES:
-            try: resp = self.get(f'https://api.bugpk.com/api/163_music?ids={song_id}&level={quality}&type=json', timeout=10, **request_overrides); resp.raise_for_status()
-            except Exception: break
+        def _resolvequality(quality):
+            resp = self.get(f'https://api.bugpk.com/api/163_music?ids={song_id}&level={quality}&type=json', timeout=10, **request_overrides); resp.raise_for_status()
             download_result = resp2json(resp=resp)
-            if 'url' not in download_result or (safe_fetch_filesize_func(download_result) < 1): continue
+            if 'url' not in download_result or (safe_fetch_filesize_func(download_result) < 1): return None
             download_url: str = safeextractfromdict(download_result, ['url'], '')
-            if not download_url or not download_url.startswith('http'): continue
+            if not download_url or not download_url.startswith('http'): return None
             lyric = cleanlrc(safeextractfromdict(download_result, ['lyric'], "")) or 'NULL'
             song_info = SongInfo(
                 raw_data={'search': search_result, 'download': download_result, 'lyric': {}, 'quality': quality}, source=self.source, song_name=legalizestring(safeextractfromdict(download_result, ['name'], None)), singers=legalizestring(download_result.get('ar_name')), 
                 album=legalizestring(safeextractfromdict(download_result, ['al_name'], None)), ext=download_url.split('?')[0].split('.')[-1], file_size=str(safeextractfromdict(download_result, ['size'], "")).removesuffix('MB').strip() + ' MB', identifier=search_result['id'], 
                 duration_s=search_result.get('dt', 0) / 1000 if isinstance(search_result.get('dt', 0), (int, float)) else 0, duration=seconds2hms(search_result.get('dt', 0) / 1000 if isinstance(search_result.get('dt', 0), (int, float)) else 0), lyric=lyric,
-                cover_url=safeextractfromdict(download_result, ['pic'], ""), download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                cover_url=safeextractfromdict(download_result, ['pic'], ""), download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
             if song_info.album == 'NULL': song_info.album = legalizestring(safeextractfromdict(search_result, ['al', 'name'], None))
-            song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-            if song_info.with_valid_download_url: break
+            return song_info
         # return
-        return song_info
+        return self._resolvequalityladder(MUSIC_QUALITIES, _resolvequality, default=SongInfo(source=self.source, raw_data={'quality': MUSIC_QUALITIES[-1]}))
     '''_parsewithxianyuwapi'''
     def _parsewithxianyuwapi(self, search_result: dict, request_overrides: dict = None):
         # init
@@ -128,10 +122,9 @@ class NeteaseMusicClient(BaseMusicClient):
             raw_data={'search': search_result, 'download': download_result, 'lyric': {}, 'quality': 'hires'}, source=self.source, song_name=legalizestring(safeextractfromdict(download_result, ['data', 'title'], None)),
             singers=legalizestring(str(safeextractfromdict(download_result, ['data', 'author'], "")).replace('/', ', ')), album=legalizestring(safeextractfromdict(download_result, ['data', 'album'], None)), 
             ext=download_url.split('?')[0].split('.')[-1], file_size='NULL', identifier=search_result['id'], duration='-:-:-', lyric='NULL', cover_url=safeextractfromdict(download_result, ['data', 'cover'], ""), 
-            download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+            download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
         )
         if song_info.album == 'NULL': song_info.album = legalizestring(safeextractfromdict(search_result, ['al', 'name'], None))
-        song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
         song_info.file_size = song_info.download_url_status['probe_status']['file_size']
         # return
         return song_info
@@ -140,86 +133,75 @@ class NeteaseMusicClient(BaseMusicClient):
         # init
         request_overrides, song_id = request_overrides or {}, search_result['id']
         # parse
-        for quality in MUSIC_QUALITIES:
-            try: resp = self.get(url=f'https://www.tmetu.cn/api/music/api.php?miss=songAll&id={song_id}&level={quality}&withLyric=true', timeout=10, **request_overrides); resp.raise_for_status()
-            except Exception: break
+        def _resolvequality(quality):
+            resp = self.get(url=f'https://www.tmetu.cn/api/music/api.php?miss=songAll&id={song_id}&level={quality}&withLyric=true', timeout=10, **request_overrides); resp.raise_for_status()
             download_result = resp2json(resp=resp)
             download_url: str = safeextractfromdict(download_result, ['data', 'audioUrl'], '')
-            if not download_url or not download_url.startswith('http'): continue
+            if not download_url or not download_url.startswith('http'): return None
             song_info = SongInfo(
                 raw_data={'search': search_result, 'download': download_result, 'lyric': {}, 'quality': quality}, source=self.source, song_name=legalizestring(safeextractfromdict(download_result, ['data', 'name'], None)),
                 singers=legalizestring(str(safeextractfromdict(download_result, ['data', 'artists'], '') or '').replace('/', ', ')), album=legalizestring(safeextractfromdict(download_result, ['data', 'album'], None)), 
                 ext=download_url.split('?')[0].split('.')[-1], file_size_bytes=safeextractfromdict(download_result, ['data', 'size'], 0), file_size=byte2mb(safeextractfromdict(download_result, ['data', 'size'], 0)),
                 identifier=search_result['id'], duration_s=float(safeextractfromdict(download_result, ['data', 'duration'], 0)) / 1000, duration=seconds2hms(float(safeextractfromdict(download_result, ['data', 'duration'], 0)) / 1000),
                 lyric=cleanlrc(str(safeextractfromdict(download_result, ['data', 'lyric'], ""))) or 'NULL', cover_url=safeextractfromdict(download_result, ['data', 'picUrl'], None), download_url=download_url,
-                download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
-            song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-            if song_info.with_valid_download_url: break
+            return song_info
         # return
-        return song_info
+        return self._resolvequalityladder(MUSIC_QUALITIES, _resolvequality, default=SongInfo(source=self.source, raw_data={'quality': MUSIC_QUALITIES[-1]}))
     '''_parsewithcunyuapi'''
     def _parsewithcunyuapi(self, search_result: dict, request_overrides: dict = None):
         # init
         request_overrides, song_id = request_overrides or {}, search_result['id']
         # parse
-        for quality in MUSIC_QUALITIES:
-            try: resp = self.get(url=f'https://www.cunyuapi.top/163music_play?id={song_id}&quality={quality}', timeout=10, **request_overrides); resp.raise_for_status()
-            except Exception: break
+        def _resolvequality(quality):
+            resp = self.get(url=f'https://www.cunyuapi.top/163music_play?id={song_id}&quality={quality}', timeout=10, **request_overrides); resp.raise_for_status()
             download_result = resp2json(resp=resp)
             download_url: str = safeextractfromdict(download_result, ['song_file_url'], '')
-            if not download_url or not download_url.startswith('http'): continue
+            if not download_url or not download_url.startswith('http'): return None
             song_info = SongInfo(
                 raw_data={'search': search_result, 'download': download_result, 'lyric': {}, 'quality': quality}, source=self.source, song_name=legalizestring(safeextractfromdict(download_result, ['name'], None)),
                 singers=legalizestring(str(download_result.get('ar_name', None) or '').replace('/', ', ')), album=legalizestring(download_result.get('al_name')), ext=download_url.split('?')[0].split('.')[-1], 
                 file_size=str(download_result.get('size') or '').removesuffix('MB').strip() + ' MB', identifier=search_result['id'], duration_s=extractdurationsecondsfromlrc(str(download_result.get('lyric'))),
                 duration=seconds2hms(extractdurationsecondsfromlrc(safeextractfromdict(download_result, ['lyric'], "") or "")), lyric=cleanlrc(safeextractfromdict(download_result, ['lyric'], "")) or 'NULL',
-                cover_url=safeextractfromdict(download_result, ['img'], ""), download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                cover_url=safeextractfromdict(download_result, ['img'], ""), download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
-            song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-            if song_info.with_valid_download_url: break
+            return song_info
         # return
-        return song_info
+        return self._resolvequalityladder(MUSIC_QUALITIES, _resolvequality, default=SongInfo(source=self.source, raw_data={'quality': MUSIC_QUALITIES[-1]}))
     '''_parsewithcyruiapi'''
     def _parsewithcyruiapi(self, search_result: dict, request_overrides: dict = None):
         # init
         request_overrides, song_id = request_overrides or {}, search_result['id']
         resp = self.get(f'https://blog.cyrui.cn/netease/api/getSongDetail.php?id={song_id}', **request_overrides)
         resp.raise_for_status()
-        download_result = resp2json(resp=resp)
+        song_detail = resp2json(resp=resp)
         # parse
-        for quality in MUSIC_QUALITIES:
-            try: resp = self.get(url=f'https://blog.cyrui.cn/netease/api/getMusicUrl.php?id={song_id}&level={quality}', timeout=10, **request_overrides); resp.raise_for_status()
-            except Exception: break
-            download_result['getMusicUrl'] = resp2json(resp=resp)
+        def _resolvequality(quality):
+            resp = self.get(url=f'https://blog.cyrui.cn/netease/api/getMusicUrl.php?id={song_id}&level={quality}', timeout=10, **request_overrides); resp.raise_for_status()
+            download_result = copy.deepcopy(song_detail); download_result['getMusicUrl'] = resp2json(resp=resp)
             download_url: str = safeextractfromdict(download_result, ['getMusicUrl', 'data', 0, 'url'], '')
-            if not download_url or not download_url.startswith('http'): continue
+            if not download_url or not download_url.startswith('http'): return None
             song_info = SongInfo(
                 raw_data={'search': search_result, 'download': download_result, 'lyric': {}, 'quality': quality}, source=self.source, song_name=legalizestring(safeextractfromdict(download_result, ['songs', 0, 'name'], None)),
                 singers=legalizestring(', '.join([singer.get('name') for singer in (safeextractfromdict(download_result, ['songs', 0, 'ar'], []) or []) if isinstance(singer, dict) and singer.get('name')])),
                 album=legalizestring(safeextractfromdict(download_result, ['songs', 0, 'al', 'name'], None)), ext=download_url.split('?')[0].split('.')[-1], file_size_bytes=safeextractfromdict(download_result, ['getMusicUrl', 'data', 0, 'size'], 0),
                 file_size=byte2mb(safeextractfromdict(download_result, ['getMusicUrl', 'data', 0, 'size'], 0)), identifier=search_result['id'], duration_s=float(safeextractfromdict(download_result, ['songs', 0, 'dt'], 0)) / 1000,
                 duration=seconds2hms(float(safeextractfromdict(download_result, ['songs', 0, 'dt'], 0)) / 1000), lyric='NULL', cover_url=safeextractfromdict(download_result, ['songs', 0, 'al', 'picUrl'], ""), download_url=download_url,
-                download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
-            song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-            if song_info.with_valid_download_url: break
+            return song_info
         # return
-        return song_info
+        return self._resolvequalityladder(MUSIC_QUALITIES, _resolvequality, default=SongInfo(source=self.source, raw_data={'quality': MUSIC_QUALITIES[-1]}))
     '''_parsewiththirdpartapis'''
     def _parsewiththirdpartapis(self, search_result: dict, request_overrides: dict = None):
         cookies = self.default_cookies or request_overrides.get('cookies')
         if cookies and (cookies != DEFAULT_COOKIES): return SongInfo(source=self.source, raw_data={'quality': MUSIC_QUALITIES[-1]})
-        for imp_func in [self._parsewithcyruiapi, self._parsewithxiaoqinapi, self._parsewithbugpkapi, self._parsewithcggapi, self._parsewithcunyuapi, self._parsewithxianyuwapi, self._parsewithtmetuapi]:
-            try:
-                song_info_flac = imp_func(search_result, request_overrides)
-                if song_info_flac.with_valid_download_url: break
-            except:
-                song_info_flac = SongInfo(source=self.source, raw_data={'quality': MUSIC_QUALITIES[-1]})
-        return song_info_flac
+        imp_funcs = [self._parsewithcyruiapi, self._parsewithxiaoqinapi, self._parsewithbugpkapi, self._parsewithcggapi, self._parsewithcunyuapi, self._parsewithxianyuwapi, self._parsewithtmetuapi]
+        return self._racethirdpartapis(imp_funcs, search_result, request_overrides, default=SongInfo(source=self.source, raw_data={'quality': MUSIC_QUALITIES[-1]}))
     '''_constructsearchurls'''
     def _constructsearchurls(self, keyword: str, rule: dict = None, request_overrides: dict = None):
         # init
@@ -238,6 +220,66 @@ class NeteaseMusicClient(BaseMusicClient):
             count += page_size
         # return
         return search_urls
+    '''_listsearchresult'''
+    def _listsearchresult(self, search_result: dict) -> SongInfo:
+        duration_s = search_result.get('dt', 0) / 1000 if isinstance(search_result.get('dt', 0), (int, float)) else 0
+        return SongInfo(
+            source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['name'], None)), singers=legalizestring(', '.join([singer.get('name') for singer in (safeextractfromdict(search_result, ['ar'], []) or []) if isinstance(singer, dict) and singer.get('name')])),
+            album=legalizestring(safeextractfromdict(search_result, ['al', 'name'], None)), file_size='NULL', identifier=search_result['id'], duration_s=duration_s, duration=seconds2hms(duration_s), cover_url=safeextractfromdict(search_result, ['al', 'picUrl'], None),
+        )
+    '''_resolvesearchresult'''
+    @usesearchheaderscookies
+    def _resolvesearchresult(self, search_result: dict, request_overrides: dict = None) -> SongInfo | None:
+        # init
+        request_overrides = request_overrides or {}
+        # --download results
+        song_info = SongInfo(source=self.source, raw_data={'quality': MUSIC_QUALITIES[-1]})
+        song_info_flac = self._parsewiththirdpartapis(search_result=search_result, request_overrides=request_overrides)
+        # ----parse from high to low music quality until successful fetch, tiers not better than the third-party result are skipped
+        def _resolvequality(quality, search_result=search_result):
+            params = {'ids': [search_result['id']], 'level': quality, 'encodeType': 'flac', 'header': json.dumps({"os": "pc", "appver": "", "osver": "", "deviceId": "pyncm!", "requestId": str(random.randrange(20000000, 30000000))})}
+            if quality == 'sky': params['immerseType'] = 'c51'
+            params = EapiCryptoUtils.encryptparams(url='https://interface3.music.163.com/eapi/song/enhance/player/url/v1', payload=params)
+            cookies = {"os": "pc", "appver": "", "osver": "", "deviceId": "pyncm!"}
+            cookies.update(copy.deepcopy(self.default_cookies))
+            try:
+                resp = self.post('https://interface3.music.163.com/eapi/song/enhance/player/url/v1', data={"params": params}, cookies=cookies, **request_overrides)
+                resp.raise_for_status()
+                download_result: dict = resp2json(resp)
+                if ('data' not in download_result) or (not download_result['data']): return None
+            except:
+                return None
+            download_url: str = safeextractfromdict(download_result, ['data', 0, 'url'], '')
+            if not download_url: return None
+            song_info = SongInfo(
+                raw_data={'search': search_result, 'download': download_result, 'lyric': {}, 'quality': quality}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['name'], None)),
+                singers=legalizestring(', '.join([singer.get('name') for singer in (safeextractfromdict(search_result, ['ar'], []) or []) if isinstance(singer, dict) and singer.get('name')])), album=legalizestring(safeextractfromdict(search_result, ['al', 'name'], None)), 
+                ext=download_url.split('?')[0].split('.')[-1], file_size='NULL', identifier=search_result['id'], duration_s=search_result.get('dt', 0) / 1000 if isinstance(search_result.get('dt', 0), (int, float)) else 0,
+                duration=seconds2hms(search_result.get('dt', 0) / 1000 if isinstance(search_result.get('dt', 0), (int, float)) else 0), lyric=None, cover_url=safeextractfromdict(search_result, ['al', 'picUrl'], None), 
+                download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
+            )
+            song_info.file_size = song_info.download_url_status['probe_status']['file_size']
+            song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] != 'NULL') else song_info.ext
+            return song_info
+        qualities = MUSIC_QUALITIES[:MUSIC_QUALITIES.index(song_info_flac.raw_data['quality'])] if song_info_flac.with_valid_download_url else MUSIC_QUALITIES
+        song_info = self._resolvequalityladder(qualities, _resolvequality, default=song_info, stop_on_error=False)
+        if not song_info.with_valid_download_url: song_info = song_info_flac
+        if not song_info.with_valid_download_url: return None
+        # --lyric results
+        data = {'id': search_result['id'], 'cp': 'false', 'tv': '0', 'lv': '0', 'rv': '0', 'kv': '0', 'yv': '0', 'ytv': '0', 'yrv': '0'}
+        try:
+            resp = self.post('https://interface3.music.163.com/api/song/lyric', data=data, **request_overrides)
+            resp.raise_for_status()
+            lyric_result: dict = resp2json(resp)
+            lyric = safeextractfromdict(lyric_result, ['lrc', 'lyric'], 'NULL')
+            lyric = 'NULL' if not lyric else cleanlrc(lyric)
+        except:
+            lyric_result, lyric = dict(), 'NULL'
+        song_info.raw_data['lyric'] = lyric_result
+        song_info.lyric = lyric
+        if not song_info.duration or song_info.duration == '-:-:-': song_info.duration = seconds2hms(extractdurationsecondsfromlrc(song_info.lyric))
+        # return
+        return song_info
     '''_search'''
     @usesearchheaderscookies
     def _search(self, keyword: str = '', search_url: dict = {}, request_overrides: dict = None, song_infos: list = [], progress: Progress = None, progress_id: int = 0):
@@ -252,53 +294,9 @@ class NeteaseMusicClient(BaseMusicClient):
             resp.raise_for_status()
             search_results = resp2json(resp)['result']['songs']
             for search_result in search_results:
-                # --download results
+                # --lazy search only lists the row, otherwise download url and lyric are resolved right away
                 if not isinstance(search_result, dict) or ('id' not in search_result): continue
-                song_info = SongInfo(source=self.source, raw_data={'quality': MUSIC_QUALITIES[-1]})
-                song_info_flac = self._parsewiththirdpartapis(search_result=search_result, request_overrides=request_overrides)
-                # ----parse from high to low music quality until successful fetch
-                for quality_idx, quality in enumerate(MUSIC_QUALITIES):
-                    if quality_idx >= MUSIC_QUALITIES.index(song_info_flac.raw_data['quality']) and song_info_flac.with_valid_download_url: song_info = song_info_flac; break
-                    params = {'ids': [search_result['id']], 'level': quality, 'encodeType': 'flac', 'header': json.dumps({"os": "pc", "appver": "", "osver": "", "deviceId": "pyncm!", "requestId": str(random.randrange(20000000, 30000000))})}
-                    if quality == 'sky': params['immerseType'] = 'c51'
-                    params = EapiCryptoUtils.encryptparams(url='https://interface3.music.163.com/eapi/song/enhance/player/url/v1', payload=params)
-                    cookies = {"os": "pc", "appver": "", "osver": "", "deviceId": "pyncm!"}
-                    cookies.update(copy.deepcopy(self.default_cookies))
-                    try:
-                        resp = self.post('https://interface3.music.163.com/eapi/song/enhance/player/url/v1', data={"params": params}, cookies=cookies, **request_overrides)
-                        resp.raise_for_status()
-                        download_result: dict = resp2json(resp)
-                        if ('data' not in download_result) or (not download_result['data']): continue
-                    except:
-                        continue
-                    download_url: str = safeextractfromdict(download_result, ['data', 0, 'url'], '')
-                    if not download_url: continue
-                    song_info = SongInfo(
-                        raw_data={'search': search_result, 'download': download_result, 'lyric': {}, 'quality': quality}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['name'], None)),
-                        singers=legalizestring(', '.join([singer.get('name') for singer in (safeextractfromdict(search_result, ['ar'], []) or []) if isinstance(singer, dict) and singer.get('name')])), album=legalizestring(safeextractfromdict(search_result, ['al', 'name'], None)), 
-                        ext=download_url.split('?')[0].split('.')[-1], file_size='NULL', identifier=search_result['id'], duration_s=search_result.get('dt', 0) / 1000 if isinstance(search_result.get('dt', 0), (int, float)) else 0,
-                        duration=seconds2hms(search_result.get('dt', 0) / 1000 if isinstance(search_result.get('dt', 0), (int, float)) else 0), lyric=None, cover_url=safeextractfromdict(search_result, ['al', 'picUrl'], None), 
-                        download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
-                    )
-                    song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
-                    song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-                    song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] != 'NULL') else song_info.ext
-                    if song_info.with_valid_download_url: break
-                if not song_info.with_valid_download_url: song_info = song_info_flac
-                if not song_info.with_valid_download_url: continue
-                # --lyric results
-                data = {'id': search_result['id'], 'cp': 'false', 'tv': '0', 'lv': '0', 'rv': '0', 'kv': '0', 'yv': '0', 'ytv': '0', 'yrv': '0'}
-                try:
-                    resp = self.post('https://interface3.music.163.com/api/song/lyric', data=data, **request_overrides)
-                    resp.raise_for_status()
-                    lyric_result: dict = resp2json(resp)
-                    lyric = safeextractfromdict(lyric_result, ['lrc', 'lyric'], 'NULL')
-                    lyric = 'NULL' if not lyric else cleanlrc(lyric)
-                except:
-                    lyric_result, lyric = dict(), 'NULL'
-                song_info.raw_data['lyric'] = lyric_result
-                song_info.lyric = lyric
-                if not song_info.duration or song_info.duration == '-:-:-': song_info.duration = seconds2hms(extractdurationsecondsfromlrc(song_info.lyric))
+                if (song_info := self._listorresolve(search_result, request_overrides)) is None: continue
                 # --append to song_infos
                 song_infos.append(song_info)
                 # --judgement for search_size
@@ -310,6 +308,25 @@ class NeteaseMusicClient(BaseMusicClient):
             progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Error: {err})")
         # return
         return song_infos
+    '''_asearch'''
+    async def _asearch(self, keyword: str = '', search_url: dict = {}, request_overrides: dict = None, song_infos: list = [], progress: Progress = None, progress_id: int = 0):
+        # init
+        search_meta, request_overrides = copy.deepcopy(search_url), request_overrides or {}
+        search_url = search_meta.pop('url')
+        # successful
+        try:
+            # --search results, lazy rows are only listed, eager ones are resolved off the event loop (see AsyncBaseMusicClient._alistorresolve)
+            resp = await self.apost(search_url, **search_meta, **request_overrides)
+            resp.raise_for_status()
+            candidates = [(r, {}) for r in resp2json(resp)['result']['songs'] if isinstance(r, dict) and ('id' in r)]
+            await self._alistorresolve(candidates, request_overrides, song_infos)
+            # --update progress
+            progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Success)")
+        # failure
+        except Exception as err:
+            progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Error: {err})")
+        # return
+        return song_infos
     '''parseplaylist'''
     @useparseheaderscookies
     def parseplaylist(self, playlist_url: str, request_overrides: dict = None):
@@ -327,12 +344,8 @@ class NeteaseMusicClient(BaseMusicClient):
             for idx, track_info in enumerate(tracks):
                 if idx > 0: main_process_context.advance(main_progress_id, 1)
                 main_process_context.update(main_progress_id, description=f"{len(tracks)} songs found in playlist {playlist_id} >>> completed ({idx}/{len(tracks)})")
-                for third_part_api in [self._parsewithcyruiapi, self._parsewithxiaoqinapi, self._parsewithbugpkapi, self._parsewithcggapi, self._parsewithcunyuapi, self._parsewithxianyuwapi, self._parsewithtmetuapi]:
-                    try:
-                        song_info = third_part_api(track_info, request_overrides=request_overrides)
-                        if song_info.with_valid_download_url: song_infos.append(song_info); break
-                    except:
-                        continue
+                song_info = self._racethirdpartapis([self._parsewithcyruiapi, self._parsewithxiaoqinapi, self._parsewithbugpkapi, self._parsewithcggapi, self._parsewithcunyuapi, self._parsewithxianyuwapi, self._parsewithtmetuapi], track_info, request_overrides=request_overrides)
+                if song_info.with_valid_download_url: song_infos.append(song_info)
             main_process_context.advance(main_progress_id, 1)
             main_process_context.update(main_progress_id, description=f"{len(tracks)} songs found in playlist {playlist_id} >>> completed ({idx+1}/{len(tracks)})")
         song_infos = self._removeduplicates(song_infos=song_infos)
@@ -12,7 +12,7 @@ import copy
 import json
 import random
 import base64
-from .base import BaseMusicClient
+from .asyncbase import AsyncBaseMusicClient
 from rich.progress import Progress
 from ..utils.hosts import QQ_MUSIC_HOSTS
 from pathvalidate import sanitize_filepath
@@ -23,7 +23,7 @@ from ..utils import touchdir, resp2json, seconds2hms, legalizestring, safeextrac
 
 
 '''QQMusicClient'''
-class QQMusicClient(BaseMusicClient):
+class QQMusicClient(AsyncBaseMusicClient):
     source = 'QQMusicClient'
     def __init__(self, use_encrypted_endpoint: bool = False, **kwargs):
         super(QQMusicClient, self).__init__(**kwargs)
@@ -47,48 +47,44 @@ class QQMusicClient(BaseMusicClient):
         # to seconds func
         to_seconds_func = lambda x: (lambda s: 0 if not s else (lambda p: p[-3]*3600+p[-2]*60+p[-1] if len(p)>=3 else p[0]*60+p[1] if len(p)==2 else p[0] if len(p)==1 else 0)([int(v) for v in re.findall(r'\d+', s.replace('：', ':'))]) if (':' in s or '：' in s) else (lambda h,m,sec,num: (lambda tot: tot if tot>0 else num)(h*3600+m*60+sec))(int(mo.group(1)) if (mo:=re.search(r'(\d+)\s*(?:小时|时|h|hr)', s)) else 0, int(mo.group(1)) if (mo:=re.search(r'(\d+)\s*(?:分钟|分|m|min)', s)) else 0, (int(mo.group(1)) if (mo:=re.search(r'(\d+)\s*(?:秒|s|sec)', s)) else (int(mo.group(1)) if (mo:=re.search(r'(?:分钟|分|m|min)\s*(\d+)\b', s)) else 0)), int(mo.group(0)) if (mo:=re.search(r'\d+', s)) else 0))(str(x).strip().lower())
         # parse
-        for quality in list(ThirdPartVKeysAPISongFileType.ID_TO_NAME.value.keys())[::-1]:
-            try: resp = self.get(f"https://api.vkeys.cn/v2/music/tencent/geturl?mid={song_id}&quality={quality}", timeout=10, **request_overrides); resp.raise_for_status()
-            except Exception: break
+        def _resolvequality(quality):
+            resp = self.get(f"https://api.vkeys.cn/v2/music/tencent/geturl?mid={song_id}&quality={quality}", timeout=10, **request_overrides); resp.raise_for_status()
             download_result = resp2json(resp=resp)
-            if ('data' not in download_result) or ('url' not in download_result['data']) or (safe_fetch_filesize_func(download_result['data']) < 1): continue
+            if ('data' not in download_result) or ('url' not in download_result['data']) or (safe_fetch_filesize_func(download_result['data']) < 1): return None
             download_url: str = download_result['data']['url']
-            if not download_url: continue
+            if not download_url: return None
             song_info = SongInfo(
                 raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(download_result['data'], ['song'], None)),
                 singers=legalizestring(safeextractfromdict(download_result['data'], ['singer'], None)), album=legalizestring(safeextractfromdict(download_result['data'], ['album'], None)), 
                 ext=download_url.split('?')[0].split('.')[-1], file_size=str(safeextractfromdict(download_result['data'], ['size'], "")).removesuffix('MB').strip() + ' MB', identifier=song_id,
                 duration_s=to_seconds_func(safeextractfromdict(download_result['data'], ['interval'], "")), duration=seconds2hms(to_seconds_func(safeextractfromdict(download_result['data'], ['interval'], ""))), 
-                lyric=None, cover_url=safeextractfromdict(download_result['data'], ['cover'], ""), download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                lyric=None, cover_url=safeextractfromdict(download_result['data'], ['cover'], ""), download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
-            song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-            if song_info.with_valid_download_url: break
+            return song_info
         # return
-        return song_info
+        return self._resolvequalityladder(list(ThirdPartVKeysAPISongFileType.ID_TO_NAME.value.keys())[::-1], _resolvequality)
     '''_parsewithlittleyouziapi'''
     def _parsewithlittleyouziapi(self, search_result: dict, request_overrides: dict = None):
         # init
         request_overrides, song_id = request_overrides or {}, search_result.get('mid') or search_result.get('songmid')
         # parse
-        for quality in range(0, 11):
-            try: resp = self.get(f"https://www.littleyouzi.com/api/v2/qqmusic?mid={song_id}&quality={quality}", timeout=10, **request_overrides); resp.raise_for_status()
-            except Exception: break
+        def _resolvequality(quality):
+            resp = self.get(f"https://www.littleyouzi.com/api/v2/qqmusic?mid={song_id}&quality={quality}", timeout=10, **request_overrides); resp.raise_for_status()
             download_result = resp2json(resp=resp)
             download_url: str = safeextractfromdict(download_result, ['data', 'audio'], '')
-            if not download_url: continue
+            if not download_url: return None
             song_info = SongInfo(
                 raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(search_result.get('title') or search_result.get('songname')),
                 singers=legalizestring(', '.join([singer.get('name') for singer in (safeextractfromdict(search_result, ['singer'], []) or []) if isinstance(singer, dict) and singer.get('name')])),
                 album=legalizestring(safeextractfromdict(search_result, ['album', 'title'], None) or search_result.get('albumname')), ext=download_url.split('?')[0].split('.')[-1], file_size='NULL', 
                 identifier=song_id, duration_s=search_result.get('interval', 0), duration=seconds2hms(search_result.get('interval', 0)), lyric=None, cover_url=None, download_url=download_url, 
-                download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
-            song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
             song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-            if song_info.with_valid_download_url: break
+            return song_info
         # return
-        return song_info
+        return self._resolvequalityladder(range(0, 11), _resolvequality)
     '''_parsewithnkiapi'''
     def _parsewithnkiapi(self, search_result: dict, request_overrides: dict = None):
         # init
@@ -107,9 +103,8 @@ class QQMusicClient(BaseMusicClient):
             ext=download_url.split('?')[0].split('.')[-1], file_size_bytes=safeextractfromdict(download_result, ['song_size_sq_str'], 0) or safeextractfromdict(download_result, ['song_size_str'], 0),
             file_size=str(safeextractfromdict(download_result, ['song_size_sq'], "") or safeextractfromdict(download_result, ['song_size'], "")).removesuffix('MB').strip() + ' MB', 
             identifier=song_id, duration=safeextractfromdict(download_result, ['duration'], ""), lyric=cleanlrc(safeextractfromdict(download_result, ['song_lyric'], "")) or 'NULL',
-            cover_url=safeextractfromdict(download_result, ['album_pic'], ""), download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+            cover_url=safeextractfromdict(download_result, ['album_pic'], ""), download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
         )
-        song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
         song_info.file_size = song_info.download_url_status['probe_status']['file_size']
         # return
         return song_info
@@ -129,9 +124,8 @@ class QQMusicClient(BaseMusicClient):
             raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(download_result, ['data', 'title'], None)),
             singers=legalizestring(safeextractfromdict(download_result, ['data', 'author'], None)), album=legalizestring(safeextractfromdict(download_result, ['data', 'album'], None)), 
             ext=download_url.split('?')[0].split('.')[-1], file_size='NULL', identifier=song_id, duration='-:-:-', lyric=cleanlrc(safeextractfromdict(download_result, ['data', 'lrc'], "")),
-            cover_url=safeextractfromdict(download_result, ['data', 'cover'], ""), download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+            cover_url=safeextractfromdict(download_result, ['data', 'cover'], ""), download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
         )
-        song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
         song_info.file_size = song_info.download_url_status['probe_status']['file_size']
         song_info.duration_s = extractdurationsecondsfromlrc(song_info.lyric)
         song_info.duration = seconds2hms(song_info.duration_s)
@@ -140,13 +134,7 @@ class QQMusicClient(BaseMusicClient):
     '''_parsewiththirdpartapis'''
     def _parsewiththirdpartapis(self, search_result: dict, request_overrides: dict = None):
         if self.default_cookies or request_overrides.get('cookies'): return SongInfo(source=self.source)
-        for imp_func in [self._parsewithlittleyouziapi, self._parsewithvkeysapi, self._parsewithnkiapi, self._parsewithxianyuwapi]:
-            try:
-                song_info_flac = imp_func(search_result, request_overrides)
-                if song_info_flac.with_valid_download_url: break
-            except:
-                song_info_flac = SongInfo(source=self.source)
-        return song_info_flac
+        return self._racethirdpartapis([self._parsewithlittleyouziapi, self._parsewithvkeysapi, self._parsewithnkiapi, self._parsewithxianyuwapi], search_result, request_overrides)
     '''_constructsearchurls'''
     def _constructsearchurls(self, keyword: str, rule: dict = None, request_overrides: dict = None):
         # init
@@ -167,13 +155,100 @@ class QQMusicClient(BaseMusicClient):
             count += page_size
         # return
         return search_urls
+    '''_listsearchresult'''
+    def _listsearchresult(self, search_result: dict) -> SongInfo:
+        return SongInfo(
+            source=self.source, song_name=legalizestring(search_result.get('title')), singers=legalizestring(', '.join([singer.get('name') for singer in (search_result.get('singer', []) or []) if isinstance(singer, dict) and singer.get('name')])),
+            album=legalizestring(safeextractfromdict(search_result, ['album', 'title'], None)), file_size='NULL', identifier=search_result['mid'], duration_s=search_result.get('interval', 0), duration=seconds2hms(search_result.get('interval', 0)),
+        )
+    '''_resolvesearchresult'''
+    @usesearchheaderscookies
+    def _resolvesearchresult(self, search_result: dict, request_overrides: dict = None) -> SongInfo | None:
+        # init
+        request_overrides = request_overrides or {}
+        safe_fetch_filesize_func = lambda size: (lambda s: (lambda: float(s))() if s.replace('.', '', 1).isdigit() else 0)(size.removesuffix('MB').strip()) if isinstance(size, str) else 0
+        # --download results
+        song_info = SongInfo(source=self.source)
+        song_info_flac = self._parsewiththirdpartapis(search_result=search_result, request_overrides=request_overrides)
+        # ----non-vip / vip users using enc_endpoint
+        if self.use_encrypted_endpoint:
+            base_url = QQMusicClientUtils.enc_endpoint
+            # ------quality tiers are resolved concurrently, the best one that validates wins
+            def _resolvequality(quality, search_result=search_result):
+                params = {"filename": [f"{quality[0]}{search_result['mid']}{search_result['mid']}{quality[1]}"], "guid": QQMusicClientUtils.randomguid(), "songmid": [search_result['mid']], 'songtype': [0]}
+                current_rule = QQMusicClientUtils.buildrequestdata(params=params, module="music.vkey.GetEVkey", method="CgiGetEVkey", credential=Credential().fromcookiesdict(self.default_cookies or request_overrides.get('cookies', {})), common_override={"ct": "19"})
+                try:
+                    resp = self.post(base_url, data=json.dumps(current_rule, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), params={"sign": QQMusicClientUtils.sign(current_rule)}, **request_overrides)
+                    resp.raise_for_status()
+                    download_result: dict = resp2json(resp)
+                except:
+                    return None
+                download_url = safeextractfromdict(download_result, ['music.vkey.GetEVkey.CgiGetEVkey', 'data', "midurlinfo", 0, "purl"], "") or safeextractfromdict(download_result, ['music.vkey.GetEVkey.CgiGetEVkey', 'data', "midurlinfo", 0, "wifiurl"], "")
+                ekey = safeextractfromdict(download_result, ['music.vkey.GetEVkey.CgiGetEVkey', 'data', "midurlinfo", 0, "ekey"], "")
+                if not download_url: return None
+                download_url = QQMusicClientUtils.music_domain + download_url
+                song_info = SongInfo(
+                    raw_data={'search': search_result, 'download': download_result, 'lyric': {}, 'ekey': ekey}, source=self.source, song_name=legalizestring(search_result.get('title')),
+                    singers=legalizestring(', '.join([singer.get('name') for singer in (search_result.get('singer', []) or []) if isinstance(singer, dict) and singer.get('name')])),
+                    album=legalizestring(safeextractfromdict(search_result, ['album', 'title'], None)), ext=quality[1][1:], file_size='NULL', identifier=search_result['mid'], 
+                    duration_s=search_result.get('interval', 0), duration=seconds2hms(search_result.get('interval', 0)), lyric=None, cover_url=None, download_url=download_url, 
+                    download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
+                )
+                song_info.file_size = song_info.download_url_status['probe_status']['file_size']
+                song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] != 'NULL') else song_info.ext
+                return song_info
+            song_info = self._resolvequalityladder(EncryptedSongFileType.SORTED_QUALITIES.value, _resolvequality, default=song_info, stop_on_error=False)
+        # ----non-vip / vip users using endpoint
+        else:
+            base_url = QQMusicClientUtils.endpoint
+            # ------a lossless third-party result wins outright, otherwise quality tiers are resolved concurrently
+            def _resolvequality(quality, search_result=search_result, song_info_flac=song_info_flac):
+                params = {"filename": [f"{quality[0]}{search_result['mid']}{search_result['mid']}{quality[1]}"], "guid": QQMusicClientUtils.randomguid(), "songmid": [search_result['mid']], 'songtype': [0]}
+                current_rule = QQMusicClientUtils.buildrequestdata(params=params, module="music.vkey.GetVkey", method="UrlGetVkey", credential=Credential().fromcookiesdict(self.default_cookies or request_overrides.get('cookies', {})), common_override={"ct": "19"})
+                try:
+                    resp = self.post(base_url, data=json.dumps(current_rule, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), **request_overrides)
+                    resp.raise_for_status()
+                    download_result: dict = resp2json(resp)
+                except:
+                    return None
+                download_url = safeextractfromdict(download_result, ['music.vkey.GetVkey.UrlGetVkey', 'data', "midurlinfo", 0, "purl"], "") or safeextractfromdict(download_result, ['music.vkey.GetVkey.UrlGetVkey', 'data', "midurlinfo", 0, "wifiurl"], "")
+                if not download_url: return None
+                download_url = QQMusicClientUtils.music_domain + download_url
+                song_info = SongInfo(
+                    raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(search_result.get('title')),
+                    singers=legalizestring(', '.join([singer.get('name') for singer in (search_result.get('singer', []) or []) if isinstance(singer, dict) and singer.get('name')])),
+                    album=legalizestring(safeextractfromdict(search_result, ['album', 'title'], None)), ext=quality[1][1:], file_size='NULL', identifier=search_result['mid'], 
+                    duration_s=search_result.get('interval', 0), duration=seconds2hms(search_result.get('interval', 0)), lyric=None, cover_url=None, download_url=download_url, 
+                    download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
+                )
+                song_info.file_size = song_info.download_url_status['probe_status']['file_size']
+                song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] != 'NULL') else song_info.ext
+                if song_info_flac.with_valid_download_url and (safe_fetch_filesize_func(song_info.file_size) < safe_fetch_filesize_func(song_info_flac.file_size)): song_info = song_info_flac
+                return song_info
+            if song_info_flac.with_valid_download_url and song_info_flac.ext in ('flac',): song_info = song_info_flac
+            else: song_info = self._resolvequalityladder(SongFileType.SORTED_QUALITIES.value, _resolvequality, default=song_info, stop_on_error=False)
+        if not song_info.with_valid_download_url: song_info = song_info_flac
+        if not song_info.with_valid_download_url: return None
+        # --lyric results
+        params = {'songmid': str(search_result['mid']), 'g_tk': '5381', 'loginUin': '0', 'hostUin': '0', 'format': 'json', 'inCharset': 'utf8', 'outCharset': 'utf-8', 'platform': 'yqq'}
+        request_overrides = copy.deepcopy(request_overrides)
+        request_overrides.pop('headers', {})
+        try:
+            resp = self.get('https://c.y.qq.com/lyric/fcgi-bin/fcg_query_lyric_new.fcg', headers={'Referer': 'https://y.qq.com/portal/player.html'}, params=params, **request_overrides)
+            lyric_result: dict = resp2json(resp) or {'lyric': ''}
+            lyric = lyric_result.get('lyric', '')
+            lyric = 'NULL' if not lyric else cleanlrc(base64.b64decode(lyric).decode('utf-8'))
+        except:
+            lyric_result, lyric = {}, "NULL"
+        song_info.raw_data['lyric'], song_info.lyric = lyric_result, lyric
+        # return
+        return song_info
     '''_search'''
     @usesearchheaderscookies
     def _search(self, keyword: str = '', search_url: dict = {}, request_overrides: dict = None, song_infos: list = [], progress: Progress = None, progress_id: int = 0):
         # init
         search_meta, request_overrides = copy.deepcopy(search_url), request_overrides or {}
         search_url = search_meta.pop('url')
-        safe_fetch_filesize_func = lambda size: (lambda s: (lambda: float(s))() if s.replace('.', '', 1).isdigit() else 0)(size.removesuffix('MB').strip()) if isinstance(size, str) else 0
         # successful
         try:
             # --search results
@@ -181,79 +256,9 @@ class QQMusicClient(BaseMusicClient):
             resp.raise_for_status()
             search_results = resp2json(resp)['music.search.SearchCgiService.DoSearchForQQMusicMobile']['data']['body']['item_song']
             for search_result in search_results:
-                # --download results
+                # --lazy search only lists the row, otherwise download url and lyric are resolved right away
                 if not isinstance(search_result, dict) or ('mid' not in search_result): continue
-                song_info = SongInfo(source=self.source)
-                song_info_flac = self._parsewiththirdpartapis(search_result=search_result, request_overrides=request_overrides)
-                # ----non-vip / vip users using enc_endpoint
-                if self.use_encrypted_endpoint:
-                    base_url = QQMusicClientUtils.enc_endpoint
-                    for quality in EncryptedSongFileType.SORTED_QUALITIES.value:
-                        params = {"filename": [f"{quality[0]}{search_result['mid']}{search_result['mid']}{quality[1]}"], "guid": QQMusicClientUtils.randomguid(), "songmid": [search_result['mid']], 'songtype': [0]}
-                        current_rule = QQMusicClientUtils.buildrequestdata(params=params, module="music.vkey.GetEVkey", method="CgiGetEVkey", credential=Credential().fromcookiesdict(self.default_cookies or request_overrides.get('cookies', {})), common_override={"ct": "19"})
-                        try:
-                            resp = self.post(base_url, data=json.dumps(current_rule, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), params={"sign": QQMusicClientUtils.sign(current_rule)}, **request_overrides)
-                            resp.raise_for_status()
-                            download_result: dict = resp2json(resp)
-                        except:
-                            continue
-                        download_url = safeextractfromdict(download_result, ['music.vkey.GetEVkey.CgiGetEVkey', 'data', "midurlinfo", 0, "purl"], "") or safeextractfromdict(download_result, ['music.vkey.GetEVkey.CgiGetEVkey', 'data', "midurlinfo", 0, "wifiurl"], "")
-                        ekey = safeextractfromdict(download_result, ['music.vkey.GetEVkey.CgiGetEVkey', 'data', "midurlinfo", 0, "ekey"], "")
-                        if not download_url: continue
-                        download_url = QQMusicClientUtils.music_domain + download_url
-                        song_info = SongInfo(
-                            raw_data={'search': search_result, 'download': download_result, 'lyric': {}, 'ekey': ekey}, source=self.source, song_name=legalizestring(search_result.get('title')),
-                            singers=legalizestring(', '.join([singer.get('name') for singer in (search_result.get('singer', []) or []) if isinstance(singer, dict) and singer.get('name')])),
-                            album=legalizestring(safeextractfromdict(search_result, ['album', 'title'], None)), ext=quality[1][1:], file_size='NULL', identifier=search_result['mid'], 
-                            duration_s=search_result.get('interval', 0), duration=seconds2hms(search_result.get('interval', 0)), lyric=None, cover_url=None, download_url=download_url, 
-                            download_url_status=self.audio_link_tester.test(download_url, request_overrides),
-                        )
-                        song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
-                        song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-                        song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] != 'NULL') else song_info.ext
-                        if song_info.with_valid_download_url: break
-                # ----non-vip / vip users using endpoint
-                else:
-                    base_url = QQMusicClientUtils.endpoint
-                    for quality in SongFileType.SORTED_QUALITIES.value:
-                        if song_info_flac.with_valid_download_url and song_info_flac.ext in ('flac',): song_info = song_info_flac; break
-                        params = {"filename": [f"{quality[0]}{search_result['mid']}{search_result['mid']}{quality[1]}"], "guid": QQMusicClientUtils.randomguid(), "songmid": [search_result['mid']], 'songtype': [0]}
-                        current_rule = QQMusicClientUtils.buildrequestdata(params=params, module="music.vkey.GetVkey", method="UrlGetVkey", credential=Credential().fromcookiesdict(self.default_cookies or request_overrides.get('cookies', {})), common_override={"ct": "19"})
-                        try:
-                            resp = self.post(base_url, data=json.dumps(current_rule, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), **request_overrides)
-                            resp.raise_for_status()
-                            download_result: dict = resp2json(resp)
-                        except:
-                            continue
-                        download_url = safeextractfromdict(download_result, ['music.vkey.GetVkey.UrlGetVkey', 'data', "midurlinfo", 0, "purl"], "") or safeextractfromdict(download_result, ['music.vkey.GetVkey.UrlGetVkey', 'data', "midurlinfo", 0, "wifiurl"], "")
-                        if not download_url: continue
-                        download_url = QQMusicClientUtils.music_domain + download_url
-                        song_info = SongInfo(
-                            raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(search_result.get('title')),
-                            singers=legalizestring(', '.join([singer.get('name') for singer in (search_result.get('singer', []) or []) if isinstance(singer, dict) and singer.get('name')])),
-                            album=legalizestring(safeextractfromdict(search_result, ['album', 'title'], None)), ext=quality[1][1:], file_size='NULL', identifier=search_result['mid'], 
-                            duration_s=search_result.get('interval', 0), duration=seconds2hms(search_result.get('interval', 0)), lyric=None, cover_url=None, download_url=download_url, 
-                            download_url_status=self.audio_link_tester.test(download_url, request_overrides),
-                        )
-                        song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
-                        song_info.file_size = song_info.download_url_status['probe_status']['file_size']
-                        song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] != 'NULL') else song_info.ext
-                        if song_info_flac.with_valid_download_url and (safe_fetch_filesize_func(song_info.file_size) < safe_fetch_filesize_func(song_info_flac.file_size)): song_info = song_info_flac
-                        if song_info.with_valid_download_url: break
-                if not song_info.with_valid_download_url: song_info = song_info_flac
-                if not song_info.with_valid_download_url: continue
-                # --lyric results
-                params = {'songmid': str(search_result['mid']), 'g_tk': '5381', 'loginUin': '0', 'hostUin': '0', 'format': 'json', 'inCharset': 'utf8', 'outCharset': 'utf-8', 'platform': 'yqq'}
-                request_overrides = copy.deepcopy(request_overrides)
-                request_overrides.pop('headers', {})
-                try:
-                    resp = self.get('https://c.y.qq.com/lyric/fcgi-bin/fcg_query_lyric_new.fcg', headers={'Referer': 'https://y.qq.com/portal/player.html'}, params=params, **request_overrides)
-                    lyric_result: dict = resp2json(resp) or {'lyric': ''}
-                    lyric = lyric_result.get('lyric', '')
-                    lyric = 'NULL' if not lyric else cleanlrc(base64.b64decode(lyric).decode('utf-8'))
-                except:
-                    lyric_result, lyric = {}, "NULL"
-                song_info.raw_data['lyric'], song_info.lyric = lyric_result, lyric
+                if (song_info := self._listorresolve(search_result, request_overrides)) is None: continue
                 # --append to song_infos
                 song_infos.append(song_info)
                 # --judgement for search_size
@@ -265,6 +270,25 @@ class QQMusicClient(BaseMusicClient):
             progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Error: {err})")
         # return
         return song_infos
+    '''_asearch'''
+    async def _asearch(self, keyword: str = '', search_url: dict = {}, request_overrides: dict = None, song_infos: list = [], progress: Progress = None, progress_id: int = 0):
+        # init
+        search_meta, request_overrides = copy.deepcopy(search_url), request_overrides or {}
+        search_url = search_meta.pop('url')
+        # successful
+        try:
+            # --search results, lazy rows are only listed, eager ones are resolved off the event loop (see AsyncBaseMusicClient._alistorresolve)
+            resp = await self.apost(search_url, **search_meta, **request_overrides)
+            resp.raise_for_status()
+            candidates = [(r, {}) for r in resp2json(resp)['music.search.SearchCgiService.DoSearchForQQMusicMobile']['data']['body']['item_song'] if isinstance(r, dict) and ('mid' in r)]
+            await self._alistorresolve(candidates, request_overrides, song_infos)
+            # --update progress
+            progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Success)")
+        # failure
+        except Exception as err:
+            progress.update(progress_id, description=f"{self.source}.search >>> {search_url} (Error: {err})")
+        # return
+        return song_infos
     '''parseplaylist'''
     @useparseheaderscookies
     def parseplaylist(self, playlist_url: str, request_overrides: dict = None):
@@ -284,12 +308,8 @@ class QQMusicClient(BaseMusicClient):
             for idx, track_info in enumerate(tracks):
                 if idx > 0: main_process_context.advance(main_progress_id, 1)
                 main_process_context.update(main_progress_id, description=f"{len(tracks)} songs found in playlist {playlist_id} >>> completed ({idx}/{len(tracks)})")
-                for third_part_api in [self._parsewithlittleyouziapi, self._parsewithvkeysapi, self._parsewithnkiapi, self._parsewithxianyuwapi]:
-                    try:
-                        song_info = third_part_api(track_info, request_overrides=request_overrides)
-                        if song_info.with_valid_download_url: song_infos.append(song_info); break
-                    except:
-                        continue
+                song_info = self._racethirdpartapis([self._parsewithlittleyouziapi, self._parsewithvkeysapi, self._parsewithnkiapi, self._parsewithxianyuwapi], track_info, request_overrides=request_overrides)
+                if song_info.with_valid_download_url: song_infos.append(song_info)
             main_process_context.advance(main_progress_id, 1)
             main_process_context.update(main_progress_id, description=f"{len(tracks)} songs found in playlist {playlist_id} >>> completed ({idx+1}/{len(tracks)})")
         song_infos = self._removeduplicates(song_infos=song_infos)
@@ -39,7 +39,7 @@ class SodaMusicClient(BaseMusicClient):
         output_filepath = Path(song_info.save_path)
         output_filepath = output_filepath.parent / f'{output_filepath.stem}.m4a'
         AudioDecryptor.decrypt(file_data=file_data, play_auth=song_info.raw_data['play_auth'], output_filepath=str(output_filepath))
-        if not os.path.samefile(song_info.save_path, str(output_filepath)): os.remove(song_info.save_path)
+        if not os.path.samefile(song_info.save_path, str(output_filepath)): os.remove(song_info.save_path); song_info.save_path = str(output_filepath)
         return downloaded_song_infos
     '''_constructsearchurls'''
     def _constructsearchurls(self, keyword: str, rule: dict = None, request_overrides: dict = None):
@@ -104,9 +104,8 @@ class SodaMusicClient(BaseMusicClient):
                         file_size=byte2mb(safeextractfromdict(audio_sorted, ['Size'], 0)), identifier=song_id, duration_s=safeextractfromdict(audio_sorted, ['Duration'], 0), duration=seconds2hms(safeextractfromdict(audio_sorted, ['Duration'], 0)), 
                         lyric=cleanlrc(SodaTimedLyricsParser.tolrclinelevel(SodaTimedLyricsParser.parsetimedlyrics(safeextractfromdict(download_result, ['lyric', 'content'], "")))) or 'NULL', 
                         cover_url=str(safeextractfromdict(search_result, ['entity', 'track', 'album', 'url_cover', 'urls', 0], '')) + str(safeextractfromdict(search_result, ['entity', 'track', 'album', 'url_cover', 'uri'], '')) + '~c5_375x375.jpg', 
-                        download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                        download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
                     )
-                    song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
                     song_info.file_size = song_info.download_url_status['probe_status']['file_size']
                     song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL',)) else song_info.ext
                     if song_info.with_valid_download_url: break
@@ -33,6 +33,11 @@ class SoundCloudMusicClient(BaseMusicClient):
         self._initsession()
     '''_updateclientid'''
     def _updateclientid(self, request_overrides: dict = None):
+        if self.client_id: return
+        # parallel searches share a single scrape of the client id, latecomers find it already set
+        self.single_flight.do((self.source, 'client_id'), lambda: self._fetchclientid(request_overrides=request_overrides), memo_ttl=0)
+    '''_fetchclientid'''
+    def _fetchclientid(self, request_overrides: dict = None):
         if self.client_id: return
         request_overrides = request_overrides or {}
         try: resp = self.session.get('https://soundcloud.com/', **request_overrides); resp.raise_for_status()
@@ -112,7 +117,7 @@ class SoundCloudMusicClient(BaseMusicClient):
                         except Exception: continue
                         download_url_status = {'ok': True}
                     else:
-                        download_url_status = self.audio_link_tester.test(download_url, request_overrides)
+                        download_url_status = self.audio_link_tester.inspect(download_url, request_overrides)
                     song_info = SongInfo(
                         raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['title'], None)),
                         singers=legalizestring(safeextractfromdict(search_result, ['publisher_metadata', 'artist'], None) or safeextractfromdict(search_result, ['user', 'username'], None)),
@@ -124,7 +129,6 @@ class SoundCloudMusicClient(BaseMusicClient):
                     if str(protocol).lower() in {'hls'}:
                         song_info.protocol, song_info.file_size = 'HLS', 'HLS'
                     else:
-                        song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
                         song_info.file_size = song_info.download_url_status['probe_status']['file_size']
                         song_info.ext = song_info.download_url_status['probe_status']['ext'] if (song_info.download_url_status['probe_status']['ext'] and song_info.download_url_status['probe_status']['ext'] not in ('NULL', )) else song_info.ext
                     if song_info.with_valid_download_url: break
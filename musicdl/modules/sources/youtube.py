@@ -13,7 +13,7 @@ from ytmusicapi import YTMusic
 from .base import BaseMusicClient
 from rich.progress import Progress
 from ..utils.youtubeutils import YouTube, REPAIDAPI_KEYS
-from ..utils import legalizestring, resp2json, usesearchheaderscookies, byte2mb, seconds2hms, usedownloadheaderscookies, touchdir, safeextractfromdict, SongInfo, SongInfoUtils
+from ..utils import legalizestring, resp2json, usesearchheaderscookies, byte2mb, seconds2hms, usedownloadheaderscookies, touchdir, safeextractfromdict, SongInfo
 
 
 '''YouTubeMusicClient'''
@@ -47,7 +47,7 @@ class YouTubeMusicClient(BaseMusicClient):
                     progress.advance(song_progress_id, len(chunk))
                     progress.update(song_progress_id, description=f"{self.source}.download >>> {song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]} (Downloading: {downloading_text})")
             progress.update(song_progress_id, description=f"{self.source}.download >>> {song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]} (Success)")
-            downloaded_song_infos.append(SongInfoUtils.fillsongtechinfo(copy.deepcopy(song_info), logger_handle=self.logger_handle, disable_print=self.disable_print))
+            downloaded_song_infos.append(self._finishdownload(song_info))
         except Exception as err:
             progress.update(song_progress_id, description=f"{self.source}.download >>> {song_info.song_name[:10] + '...' if len(song_info.song_name) > 13 else song_info.song_name[:13]} (Error: {err})")
         return downloaded_song_infos
@@ -68,15 +68,15 @@ class YouTubeMusicClient(BaseMusicClient):
             download_result = resp2json(resp=resp)
             download_url: str = download_result.get('url')
             if not download_url or not str(download_url).startswith('http'): continue
-            try: resp = self.get(download_url, **request_overrides); resp.raise_for_status()
+            try: downloaded_contents = self._fetchcontents(download_url, request_overrides)
             except: continue
             song_info = SongInfo(
                 raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['title'], None)),
                 singers=legalizestring(search_result.get('author') or (', '.join([singer.get('name') for singer in (search_result.get('artists') or []) if isinstance(singer, dict) and singer.get('name')]))),
-                album=legalizestring(safeextractfromdict(search_result, ['album'], None)), ext='mp3', file_size_bytes=resp.content.__sizeof__(), file_size=byte2mb(resp.content.__sizeof__()), identifier=song_id,
+                album=legalizestring(safeextractfromdict(search_result, ['album'], None)), ext='mp3', file_size_bytes=len(downloaded_contents), file_size=byte2mb(len(downloaded_contents)), identifier=song_id,
                 duration_s=safeextractfromdict(search_result, ['duration_seconds'], 0), duration=format_duration_func(safeextractfromdict(search_result, ['duration'], '0:00') or '0:00'), lyric='NULL',
                 cover_url=safeextractfromdict(search_result, ['thumbnail'], "") or safeextractfromdict(search_result, ['thumbnails', -1, 'url'], ""), download_url=download_url, download_url_status={'ok': True}, 
-                downloaded_contents=resp.content, default_download_headers={"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36"},
+                downloaded_contents=downloaded_contents, default_download_headers={"user-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/144.0.0.0 Safari/537.36"},
             )
             if song_info.with_valid_download_url: break
         # return
@@ -104,7 +104,7 @@ class YouTubeMusicClient(BaseMusicClient):
                 album=legalizestring(safeextractfromdict(search_result, ['album'], None)), ext=media.get('extension', 'm4a'), file_size_bytes=int(float(media.get('contentLength', 0) or 0)),
                 file_size=byte2mb(int(float(media.get('contentLength', 0) or 0))), identifier=song_id, duration_s=download_result.get('duration'), duration=seconds2hms(download_result.get('duration')),
                 lyric='NULL', cover_url=safeextractfromdict(search_result, ['thumbnail'], "") or safeextractfromdict(search_result, ['thumbnails', -1, 'url'], ""), download_url=download_url,
-                download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
             if song_info.with_valid_download_url: break
         # return
@@ -134,14 +134,14 @@ class YouTubeMusicClient(BaseMusicClient):
                 album=legalizestring(safeextractfromdict(search_result, ['album'], None)), ext=media.get('ext', 'm4a') or 'm4a', file_size_bytes=int(float(media.get('filesize', 0) or 0)),
                 file_size=byte2mb(int(float(media.get('filesize', 0) or 0))), identifier=song_id, duration_s=download_result.get('duration'), duration=seconds2hms(download_result.get('duration')),
                 lyric='NULL', cover_url=safeextractfromdict(search_result, ['thumbnail'], "") or safeextractfromdict(search_result, ['thumbnails', -1, 'url'], ""), download_url=download_url,
-                download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
             )
             if song_info.with_valid_download_url: break
             try: resp = self.get(f'https://www.acethinker.ai/downloader/api/newytdlapi/youtube_mp3_audio_video_downloader.php?url=https://www.youtube.com/watch?v={song_id}', headers=headers, **request_overrides); resp.raise_for_status()
             except: continue
             parsed_in_no_us_area = resp2json(resp=resp)
             if not parsed_in_no_us_area.get('download_url'): continue
-            song_info.update(dict(download_url=parsed_in_no_us_area.get('download_url'), download_url_status=self.audio_link_tester.test(parsed_in_no_us_area.get('download_url'), request_overrides)))
+            song_info.update(dict(download_url=parsed_in_no_us_area.get('download_url'), download_url_status=self.audio_link_tester.inspect(parsed_in_no_us_area.get('download_url'), request_overrides)))
             if song_info.with_valid_download_url: break
         # return
         return song_info
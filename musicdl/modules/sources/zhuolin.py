@@ -69,9 +69,8 @@ class ZhuolinMusicClient(BaseMusicClient):
                     raw_data={'search': search_result, 'download': download_result, 'lyric': {}}, source=self.source, song_name=legalizestring(safeextractfromdict(search_result, ['name'], None)),
                     singers=legalizestring(', '.join(safeextractfromdict(search_result, ['artist'], []) or [])), album=legalizestring(safeextractfromdict(search_result, ['album', 'name'], None)),
                     ext=download_url.split('?')[0].split('.')[-1], file_size=None, identifier=search_result['id'], duration='-:-:-', lyric=None, cover_url=safeextractfromdict(search_result, ['pic'], None), 
-                    download_url=download_url, download_url_status=self.audio_link_tester.test(download_url, request_overrides),
+                    download_url=download_url, download_url_status=self.audio_link_tester.inspect(download_url, request_overrides),
                 )
-                song_info.download_url_status['probe_status'] = self.audio_link_tester.probe(song_info.download_url, request_overrides)
                 song_info.file_size = song_info.download_url_status['probe_status']['file_size']
                 if not song_info.with_valid_download_url: continue
                 # --lyric results
@@ -1,10 +1,25 @@
 '''initialize'''
-from .data import SongInfo
-from .hls import HLSDownloader
+from .data import SongInfo, SearchResults
+from .deadline import SearchDeadline
+from .hls import HLSDownloader, HLSEngine
 from .ip import RandomIPGenerator
 from .quarkparser import QuarkParser
 from .lanzouyparser import LanZouYParser
 from .songinfoutils import SongInfoUtils
+from .sessionpool import SessionPool
+from .linkcache import LinkStatusCache
+from .qualityladder import QualityLadderResolver
+from .mirrorrace import MirrorScoreboard, MirrorRacer
+from .singleflight import SingleFlight
+from .scheduler import TaskScheduler, ScheduledExecutor
+from .segmented import SegmentedRangeDownloader, RangeNotSupportedError
+from .resumejournal import ResumeJournal, ResourceChangedError
+from .library import DownloadLibrary
+from .spooled import SpooledContents
+from .progress import ProgressSink, ThrottledProgress, NullProgress, EventProgress, ProgressTask, buildprogress
+from .postprocess import PostProcessPool
+from .probecache import StartupProbeCache
+from .hostpolicy import HostPolicyRegistry, HostPolicy, TokenBucket, CircuitBreaker, CircuitOpenError
 from .modulebuilder import BaseModuleBuilder
 from .hosts import obtainhostname, hostmatchessuffix
 from .importutils import optionalimport, optionalimportfrom
@@ -12,6 +27,6 @@ from .logger import LoggerHandle, colorize, printtable, printfullline, smarttrun
 from .lyric import WhisperLRC, SodaTimedLyricsParser, extractdurationsecondsfromlrc, kuwolyricslisttolrc, cleanlrc
 from .misc import (
     AudioLinkTester, legalizestring, touchdir, seconds2hms, byte2mb, cachecookies, resp2json, isvalidresp, safeextractfromdict, replacefile,
-    usedownloadheaderscookies, useparseheaderscookies, usesearchheaderscookies, cookies2dict, cookies2string, estimatedurationwithfilesizebr,
-    estimatedurationwithfilelink, searchdictbykey, shortenpathsinsonginfos
+    usedownloadheaderscookies, useparseheaderscookies, usesearchheaderscookies, userequestcontext, RequestContext, cookies2dict, cookies2string, estimatedurationwithfilesizebr,
+    estimatedurationwithfilelink, searchdictbykey, shortenpathsinsonginfos, shareduseragent
 )
\ No newline at end of file
@@ -1,6 +1,6 @@
 '''
 Function:
-    Implementation of SongInfo
+    Implementation of SongInfo and SearchResults
 Author:
     Zhenchao Jin
 WeChat Official Account (微信公众号):
@@ -47,6 +47,8 @@ class SongInfo:
     downloaded_contents: Optional[Any] = None
     chunk_size: Optional[int] = 1024 * 1024
     protocol: Optional[str] = 'HTTP' # should be in {'HTTP', 'HLS'}
+    # rows of a lazy search only carry listing metadata until BaseMusicClient.resolve fills in the download url
+    is_lazy: bool = False
     @property
     def with_valid_download_url(self) -> bool:
         if self.episodes: return all([eps.with_valid_download_url for eps in self.episodes])
@@ -113,4 +115,14 @@ class SongInfo:
     '''get'''
     def get(self, key: str, default: Any = None) -> Any:
         if key in self.fieldnames(): return getattr(self, key)
-        return default
\ No newline at end of file
+        return default
+
+'''SearchResults'''
+class SearchResults(dict):
+    # plain {source: list[SongInfo]} mapping, metadata holds per source search stats such as {"timed_out": True, "num_pages": 3, "num_completed_pages": 1, "elapsed_s": 2.01}
+    def __init__(self, *args, metadata: Dict[str, Dict[str, Any]] = None, **kwargs):
+        super(SearchResults, self).__init__(*args, **kwargs)
+        self.metadata = metadata if metadata is not None else {}
+    '''timedoutsources'''
+    def timedoutsources(self) -> list:
+        return [source for source, meta in self.metadata.items() if meta.get('timed_out')]
@@ -0,0 +1,52 @@
+'''
+Function:
+    Implementation of SearchDeadline
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import time
+import threading
+
+
+'''SearchDeadline'''
+class SearchDeadline():
+    def __init__(self, budget_s: float):
+        # one absolute deadline shared by every source, page and request of a search
+        self.budget_s = max(0.0, float(budget_s))
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + self.budget_s
+        self._cancelled, self._cancelled_at = threading.Event(), None
+    '''frombudgetms'''
+    @classmethod
+    def frombudgetms(cls, budget_ms: float = None) -> 'SearchDeadline':
+        return None if budget_ms is None else cls(float(budget_ms) / 1000)
+    '''remaining'''
+    def remaining(self, grace: float = 0.0) -> float:
+        # a cancelled deadline counts as expired at the moment of cancelling, grace still extends from there
+        expires_at = self.expires_at if self._cancelled_at is None else min(self.expires_at, self._cancelled_at)
+        return max(0.0, expires_at + grace - time.monotonic())
+    '''elapsed'''
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+    '''expired'''
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+    '''cancel'''
+    def cancel(self):
+        # requests still running notice it before their next attempt and give up
+        if self._cancelled_at is None: self._cancelled_at = time.monotonic()
+        self._cancelled.set()
+    '''cancelled'''
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+    '''clamptimeout'''
+    def clamptimeout(self, timeout=None):
+        # requests / curl_cffi timeouts are either a number or a (connect, read) tuple, none of them may outlive the deadline
+        remaining = max(self.remaining(), 1e-3)
+        if timeout is None: return remaining
+        if isinstance(timeout, (tuple, list)): return tuple(remaining if t is None else min(float(t), remaining) for t in timeout)
+        return min(float(timeout), remaining)
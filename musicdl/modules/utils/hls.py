@@ -9,6 +9,8 @@ WeChat Official Account (微信公众号):
 import os
 import re
 import copy
+import queue
+import json
 import time
 import math
 import m3u8
@@ -16,15 +18,21 @@ import base64
 import shutil
 import hashlib
 import requests
+import itertools
 import threading
 import concurrent.futures as cf
 from pathlib import Path
-from .misc import touchdir
+from .misc import touchdir, replacefile
 from .logger import LoggerHandle
+from .scheduler import TaskScheduler
+from .sessionpool import SessionPool
+from .singleflight import SingleFlight
+from .hostpolicy import HostPolicyRegistry
+from collections import OrderedDict
 from urllib.parse import urljoin
 from dataclasses import dataclass
 from rich.progress import Progress
-from typing import Optional, Dict, Any, Tuple, List, Union, Callable
+from typing import Optional, Dict, Any, Tuple, List, Union, Callable, Iterator
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
 
@@ -43,10 +51,142 @@ class SegmentJob:
     map_byterange: Optional[str]
 
 
+'''DecryptPlan'''
+@dataclass(frozen=True)
+class DecryptPlan:
+    mode: str
+    key: bytes
+    iv: bytes
+    drop: int = 0
+    length: Optional[int] = None
+
+
+'''SegmentReorderBuffer'''
+class SegmentReorderBuffer():
+    def __init__(self, fp, next_index: int = 0, offset: int = 0, spill_dir: str = '.', window: int = 64, onadvance: Callable[[int, int], None] = None):
+        # segments complete in any order but are appended to fp strictly in index order, up to `window` early ones wait in memory, any further ones in spill files
+        self.fp, self.next_index, self.offset = fp, int(next_index), int(offset)
+        self.spill_dir, self.window = spill_dir, max(1, int(window))
+        # onadvance(next_index, offset) runs after every in-order write, under the buffer lock (e.g., to persist a resume journal)
+        self.onadvance = onadvance
+        self.stats = dict(spilled=0, max_buffered=0)
+        self._pending: Dict[int, Union[bytes, str]] = {}
+        self._num_in_memory = 0
+        self._lock = threading.Lock()
+    '''spillpath'''
+    def spillpath(self, index: int) -> str:
+        return os.path.join(self.spill_dir, f"spill_{index:06d}.bin")
+    '''put'''
+    def put(self, index: int, *parts: bytes):
+        # parts may be views of a buffer the caller reuses (see HLSDownloader._cryptinto), they are written right away when in order and copied otherwise
+        with self._lock:
+            if index < self.next_index: return
+            if index > self.next_index:
+                if self._num_in_memory < self.window:
+                    self._pending[index] = b"".join(parts); self._num_in_memory += 1
+                else:
+                    # window overflow (e.g., one slow segment holding back many fast ones), no fsync since a lost spill file is simply fetched again
+                    path = self.spillpath(index); tmp = f"{path}.tmp"
+                    with open(tmp, "wb") as fp: fp.writelines(parts)
+                    os.replace(tmp, path); self._pending[index] = path; self.stats['spilled'] += 1
+                self.stats['max_buffered'] = max(self.stats['max_buffered'], len(self._pending))
+                return
+            self._write(*parts)
+            while self.next_index in self._pending:
+                item = self._pending.pop(self.next_index)
+                if isinstance(item, str):
+                    with open(item, "rb") as fp: data = fp.read()
+                    os.remove(item)
+                else:
+                    data = item; self._num_in_memory -= 1
+                self._write(data)
+            if self.onadvance is not None: self.onadvance(self.next_index, self.offset)
+    '''_write'''
+    def _write(self, *parts: bytes):
+        for part in parts: self.fp.write(part); self.offset += len(part)
+        self.next_index += 1
+
+
+'''CoalescedRangeReader'''
+class CoalescedRangeReader():
+    def __init__(self, downloader: 'HLSDownloader', uri: str, start: int, end: int):
+        # one streamed request for bytes [start, end) of uri, handed out piece by piece to the fetchbytes(uri, byterange) calls of consecutive EXT-X-BYTERANGE segments,
+        # pieces must be asked for in ascending order of offset and only the bytes from the last requested offset onwards are kept
+        self.downloader, self.uri, self.start, self.end = downloader, uri, int(start), int(end)
+        self._resp, self._chunks, self._skip, self._eof = None, None, 0, False
+        self._buffer, self._base = bytearray(), int(start)
+    '''fetchbytes'''
+    def fetchbytes(self, uri: str, byterange: Optional[str]) -> bytes:
+        if uri != self.uri or not byterange: return self.downloader._fetchbytes(uri, byterange)
+        length, offset = self.downloader._parsebyterange(byterange)
+        if offset < self._base or offset + length > self.end: return self.downloader._fetchbytes(uri, byterange)
+        if self._resp is None: self._open()
+        while not self._eof and self._base + len(self._buffer) < offset + length:
+            if (chunk := next(self._chunks, None)) is None: self._eof = True; break
+            if self._skip: drop = min(self._skip, len(chunk)); chunk, self._skip = chunk[drop:], self._skip - drop
+            self._buffer += chunk
+        del self._buffer[:offset - self._base]; self._base = offset
+        return bytes(self._buffer[:length])
+    '''_open'''
+    def _open(self):
+        self._resp = self.downloader._request(self.uri, headers={"Range": f"bytes={self.start}-{self.end - 1}"}, stream=True)
+        # a server ignoring Range answers 200 with the whole file, the bytes before start are read and dropped (one plain GET instead of many ranges)
+        if self._resp.status_code != 206: self._skip = self.start
+        elif not str(self._resp.headers.get("Content-Range") or "").startswith(f"bytes {self.start}-"): self._resp.close(); raise RuntimeError(f"range {self.start}-{self.end - 1} of {self.uri} not honored")
+        self._chunks = self._resp.iter_content(chunk_size=self.downloader.chunk_size)
+    '''close'''
+    def close(self):
+        if self._resp is not None: self._resp.close()
+        self._buffer = bytearray()
+
+
+'''HLSEngine'''
+class HLSEngine():
+    def __init__(self, concurrency: int = 16, session_pool: SessionPool = None, max_cached_keys: int = 256):
+        # long-lived per client and shared by all of its HLSDownloader instances: keep-alive sessions per host, aes keys by key uri, one bounded segment pool
+        self.concurrency = max(1, int(concurrency))
+        self.session_pool = session_pool or SessionPool(pool_size=self.concurrency)
+        # segments of every song are queued under a key of their own and handed out round robin, so a long song cannot hold back the ones started after it
+        self.scheduler = TaskScheduler(max_workers=self.concurrency, thread_name_prefix='hls')
+        self.max_cached_keys = max(1, int(max_cached_keys))
+        self.key_cache: OrderedDict[str, bytes] = OrderedDict()
+        self.key_flight = SingleFlight()
+        self._song_ids = itertools.count()
+        self._counters = dict(downloads=0, key_fetches=0, key_hits=0)
+        self._lock = threading.Lock()
+    '''__deepcopy__'''
+    def __deepcopy__(self, memo):
+        return self
+    '''executor'''
+    def executor(self) -> cf.Executor:
+        # one view (and queue) of the segment pool per song
+        with self._lock: self._counters['downloads'] += 1
+        return self.scheduler.executor(f'hls{next(self._song_ids)}')
+    '''getkey'''
+    def getkey(self, key_uri: str, fetch: Callable[[], bytes]) -> bytes:
+        # tracks of an album often share the key, it is fetched once even when several songs ask for it at the same time
+        with self._lock:
+            if key_uri in self.key_cache: self.key_cache.move_to_end(key_uri); self._counters['key_hits'] += 1; return self.key_cache[key_uri]
+        return self.key_flight.do(('hls.key', key_uri), lambda: self._fetchkey(key_uri, fetch))
+    '''_fetchkey'''
+    def _fetchkey(self, key_uri: str, fetch: Callable[[], bytes]) -> bytes:
+        data = fetch()
+        with self._lock:
+            self.key_cache[key_uri] = data; self._counters['key_fetches'] += 1
+            while len(self.key_cache) > self.max_cached_keys: self.key_cache.popitem(last=False)
+        return data
+    '''stats'''
+    def stats(self) -> dict:
+        with self._lock: counters, num_cached_keys = dict(self._counters), len(self.key_cache)
+        return {**counters, 'cached_keys': num_cached_keys, 'scheduler': self.scheduler.stats()}
+
+
 '''HLSDownloader'''
 class HLSDownloader:
     def __init__(self, output_dir: str = "downloads", proxies: Optional[Dict[str, str]] = None, headers: Optional[Dict[str, str]] = None, cookies: Optional[Dict[str, str]] = None, timeout: Tuple[float, float] = (10.0, 30.0), logger_handle: LoggerHandle = None,
-                 verify_tls: bool = True, concurrency: int = 16, max_retries: int = 8, backoff_base: float = 0.6, backoff_cap: float = 10.0, chunk_size: int = 1024 * 256, strict_key_length: bool = False, disable_print: bool = False, request_overrides: dict = None):
+                 verify_tls: bool = True, concurrency: int = 16, max_retries: int = 8, backoff_base: float = 0.6, backoff_cap: float = 10.0, chunk_size: int = 1024 * 256, strict_key_length: bool = False, disable_print: bool = False, request_overrides: dict = None, host_policy: HostPolicyRegistry = None,
+                 executor: cf.Executor = None, streaming: bool = True, reorder_window: int = 64, journal_interval: float = 1.0,
+                 coalesce_max_bytes: int = 8 * 1024 * 1024, engine: HLSEngine = None, max_scratch_size: int = 8 * 1024 * 1024):
         # work dir
         self.output_dir = output_dir
         touchdir(self.output_dir)
@@ -66,6 +206,21 @@ class HLSDownloader:
         self.max_retries = max(1, int(max_retries))
         self.strict_key_length = bool(strict_key_length)
         self.request_overrides = request_overrides or {}
+        self.host_policy = host_policy
+        # engine: shared sessions, key cache and segment pool of the owning client (see HLSEngine), None keeps them private to this downloader
+        self.engine = engine
+        # segment downloads go through this executor when given (e.g., a TaskScheduler view), else through the pool of the engine, otherwise through a private pool of `concurrency` workers
+        self.executor = executor or (engine.executor() if engine is not None else None)
+        # streaming: segments are appended in order to one .part file through a reorder buffer of `reorder_window` segments, resumable through a small offset journal,
+        # instead of one fsynced file per segment plus a final merge (the non streaming mode, still used with keep_segments=True)
+        self.streaming = streaming
+        self.reorder_window = max(1, int(reorder_window))
+        self.journal_interval = float(journal_interval)
+        # consecutive EXT-X-BYTERANGE segments of one uri (same key and init section) are fetched through one streamed range request of up to coalesce_max_bytes, 0 disables it
+        self.coalesce_max_bytes = max(0, int(coalesce_max_bytes or 0))
+        # segments are decrypted into a per-thread buffer that is kept for the next segment up to max_scratch_size bytes
+        self.max_scratch_size = int(max_scratch_size)
+        self._aes_algorithms: Dict[bytes, algorithms.AES] = {}
         # threading
         self._tls = threading.local()
         self._key_cache: Dict[str, bytes] = {}
@@ -82,6 +237,11 @@ class HLSDownloader:
         jobs, global_init_map = self._buildjobs(playlist)
         temp_folder, global_init_path = os.path.join(self.output_dir, temp_subdir or f".hls_tmp_{self._safenamefromurl(m3u8_url)}"), None
         touchdir(temp_folder)
+        if self.streaming and not keep_segments:
+            touchdir(os.path.dirname(os.path.abspath(output_path)) or ".")
+            self._downloadstreaming(jobs, global_init_map, temp_folder, output_path, progress=progress, progress_id=progress_id)
+            shutil.rmtree(temp_folder, ignore_errors=True)
+            return output_path
         if global_init_map:
             global_init_path = os.path.join(temp_folder, "_global_init.bin")
             if not self._fileok(global_init_path): self._atomicwrite(global_init_path, self._fetchbytes(global_init_map["uri"], global_init_map.get("byterange")))
@@ -102,20 +262,33 @@ class HLSDownloader:
     '''_request'''
     def _request(self, url: str, method: str = "GET", headers: Optional[Dict[str, str]] = None, stream: bool = False, **kwargs) -> requests.Response:
         kwargs.update(copy.deepcopy(self.request_overrides))
-        sess, last_exc = self._getsession(), None
+        last_exc = None
         hdrs = dict(self.headers)
         if headers: hdrs.update(headers)
+        # pooled sessions are checked out per request and carry no state of their own, headers and cookies of this downloader go with every request
+        if self.engine is not None: kwargs.setdefault('cookies', self.cookies)
         for attempt in range(1, self.max_retries + 1):
+            if self.host_policy is not None: self.host_policy.acquire(url)
+            sess = self._getsession() if self.engine is None else self.engine.session_pool.acquire(url)
             try:
+                if self.engine is not None: sess.cookies.clear()
                 resp = sess.request(method=method, url=url, headers=hdrs, proxies=self.proxies, timeout=self.timeout, verify=self.verify_tls, stream=stream, **kwargs)
                 if resp.status_code in (429, 500, 502, 503, 504): resp.close(); raise requests.HTTPError(f"HTTP {resp.status_code} for {url}")
                 resp.raise_for_status()
+                if self.host_policy is not None: self.host_policy.recordoutcome(url)
                 return resp
             except Exception as e:
                 last_exc = e
+                if self.host_policy is not None:
+                    # an answer from a healthy host (e.g., 403 / 404) will not change on retry, so it is raised at once instead of hammering the url
+                    if not self.host_policy.recordoutcome(url, e): raise RuntimeError(f"Request failed (not retryable): {url}\nLast error: {e}") from e
+                    if attempt < self.max_retries: time.sleep(self.host_policy.backoffdelay(url, attempt - 1, e))
+                    continue
                 t = min(self.backoff_cap, self.backoff_base * (2 ** (attempt - 1)))
                 t = t + (0.1 * t * (0.5 - (time.time() % 1)))
                 time.sleep(max(0.0, t))
+            finally:
+                if self.engine is not None: self.engine.session_pool.release(url, sess)
         raise RuntimeError(f"Request failed after retries: {url}\nLast error: {last_exc}")
     '''_gettext'''
     def _gettext(self, url: str) -> str:
@@ -131,11 +304,12 @@ class HLSDownloader:
         return b"".join(chunks)
     '''_fetchbytes'''
     def _fetchbytes(self, url: str, byterange: Optional[str]) -> bytes:
-        headers = {}
-        if byterange:
-            length, offset = self._parsebyterange(byterange)
-            headers["Range"] = f"bytes={offset}-{offset + length - 1}"
-        return self._getbytes(url, headers=headers)
+        if not byterange: return self._getbytes(url)
+        # through a reader of exactly that range, which also copes with servers answering 200 with the whole file
+        length, offset = self._parsebyterange(byterange)
+        reader = CoalescedRangeReader(self, url, offset, offset + length)
+        try: return reader.fetchbytes(url, byterange)
+        finally: reader.close()
     '''_loadm3u8'''
     def _loadm3u8(self, url: str) -> m3u8.M3U8:
         text = self._gettext(url)
@@ -188,7 +362,35 @@ class HLSDownloader:
     '''_downloadallsegments'''
     def _downloadallsegments(self, jobs: List[SegmentJob], temp_folder: str, progress: Progress, progress_id: int) -> List[str]:
         progress.update(progress_id, description=f"HLSDownloader._downloadallsegments >>> completed (0/{len(jobs)})", total=len(jobs), kind='hls')
-        byterange_cursor: Dict[str, int] = {}; seg_paths: List[Optional[str]] = [None] * len(jobs)
+        byteranges = self._effectivebyteranges(jobs); seg_paths: List[Optional[str]] = [None] * len(jobs)
+        _ensureinitsection = self._initsectionloader(temp_folder)
+        def _worker(group: List[SegmentJob]) -> List[Tuple[int, str]]:
+            for job, data in self._fetchgroup(group, byteranges):
+                prepend = _ensureinitsection(job.map_uri, job.map_byterange) if job.map_uri else b""
+                self._atomicwrite(os.path.join(temp_folder, f"seg_{job.index:06d}.bin"), prepend + data)
+            return [(job.index, os.path.join(temp_folder, f"seg_{job.index:06d}.bin")) for job in group]
+        exceptions: List[Exception] = []
+        pending_jobs: List[SegmentJob] = []
+        for job in jobs:
+            if self._fileok(seg_path := os.path.join(temp_folder, f"seg_{job.index:06d}.bin")): seg_paths[job.index] = seg_path
+            else: pending_jobs.append(job)
+        progress.update(progress_id, completed=len(jobs) - len(pending_jobs))
+        with (self.executor or cf.ThreadPoolExecutor(max_workers=self.concurrency)) as ex:
+            futures = {ex.submit(_worker, group): len(group) for group in self._plancoalescedgroups(pending_jobs, byteranges)}
+            for fut in cf.as_completed(futures):
+                try:
+                    for idx, path in fut.result(): seg_paths[idx] = path
+                except Exception as e:
+                    exceptions.append(e)
+                finally:
+                    progress.advance(progress_id, futures[fut])
+                    num_downloaded_segs = int(progress.tasks[progress_id].completed)
+                    progress.update(progress_id, description=f"HLSDownloader._downloadallsegments >>> completed ({num_downloaded_segs}/{len(jobs)})")
+        if exceptions: raise exceptions[0]
+        return [p for p in seg_paths if p is not None]
+    '''_initsectionloader'''
+    def _initsectionloader(self, temp_folder: str) -> Callable[[str, Optional[str]], bytes]:
+        # EXT-X-MAP sections shared by many segments are fetched once (concurrent callers wait for the first one) and cached in temp_folder
         init_cache: Dict[str, str] = {}; init_inflight: Dict[str, threading.Event] = {}; init_cache_lock = threading.Lock()
         def _ensureinitsection(map_uri: str, map_byterange: Optional[str]) -> bytes:
             key = f"{map_uri}|{map_byterange or ''}"
@@ -208,62 +410,180 @@ class HLSDownloader:
                 return data
             finally:
                 with init_cache_lock: (evt := init_inflight.pop(key, None)) and evt.set()
-        def _worker(job: SegmentJob) -> Tuple[int, str]:
-            seg_path = os.path.join(temp_folder, f"seg_{job.index:06d}.bin")
-            if self._fileok(seg_path): return job.index, seg_path
-            prepend = _ensureinitsection(job.map_uri, job.map_byterange) if job.map_uri else b""
-            eff_byterange = self._normalizebyterange(job.uri, job.byterange, byterange_cursor) if job.byterange else job.byterange
-            data = self._fetchandmaybedecrypt(job, eff_byterange)
-            self._atomicwrite(seg_path, prepend + data)
-            return job.index, seg_path
-        exceptions: List[Exception] = []
-        with cf.ThreadPoolExecutor(max_workers=self.concurrency) as ex:
-            futures = [ex.submit(_worker, j) for j in jobs]
-            for fut in cf.as_completed(futures):
-                try:
-                    idx, path = fut.result()
-                    seg_paths[idx] = path
-                except Exception as e:
-                    exceptions.append(e)
-                finally:
-                    progress.advance(progress_id, 1)
-                    num_downloaded_segs = int(progress.tasks[progress_id].completed)
-                    progress.update(progress_id, description=f"HLSDownloader._downloadallsegments >>> completed ({num_downloaded_segs}/{len(jobs)})")
-        if exceptions: raise exceptions[0]
-        return [p for p in seg_paths if p is not None]
+        return _ensureinitsection
+    '''_effectivebyteranges'''
+    def _effectivebyteranges(self, jobs: List[SegmentJob]) -> List[Optional[str]]:
+        # implicit offsets (BYTERANGE without @) continue from the previous range of the same uri, so they are resolved in playlist order before any job runs
+        cursor: Dict[str, int] = {}
+        return [self._normalizebyterange(job.uri, job.byterange, cursor) if job.byterange else None for job in jobs]
+    '''_streamfingerprint'''
+    def _streamfingerprint(self, jobs: List[SegmentJob], byteranges: List[Optional[str]], global_init_map: Optional[Dict[str, Any]]) -> str:
+        hasher = hashlib.sha1(json.dumps(global_init_map, sort_keys=True, default=str).encode("utf-8"))
+        for job, byterange in zip(jobs, byteranges): hasher.update(f"{job.uri}|{byterange}|{job.key_uri}|{job.key_iv}|{job.map_uri}|{job.map_byterange}\n".encode("utf-8"))
+        return hasher.hexdigest()
+    '''_downloadstreaming'''
+    def _downloadstreaming(self, jobs: List[SegmentJob], global_init_map: Optional[Dict[str, Any]], temp_folder: str, output_path: str, progress: Progress, progress_id: int) -> None:
+        part_path, journal_path = os.path.join(temp_folder, "stream.part"), os.path.join(temp_folder, "stream.journal.json")
+        byteranges = self._effectivebyteranges(jobs); fingerprint = self._streamfingerprint(jobs, byteranges, global_init_map)
+        # resume: the journal records how many segments (and bytes) of this exact playlist are in the .part file, anything after that offset is cut off
+        journal = None
+        if os.path.exists(journal_path) and os.path.exists(part_path):
+            try:
+                with open(journal_path, "r", encoding="utf-8") as fp: journal = json.load(fp)
+                if journal.get("fingerprint") != fingerprint or os.path.getsize(part_path) < int(journal["offset"]): journal = None
+            except Exception:
+                journal = None
+        if journal is None:
+            for name in os.listdir(temp_folder):
+                if name.startswith("spill_"): os.remove(os.path.join(temp_folder, name))
+        fp = open(part_path, "r+b" if journal else "wb")
+        try:
+            if journal:
+                fp.truncate(int(journal["offset"])); fp.seek(int(journal["offset"]))
+            elif global_init_map:
+                fp.write(self._fetchbytes(global_init_map["uri"], global_init_map.get("byterange")))
+            last_saved = [0.0]
+            def _savejournal(next_index: int, offset: int, force: bool = False):
+                if not force and time.monotonic() - last_saved[0] < self.journal_interval: return
+                last_saved[0] = time.monotonic(); fp.flush()
+                tmp = f"{journal_path}.tmp"
+                with open(tmp, "w", encoding="utf-8") as jfp: json.dump({"fingerprint": fingerprint, "next_index": next_index, "offset": offset}, jfp)
+                os.replace(tmp, journal_path)
+            buffer = SegmentReorderBuffer(fp, next_index=int(journal["next_index"]) if journal else 0, offset=fp.tell(), spill_dir=temp_folder, window=self.reorder_window, onadvance=_savejournal)
+            _ensureinitsection, abort_event = self._initsectionloader(temp_folder), threading.Event()
+            def _worker(group: List[SegmentJob]):
+                if abort_event.is_set(): return
+                # spill files left by an interrupted run of the same playlist are reused
+                if len(group) == 1 and os.path.exists(spill_path := buffer.spillpath(group[0].index)):
+                    with open(spill_path, "rb") as sfp: data = sfp.read()
+                    os.remove(spill_path); buffer.put(group[0].index, data)
+                    return
+                for job, data in self._fetchgroup(group, byteranges):
+                    if abort_event.is_set(): return
+                    prepend = _ensureinitsection(job.map_uri, job.map_byterange) if job.map_uri else b""
+                    buffer.put(job.index, prepend, data)
+            pending_jobs = [job for job in jobs if job.index >= buffer.next_index]
+            groups = [[job] for job in pending_jobs if os.path.exists(buffer.spillpath(job.index))] + self._plancoalescedgroups([job for job in pending_jobs if not os.path.exists(buffer.spillpath(job.index))], byteranges)
+            progress.update(progress_id, description=f"HLSDownloader._downloadstreaming >>> completed ({buffer.next_index}/{len(jobs)})", total=len(jobs), completed=buffer.next_index, kind='hls')
+            exceptions: List[Exception] = []
+            with (self.executor or cf.ThreadPoolExecutor(max_workers=self.concurrency)) as ex:
+                futures = {ex.submit(_worker, group): len(group) for group in groups}
+                for fut in cf.as_completed(futures):
+                    try:
+                        fut.result()
+                    except Exception as e:
+                        exceptions.append(e); abort_event.set()
+                    finally:
+                        progress.advance(progress_id, futures[fut])
+                        num_downloaded_segs = int(progress.tasks[progress_id].completed)
+                        progress.update(progress_id, description=f"HLSDownloader._downloadstreaming >>> completed ({num_downloaded_segs}/{len(jobs)})")
+            with buffer._lock: _savejournal(buffer.next_index, buffer.offset, force=True)
+            if exceptions: raise exceptions[0]
+            if buffer.next_index != len(jobs): raise RuntimeError(f"HLS stream incomplete: {buffer.next_index}/{len(jobs)} segments written")
+        finally:
+            fp.close()
+        replacefile(part_path, output_path)
+        os.remove(journal_path)
+    '''_plancoalescedgroups'''
+    def _plancoalescedgroups(self, jobs: List[SegmentJob], byteranges: List[Optional[str]]) -> List[List[SegmentJob]]:
+        # runs of jobs (in playlist order) whose byteranges continue each other on the same uri with the same key / init section, at most coalesce_max_bytes per run
+        groups: List[List[SegmentJob]] = []
+        settingsof = lambda job: (job.uri, job.key_method, job.key_uri, job.key_iv, job.keyformat, job.map_uri, job.map_byterange)
+        for job in jobs:
+            if self.coalesce_max_bytes and groups and byteranges[job.index] and byteranges[(prev := groups[-1][-1]).index] and settingsof(job) == settingsof(prev):
+                (length, offset), (prev_length, prev_offset) = self._parsebyterange(byteranges[job.index]), self._parsebyterange(byteranges[prev.index])
+                if offset == prev_offset + prev_length and offset + length - self._parsebyterange(byteranges[groups[-1][0].index])[1] <= self.coalesce_max_bytes: groups[-1].append(job); continue
+            groups.append([job])
+        return groups
+    '''_fetchgroup'''
+    def _fetchgroup(self, group: List[SegmentJob], byteranges: List[Optional[str]]) -> Iterator[Tuple[SegmentJob, Union[bytes, memoryview]]]:
+        # items are consumed before the next one is asked for, decrypted ones are views of the per-thread buffer of _cryptinto
+        if len(group) == 1: yield group[0], self._fetchandmaybedecrypt(group[0], byteranges[group[0].index]); return
+        (_, start), (last_length, last_offset) = self._parsebyterange(byteranges[group[0].index]), self._parsebyterange(byteranges[group[-1].index])
+        end, encrypted = last_offset + last_length, (group[0].key_method or "").strip().upper() not in ("", "NONE")
+        # decryption of a byterange reads whole aes blocks plus the previous block (cbc), the window is widened accordingly
+        if encrypted: start, end = max(0, (start // 16) * 16 - 16), int(math.ceil(end / 16) * 16)
+        reader = CoalescedRangeReader(self, group[0].uri, start, end)
+        if not encrypted:
+            try:
+                for job in group: yield job, self._fetchandmaybedecrypt(job, byteranges[job.index], fetchbytes=reader.fetchbytes)
+            finally:
+                reader.close()
+            return
+        # the network read of segment n + 1 runs on a prefetch thread while segment n is decrypted here, at most two fetched segments wait
+        raws, stop_event = queue.Queue(maxsize=2), threading.Event()
+        def _offer(item):
+            while not stop_event.is_set():
+                try: raws.put(item, timeout=0.1); return
+                except queue.Full: continue
+        def _prefetch():
+            try:
+                for job in group:
+                    if stop_event.is_set(): return
+                    _offer((job, *self._fetchraw(job, byteranges[job.index], reader.fetchbytes)))
+            except BaseException as err:
+                _offer(err)
+        prefetcher = threading.Thread(target=_prefetch, name="hls.prefetch", daemon=True); prefetcher.start()
+        try:
+            for _ in group:
+                if isinstance(item := raws.get(), BaseException): raise item
+                job, ciphertext, plan = item
+                yield job, self._decryptraw(ciphertext, plan)
+        finally:
+            stop_event.set(); prefetcher.join(); reader.close()
     '''_fetchandmaybedecrypt'''
-    def _fetchandmaybedecrypt(self, job: SegmentJob, eff_byterange: Optional[str]) -> bytes:
+    def _fetchandmaybedecrypt(self, job: SegmentJob, eff_byterange: Optional[str], fetchbytes: Callable[[str, Optional[str]], bytes] = None) -> Union[bytes, memoryview]:
+        return self._decryptraw(*self._fetchraw(job, eff_byterange, fetchbytes or self._fetchbytes))
+    '''_fetchraw'''
+    def _fetchraw(self, job: SegmentJob, eff_byterange: Optional[str], fetchbytes: Callable[[str, Optional[str]], bytes]) -> Tuple[bytes, Optional[DecryptPlan]]:
+        # network half of a segment: the bytes as served (whole aes blocks for a byterange of an encrypted one) and how to decrypt them, None for plain segments
         method_raw, keyformat = (job.key_method or "").strip(), (job.keyformat or "").strip().lower()
-        if not method_raw or method_raw.upper() == "NONE": return self._fetchbytes(job.uri, eff_byterange)
+        if not method_raw or method_raw.upper() == "NONE": return fetchbytes(job.uri, eff_byterange), None
         if keyformat and keyformat not in ("identity",): raise NotImplementedError(f"Unsupported KEYFORMAT={job.keyformat} (likely DRM).")
         method = method_raw.upper().replace("_", "-")
         dec_mode = self._classifyencryptionmethod(method)
         if dec_mode in ("DRM", "UNSUPPORTED"): raise NotImplementedError(f"Unsupported encryption method: {method_raw}")
         if not job.key_uri: raise RuntimeError(f"Encrypted segment missing key URI at seg {job.index}")
         key, base_iv = self._prepareaeskey(method, self._getkeybytes(job.key_uri)), self._deriveiv(job.key_iv, job.media_sequence + job.index)
-        if not eff_byterange: ciphertext = self._fetchbytes(job.uri, None); return self._decryptwhole(ciphertext, dec_mode, key, base_iv)
+        if not eff_byterange: return fetchbytes(job.uri, None), DecryptPlan(mode=dec_mode, key=key, iv=base_iv)
         length, offset = self._parsebyterange(eff_byterange)
         block, end = 16, offset + length
         aligned_start, aligned_end = (offset // block) * block, int(math.ceil(end / block) * block)
         if dec_mode == "CBC":
             fetch_start, drop = ((aligned_start - block, offset - aligned_start + block) if aligned_start > 0 else (aligned_start, offset - aligned_start)); fetch_len = aligned_end - fetch_start; fetch_range = f"{fetch_len}@{fetch_start}"
-            ciphertext = self._fetchbytes(job.uri, fetch_range)
+            ciphertext = fetchbytes(job.uri, fetch_range)
             iv = (b"\x00" * 16) if fetch_start > 0 else base_iv
-            plaintext = self._aescbcdecrypt(ciphertext, key, iv)
-            return plaintext[drop: drop+length]
+            return ciphertext, DecryptPlan(mode=dec_mode, key=key, iv=iv, drop=drop, length=length)
         else:
             fetch_start, drop, fetch_len, fetch_range = aligned_start, offset - aligned_start, aligned_end - aligned_start, f"{aligned_end - aligned_start}@{aligned_start}"
-            ciphertext = self._fetchbytes(job.uri, fetch_range)
+            ciphertext = fetchbytes(job.uri, fetch_range)
             block_index = fetch_start // block
             iv_int = int.from_bytes(base_iv, "big")
             adj_iv = ((iv_int + block_index) % (1 << 128)).to_bytes(16, "big")
-            plaintext = self._aesctrcrypt(ciphertext, key, adj_iv)
-            return plaintext[drop: drop+length]
-    '''_decryptwhole'''
-    def _decryptwhole(self, ciphertext: bytes, dec_mode: str, key: bytes, iv: bytes) -> bytes:
-        if dec_mode == "CBC": return self._aescbcdecrypt(ciphertext, key, iv)
-        if dec_mode == "CTR": return self._aesctrcrypt(ciphertext, key, iv)
-        raise NotImplementedError(f"decrypt mode {dec_mode} not supported")
+            return ciphertext, DecryptPlan(mode=dec_mode, key=key, iv=adj_iv, drop=drop, length=length)
+    '''_decryptraw'''
+    def _decryptraw(self, data: bytes, plan: Optional[DecryptPlan]) -> Union[bytes, memoryview]:
+        if plan is None: return data
+        if plan.mode not in ("CBC", "CTR"): raise NotImplementedError(f"decrypt mode {plan.mode} not supported")
+        if plan.mode == "CBC" and len(data) % 16 != 0: raise ValueError(f"CBC ciphertext length not multiple of 16: {len(data)} bytes")
+        # the byterange is cut out of the decrypted blocks as a view, without another copy
+        plaintext = self._cryptinto(data, plan.mode, plan.key, plan.iv)
+        return plaintext[plan.drop: None if plan.length is None else plan.drop + plan.length]
+    '''_aesalgorithm'''
+    def _aesalgorithm(self, key: bytes) -> algorithms.AES:
+        # the key object is built once per key, cipher contexts are bound to their iv and stay per segment
+        if (algorithm := self._aes_algorithms.get(key)) is None: algorithm = self._aes_algorithms[key] = algorithms.AES(key)
+        return algorithm
+    '''_cryptinto'''
+    def _cryptinto(self, data: bytes, mode: str, key: bytes, iv: bytes) -> memoryview:
+        # decrypts into the per-thread scratch buffer, the returned view is only valid until the next call on the same thread
+        ctx, need = Cipher(self._aesalgorithm(key), modes.CBC(iv) if mode == "CBC" else modes.CTR(iv)).decryptor(), len(data) + 15
+        if (scratch := getattr(self._tls, "scratch", None)) is None or len(scratch) < need:
+            scratch = bytearray(need)
+            if need <= self.max_scratch_size: self._tls.scratch = scratch
+        num_written = ctx.update_into(data, scratch)
+        if (tail := ctx.finalize()): scratch[num_written: num_written + len(tail)] = tail; num_written += len(tail)
+        return memoryview(scratch)[:num_written]
     '''_classifyencryptionmethod'''
     def _classifyencryptionmethod(self, method: str) -> str:
         m = method.strip().upper()
@@ -278,6 +598,7 @@ class HLSDownloader:
             if "," in key_uri: raw = key_uri.split(",", 1)[1]; return raw.encode("utf-8", errors="ignore")
             raise ValueError("Unsupported data: key URI")
         if key_uri.startswith("skd://"): raise NotImplementedError("skd:// indicates DRM (FairPlay). Not supported.")
+        if self.engine is not None: return self.engine.getkey(key_uri, lambda: self._getbytes(key_uri))
         with self._key_cache_lock:
             if key_uri in self._key_cache: return self._key_cache[key_uri]
         b = self._getbytes(key_uri)
@@ -327,14 +648,10 @@ class HLSDownloader:
     '''_aescbcdecrypt'''
     def _aescbcdecrypt(self, ciphertext: bytes, key: bytes, iv: bytes) -> bytes:
         if len(ciphertext) % 16 != 0: raise ValueError(f"CBC ciphertext length not multiple of 16: {len(ciphertext)} bytes")
-        cipher = Cipher(algorithms.AES(key), modes.CBC(iv))
-        dec = cipher.decryptor()
-        return dec.update(ciphertext) + dec.finalize()
+        return bytes(self._cryptinto(ciphertext, "CBC", key, iv))
     '''_aesctrcrypt'''
     def _aesctrcrypt(self, data: bytes, key: bytes, iv: bytes) -> bytes:
-        cipher = Cipher(algorithms.AES(key), modes.CTR(iv))
-        dec = cipher.decryptor()
-        return dec.update(data) + dec.finalize()
+        return bytes(self._cryptinto(data, "CTR", key, iv))
     '''_parsebyterange'''
     def _parsebyterange(self, s: str) -> Tuple[int, int]:
         s = s.strip()
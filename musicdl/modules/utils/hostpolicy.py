@@ -0,0 +1,146 @@
+'''
+Function:
+    Implementation of per-host request policies (token bucket rate limiting, circuit breaking and backoff with jitter)
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import time
+import random
+import threading
+from .hosts import obtainhostname, hostmatchessuffix
+
+
+'''CircuitOpenError'''
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+'''TokenBucket'''
+class TokenBucket():
+    def __init__(self, rate: float, burst: float = None):
+        self.rate = float(rate)
+        self.burst = float(burst) if burst else max(1.0, self.rate)
+        self._tokens, self._updated_at = self.burst, time.monotonic()
+        self._lock = threading.Lock()
+    '''reserve'''
+    def reserve(self) -> float:
+        # takes a token right away and returns how long the caller has to wait for it, a negative balance queues callers in arrival order
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+    '''release'''
+    def release(self):
+        # gives back a reserved token the caller will not use, e.g., because its wait does not fit into the deadline
+        with self._lock: self._tokens = min(self.burst, self._tokens + 1)
+
+
+'''CircuitBreaker'''
+class CircuitBreaker():
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0, half_open_max_calls: int = 1):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = float(cooldown)
+        self.half_open_max_calls = max(1, int(half_open_max_calls))
+        self._state, self._num_failures, self._opened_at, self._num_probes = self.CLOSED, 0, 0.0, 0
+        self._lock = threading.Lock()
+    '''state'''
+    @property
+    def state(self) -> str:
+        with self._lock: return self._refreshstate()
+    '''_refreshstate'''
+    def _refreshstate(self) -> str:
+        if self._state == self.OPEN and (time.monotonic() - self._opened_at) >= self.cooldown: self._state, self._num_probes = self.HALF_OPEN, 0
+        return self._state
+    '''allow'''
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._refreshstate()
+            if state == self.CLOSED: return True
+            if state == self.HALF_OPEN and self._num_probes < self.half_open_max_calls: self._num_probes += 1; return True
+            return False
+    '''recordsuccess'''
+    def recordsuccess(self):
+        with self._lock: self._state, self._num_failures, self._num_probes = self.CLOSED, 0, 0
+    '''recordfailure'''
+    def recordfailure(self):
+        with self._lock:
+            self._num_failures += 1
+            # a failed probe re-opens the circuit at once, otherwise only consecutive failures beyond the threshold do
+            if self._state == self.HALF_OPEN or self._num_failures >= self.failure_threshold: self._state, self._opened_at, self._num_probes = self.OPEN, time.monotonic(), 0
+
+
+'''HostPolicy'''
+class HostPolicy():
+    def __init__(self, rate: float = None, burst: float = None, failure_threshold: int = 5, cooldown: float = 30.0, half_open_max_calls: int = 1, backoff_base: float = 0.5, backoff_cap: float = 8.0):
+        self.token_bucket = TokenBucket(rate, burst) if rate else None
+        self.circuit_breaker = CircuitBreaker(failure_threshold=failure_threshold, cooldown=cooldown, half_open_max_calls=half_open_max_calls) if failure_threshold else None
+        self.backoff_base = float(backoff_base)
+        self.backoff_cap = float(backoff_cap)
+
+
+'''HostPolicyRegistry'''
+class HostPolicyRegistry():
+    DEFAULT_CFG = dict(rate=None, burst=None, failure_threshold=5, cooldown=30.0, half_open_max_calls=1, backoff_base=0.5, backoff_cap=8.0)
+    def __init__(self, cfg: dict = None):
+        cfg = dict(cfg or {})
+        # hosts maps a host suffix (e.g., "api.bugpk.com" or "music.163.com") to overrides of the default policy
+        self.host_cfgs: dict[str, dict] = dict(cfg.pop('hosts', None) or {})
+        self.default_cfg = {**self.DEFAULT_CFG, **cfg}
+        self._policies: dict[str, HostPolicy] = {}
+        self._lock = threading.Lock()
+    '''__deepcopy__'''
+    def __deepcopy__(self, memo):
+        # breaker and bucket state is shared by every copy of a client cfg
+        return self
+    '''policyfor'''
+    def policyfor(self, url: str) -> HostPolicy:
+        host = obtainhostname(url) or ''
+        with self._lock:
+            if (policy := self._policies.get(host)) is None:
+                overrides = next((v for k, v in sorted(self.host_cfgs.items(), key=lambda kv: -len(kv[0])) if hostmatchessuffix(host, {k})), {})
+                policy = self._policies[host] = HostPolicy(**{**self.default_cfg, **overrides})
+            return policy
+    '''admit'''
+    def admit(self, url: str, max_wait: float = None) -> float | None:
+        # raises CircuitOpenError for a host known to be down, otherwise returns the seconds to wait for a rate limit token,
+        # None (without keeping the token) when that wait would exceed max_wait
+        policy = self.policyfor(url)
+        if policy.circuit_breaker is not None and not policy.circuit_breaker.allow(): raise CircuitOpenError(f'circuit open for {obtainhostname(url)}, retry after {policy.circuit_breaker.cooldown:.0f}s cool-down')
+        delay = policy.token_bucket.reserve() if policy.token_bucket is not None else 0.0
+        if max_wait is not None and delay > max_wait: policy.token_bucket.release(); return None
+        return delay
+    '''acquire'''
+    def acquire(self, url: str, max_wait: float = None) -> bool:
+        # returns False without waiting when the rate limit wait would exceed max_wait
+        if (delay := self.admit(url, max_wait=max_wait)) is None: return False
+        if delay > 0: time.sleep(delay)
+        return True
+    '''isretryable'''
+    @staticmethod
+    def isretryable(err: Exception = None) -> bool:
+        # connection errors, timeouts, 429 and 5xx mean the host is struggling, other http errors are answers from a healthy host
+        if err is None: return False
+        status_code = getattr(getattr(err, 'response', None), 'status_code', None)
+        # curl_cffi attaches an empty response with status 0 to transport errors
+        return not status_code or status_code == 429 or status_code >= 500
+    '''recordoutcome'''
+    def recordoutcome(self, url: str, err: Exception = None) -> bool:
+        policy, retryable = self.policyfor(url), self.isretryable(err)
+        if policy.circuit_breaker is not None: policy.circuit_breaker.recordfailure() if retryable else policy.circuit_breaker.recordsuccess()
+        return retryable
+    '''backoffdelay'''
+    def backoffdelay(self, url: str, attempt: int, err: Exception = None) -> float:
+        # full jitter exponential backoff, a Retry-After sent with 429/503 is honored up to backoff_cap
+        policy = self.policyfor(url)
+        retry_after = str(getattr(getattr(err, 'response', None), 'headers', None) and err.response.headers.get('Retry-After') or '')
+        if retry_after.isdigit(): return min(policy.backoff_cap, float(retry_after))
+        return random.uniform(0, min(policy.backoff_cap, policy.backoff_base * (2 ** attempt)))
+    '''stats'''
+    def stats(self) -> dict:
+        with self._lock: policies = dict(self._policies)
+        return {host: (policy.circuit_breaker.state if policy.circuit_breaker is not None else CircuitBreaker.CLOSED) for host, policy in policies.items()}
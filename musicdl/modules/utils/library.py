@@ -0,0 +1,207 @@
+'''
+Function:
+    Implementation of DownloadLibrary
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import os
+import json
+import atexit
+import time
+import shutil
+import filecmp
+import hashlib
+import threading
+from contextlib import contextmanager
+from platformdirs import user_data_dir
+
+
+'''DownloadLibrary'''
+class DownloadLibrary():
+    _shared_instance, _shared_lock = None, threading.Lock()
+    def __init__(self, path: str = None, enable: bool = True, link_mode: str = 'hardlink', flush_every: int = 64, flush_interval: float = 30.0):
+        # path: json index on disk, None keeps the library in memory for the lifetime of the process
+        self.path, self.enable = path, enable
+        # link_mode: how a song that is already in the library lands in a new work_dir, 'hardlink' (falls back to a copy across devices) or 'copy'
+        assert link_mode in {'hardlink', 'copy'}, f'unsupported link_mode {link_mode}'
+        self.link_mode = link_mode
+        # keys: 'source|identifier|quality' -> sha256 of the downloaded body, objects: sha256 -> {path: [size, mtime_ns]} of the files holding that body
+        self._index: dict = None
+        # changes since the last flush, replayed onto the index on disk so entries written by other processes in the meantime are kept (see flush)
+        self._journal: list[tuple] = []
+        # the journal is written out in batches, once flush_every changes piled up or flush_interval seconds passed, and by flush() at the end of every download() / at exit
+        self.flush_every, self.flush_interval, self._last_flush = max(1, int(flush_every)), float(flush_interval), time.monotonic()
+        self._counters = dict(hits=0, misses=0, stale=0, linked=0, copied=0, deduplicated=0, bytes_saved=0, flushes=0)
+        self._lock, self._flush_lock = threading.RLock(), threading.Lock()
+        if self.path: atexit.register(self.flush)
+    '''shared'''
+    @classmethod
+    def shared(cls) -> 'DownloadLibrary':
+        with cls._shared_lock:
+            if cls._shared_instance is None: cls._shared_instance = cls(path=os.path.join(user_data_dir(appname='musicdl', appauthor='zcjin'), 'library.json'))
+            return cls._shared_instance
+    '''__deepcopy__'''
+    def __deepcopy__(self, memo):
+        # client cfgs are deep-copied by BaseModuleBuilder.build, the library is a shared handle and must survive that
+        return self
+    '''keyfor'''
+    @staticmethod
+    def keyfor(source: str, identifier, quality) -> str:
+        return f'{source}|{identifier}|{quality}'
+    '''hashfile'''
+    @staticmethod
+    def hashfile(path: str, chunk_size: int = 1024 * 1024) -> str:
+        hasher = hashlib.sha256()
+        with open(path, 'rb') as fp:
+            while (chunk := fp.read(chunk_size)): hasher.update(chunk)
+        return hasher.hexdigest()
+    '''_read'''
+    def _read(self) -> dict:
+        index = {'keys': {}, 'objects': {}}
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as fp: loaded = json.load(fp)
+                index.update({k: loaded[k] for k in ('keys', 'objects') if isinstance(loaded.get(k), dict)})
+            except Exception:
+                pass
+        return index
+    '''_load'''
+    def _load(self) -> dict:
+        if self._index is None: self._index = self._read()
+        return self._index
+    '''_apply'''
+    @staticmethod
+    def _apply(index: dict, change: tuple):
+        # ('key', key, sha256 or None to drop it) / ('object', sha256, path, [size, mtime_ns] or None to drop it)
+        if change[0] == 'key':
+            _, key, sha256 = change
+            if sha256 is None: index['keys'].pop(key, None)
+            else: index['keys'][key] = sha256
+            return
+        _, sha256, path, meta = change
+        if meta is not None: index['objects'].setdefault(sha256, {})[path] = meta; return
+        if (paths := index['objects'].get(sha256)) is None: return
+        paths.pop(path, None)
+        if not paths: index['objects'].pop(sha256, None)
+    '''_change'''
+    def _change(self, *change):
+        self._apply(self._load(), change)
+        if self.path: self._journal.append(change)
+    '''_filelock'''
+    @contextmanager
+    def _filelock(self, stale_after: float = 10.0):
+        # a lock file created with O_EXCL serializes the read-merge-write of the index across processes, one left behind by a crashed process expires after stale_after seconds
+        lock_path = f'{self.path}.lock'
+        while True:
+            try: fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY); break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > stale_after: os.remove(lock_path); continue
+                except OSError:
+                    continue
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            os.close(fd)
+            try: os.remove(lock_path)
+            except OSError: pass
+    '''flush'''
+    def flush(self):
+        if not self.path: return
+        # the journal is swapped out under self._lock and merged into the file without holding it, so lookups and adds of other downloads never wait for the disk
+        with self._flush_lock:
+            with self._lock: journal, self._journal, self._last_flush = self._journal, [], time.monotonic()
+            if not journal: return
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                # several processes may share one library.json, so the file is re-read under the lock file and only the changes of this process are applied on top of it
+                with self._filelock():
+                    index = self._read()
+                    for change in journal: self._apply(index, change)
+                    tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+                    with open(tmp_path, 'w', encoding='utf-8') as fp: json.dump(index, fp)
+                    os.replace(tmp_path, self.path)
+            except Exception:
+                with self._lock: self._journal[:0] = journal
+                return
+            # changes made while the file was written are replayed onto the merged index and stay in the journal for the next flush
+            with self._lock:
+                for change in self._journal: self._apply(index, change)
+                self._index = index; self._counters['flushes'] += 1
+    '''_maybeflush'''
+    def _maybeflush(self):
+        # never called under self._lock, flush takes self._flush_lock first
+        if not self.path or not self._journal: return
+        if len(self._journal) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval: self.flush()
+    '''_livepaths'''
+    def _livepaths(self, sha256: str) -> list[str]:
+        # files that were moved, deleted or edited since they were recorded are dropped from the index
+        paths = dict(self._load()['objects'].get(sha256, {}))
+        for path, (size, mtime_ns) in list(paths.items()):
+            try: stat = os.stat(path)
+            except OSError: stat = None
+            if stat is None or stat.st_size != size or stat.st_mtime_ns != mtime_ns: paths.pop(path); self._change('object', sha256, path, None); self._counters['stale'] += 1
+        return list(paths)
+    '''lookup'''
+    def lookup(self, key: str) -> str | None:
+        if not self.enable: return None
+        with self._lock:
+            if (sha256 := self._load()['keys'].get(key)) is None: self._counters['misses'] += 1; return None
+            if not (paths := self._livepaths(sha256)): self._change('key', key, None); self._counters['misses'] += 1
+            else: self._counters['hits'] += 1
+        self._maybeflush()
+        return paths[0] if paths else None
+    '''materialize'''
+    def materialize(self, src_path: str, dest_path: str) -> str:
+        # hard links share the bytes on disk, a copy is the fallback across devices / on filesystems without links
+        os.makedirs(os.path.dirname(dest_path) or '.', exist_ok=True); mode = None
+        if self.link_mode == 'hardlink':
+            try: os.link(src_path, dest_path); mode = 'hardlink'
+            except OSError: mode = None
+        if mode is None: shutil.copy2(src_path, dest_path); mode = 'copy'
+        with self._lock: self._counters['linked' if mode == 'hardlink' else 'copied'] += 1
+        return mode
+    '''fetch'''
+    def fetch(self, key: str, dest_path: str) -> str | None:
+        # returns how the song was placed at dest_path ('hardlink' / 'copy'), None if it still has to be downloaded
+        if (src_path := self.lookup(key)) is None: return None
+        try: mode = self.materialize(src_path, dest_path)
+        except OSError: return None
+        # the new copy / link is recorded as well, so the song stays available when the original file is removed
+        with self._lock:
+            stat = os.stat(dest_path); self._counters['bytes_saved'] += stat.st_size
+            if (sha256 := self._load()['keys'].get(key)) is not None: self._change('object', sha256, os.path.abspath(dest_path), [stat.st_size, stat.st_mtime_ns])
+        self._maybeflush()
+        return mode
+    '''add'''
+    def add(self, key: str, path: str, sha256: str = None):
+        # sha256 is the digest of the downloaded body (computed while streaming where possible), the file itself may have been tagged since
+        if not self.enable or not os.path.exists(path): return
+        sha256 = sha256 or self.hashfile(path)
+        with self._lock:
+            # the same body already on disk under another key (e.g., another search or source) is shared instead of stored twice, if the files are identical
+            for other_path in self._livepaths(sha256):
+                if self.link_mode != 'hardlink' or os.path.samefile(other_path, path) or not filecmp.cmp(other_path, path, shallow=False): continue
+                tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.link'
+                try: os.link(other_path, tmp_path); os.replace(tmp_path, path)
+                except OSError:
+                    if os.path.exists(tmp_path): os.remove(tmp_path)
+                    continue
+                self._counters['deduplicated'] += 1; self._counters['bytes_saved'] += os.path.getsize(path)
+                break
+            stat = os.stat(path)
+            self._change('key', key, sha256); self._change('object', sha256, os.path.abspath(path), [stat.st_size, stat.st_mtime_ns])
+        self._maybeflush()
+    '''stats'''
+    def stats(self) -> dict:
+        with self._lock:
+            index = self._load()
+            return {'num_keys': len(index['keys']), 'num_objects': len(index['objects']), 'num_pending_changes': len(self._journal), **self._counters}
+    '''clear'''
+    def clear(self):
+        with self._flush_lock, self._lock:
+            self._index, self._journal = {'keys': {}, 'objects': {}}, []
+            if self.path and os.path.exists(self.path): os.remove(self.path)
@@ -0,0 +1,107 @@
+'''
+Function:
+    Implementation of LinkStatusCache
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import re
+import copy
+import time
+import threading
+from datetime import datetime, timezone, timedelta
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+'''LinkStatusCache'''
+class LinkStatusCache():
+    EPOCH_QUERY_KEYS = {'expires', 'expire', 'x-expires', 'x-oss-expires', 'deadline', 'exp', 'e', 'validto'}
+    HEX_EPOCH_QUERY_KEYS = {'txtime', 'wstime'}
+    NETEASE_PATH_EXPIRY_PATTERN = re.compile(r'^/(20\d{12})/')
+    _shared_instance, _shared_lock = None, threading.Lock()
+    def __init__(self, max_entries: int = 4096, default_ttl: float = 300, max_ttl: float = 1800, negative_ttl: float = 30, expiry_margin: float = 30):
+        self.max_entries = max(0, int(max_entries))
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self.expiry_margin = expiry_margin
+        # key -> (expires_at, outputs), ordered from least to most recently used
+        self._entries: OrderedDict[tuple, tuple] = OrderedDict()
+        self._counters = dict(hits=0, misses=0, negative_hits=0, evictions=0, expirations=0)
+        self._lock = threading.Lock()
+    '''shared'''
+    @classmethod
+    def shared(cls) -> 'LinkStatusCache':
+        with cls._shared_lock:
+            if cls._shared_instance is None: cls._shared_instance = cls()
+            return cls._shared_instance
+    '''__deepcopy__'''
+    def __deepcopy__(self, memo):
+        # client cfgs are deep-copied by BaseModuleBuilder.build, the cache is a shared handle and must survive that
+        return self
+    '''normalizeurl'''
+    @staticmethod
+    def normalizeurl(url: str) -> str:
+        parts = urlsplit(str(url).strip())
+        netloc = parts.netloc.lower()
+        if (parts.scheme.lower(), netloc.rsplit(':', 1)[-1]) in {('http', '80'), ('https', '443')}: netloc = netloc.rsplit(':', 1)[0]
+        return urlunsplit((parts.scheme.lower(), netloc, parts.path or '/', urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True))), ''))
+    '''expiryfromurl'''
+    def expiryfromurl(self, url: str) -> float | None:
+        parts, now = urlsplit(str(url)), time.time()
+        plausible = lambda ts: ts if (now - 86400) < ts < (now + 86400 * 30) else None
+        query = {k.lower(): v for k, v in parse_qsl(parts.query, keep_blank_values=True)}
+        for key in self.EPOCH_QUERY_KEYS & query.keys():
+            if not query[key].isdigit(): continue
+            ts = int(query[key]); ts = ts / 1000 if ts > 1e12 else ts
+            if (ts := plausible(ts)): return ts
+        for key in self.HEX_EPOCH_QUERY_KEYS & query.keys():
+            try: ts = plausible(int(query[key], 16))
+            except ValueError: continue
+            if ts: return ts
+        if 'x-amz-date' in query and query.get('x-amz-expires', '').isdigit():
+            try: return datetime.strptime(query['x-amz-date'], '%Y%m%dT%H%M%SZ').replace(tzinfo=timezone.utc).timestamp() + int(query['x-amz-expires'])
+            except ValueError: pass
+        # music.126.net style links carry their expiry in beijing time as the first path segment
+        if (m := self.NETEASE_PATH_EXPIRY_PATTERN.match(parts.path)):
+            try: return plausible(datetime.strptime(m.group(1), '%Y%m%d%H%M%S').replace(tzinfo=timezone(timedelta(hours=8))).timestamp())
+            except ValueError: pass
+        return None
+    '''ttlfor'''
+    def ttlfor(self, url: str, ok: bool) -> float:
+        if not ok: return self.negative_ttl
+        expiry = self.expiryfromurl(url)
+        if expiry is None: return self.default_ttl
+        return max(0, min(self.max_ttl, expiry - time.time() - self.expiry_margin))
+    '''get'''
+    def get(self, key: tuple):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                self._entries.pop(key); self._counters['expirations'] += 1; entry = None
+            if entry is None:
+                self._counters['misses'] += 1
+                return None
+            self._entries.move_to_end(key); self._counters['hits'] += 1
+            if not entry[2]: self._counters['negative_hits'] += 1
+        # callers mutate the returned status dicts, never hand out the cached object itself
+        return copy.deepcopy(entry[1])
+    '''set'''
+    def set(self, key: tuple, outputs: dict, url: str, ok: bool):
+        ttl = self.ttlfor(url, ok)
+        if ttl <= 0 or self.max_entries <= 0: return
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, copy.deepcopy(outputs), bool(ok))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False); self._counters['evictions'] += 1
+    '''stats'''
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(entries=len(self._entries), **self._counters)
+    '''clear'''
+    def clear(self):
+        with self._lock: self._entries.clear()
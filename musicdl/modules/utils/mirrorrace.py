@@ -0,0 +1,126 @@
+'''
+Function:
+    Implementation of MirrorScoreboard and MirrorRacer
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import os
+import json
+import time
+import atexit
+import threading
+from typing import Any, Callable
+from platformdirs import user_cache_dir
+from concurrent.futures import Executor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+'''MirrorScoreboard'''
+class MirrorScoreboard():
+    _shared_instance, _shared_lock = None, threading.Lock()
+    def __init__(self, path: str = None, decay: float = 0.9, latency_alpha: float = 0.3, prior_latency: float = 3.0, save_interval: float = 30):
+        self.path = path
+        # decay < 1 turns success counts into an online rate that forgets mirrors which were healthy long ago
+        self.decay = decay
+        self.latency_alpha = latency_alpha
+        self.prior_latency = prior_latency
+        self.save_interval = save_interval
+        self._stats: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._last_saved, self._dirty = time.time(), False
+        self.load()
+    '''shared'''
+    @classmethod
+    def shared(cls) -> 'MirrorScoreboard':
+        with cls._shared_lock:
+            if cls._shared_instance is None:
+                cls._shared_instance = cls(path=os.path.join(user_cache_dir(appname='musicdl', appauthor='zcjin'), 'mirror_scores.json'))
+                atexit.register(cls._shared_instance.save)
+            return cls._shared_instance
+    '''load'''
+    def load(self):
+        if not self.path or not os.path.exists(self.path): return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as fp: stats = json.load(fp)
+            with self._lock: self._stats.update({k: v for k, v in stats.items() if isinstance(v, dict) and {'attempts', 'successes', 'latency'} <= v.keys()})
+        except Exception:
+            pass
+    '''save'''
+    def save(self):
+        if not self.path: return
+        with self._lock:
+            if not self._dirty: return
+            stats, self._dirty, self._last_saved = json.loads(json.dumps(self._stats)), False, time.time()
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as fp: json.dump(stats, fp)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            pass
+    '''expectedcost'''
+    def expectedcost(self, name: str) -> float:
+        # expected seconds until a valid result, i.e., latency per attempt divided by the smoothed success rate
+        with self._lock: stat = dict(self._stats.get(name) or {})
+        if not stat: return self.prior_latency / 0.5
+        success_rate = (stat['successes'] + 1) / (stat['attempts'] + 2)
+        return stat['latency'] / max(success_rate, 1e-3)
+    '''rank'''
+    def rank(self, names: list[str]) -> list[str]:
+        # stable sort, mirrors without history keep the order hard-coded by the client
+        return sorted(names, key=self.expectedcost)
+    '''record'''
+    def record(self, name: str, ok: bool, latency: float):
+        with self._lock:
+            stat = self._stats.setdefault(name, dict(attempts=0.0, successes=0.0, latency=self.prior_latency))
+            stat['attempts'] = stat['attempts'] * self.decay + 1
+            stat['successes'] = stat['successes'] * self.decay + (1 if ok else 0)
+            stat['latency'] = (1 - self.latency_alpha) * stat['latency'] + self.latency_alpha * max(0.0, float(latency))
+            self._dirty = True
+            should_save = (time.time() - self._last_saved) >= self.save_interval
+        if should_save: self.save()
+    '''stats'''
+    def stats(self) -> dict:
+        with self._lock: return json.loads(json.dumps(self._stats))
+
+
+'''MirrorRacer'''
+class MirrorRacer():
+    def __init__(self, scoreboard: MirrorScoreboard = None, top_k: int = 2, hedge_delay: float = 1.5, isvalid: Callable[[Any], bool] = None):
+        self.scoreboard = scoreboard or MirrorScoreboard()
+        self.top_k = max(1, int(top_k))
+        self.hedge_delay = hedge_delay
+        self.isvalid = isvalid or (lambda song_info: bool(getattr(song_info, 'with_valid_download_url', False)))
+    '''_record'''
+    def _record(self, name: str, future, start_time: float):
+        if future.cancelled(): return
+        try: result = future.result()
+        except Exception: result = None
+        self.scoreboard.record(name, ok=(result is not None and self.isvalid(result)), latency=time.perf_counter() - start_time)
+    '''race'''
+    def race(self, resolvers: list[tuple[str, Callable[[], Any]]], default: Any = None, executor: Executor = None):
+        # resolvers are (name, zero-arg callable) pairs, the best scored top_k start at once and one more is hedged in whenever hedge_delay passes without a winner
+        if not resolvers: return default
+        funcs, queue, running = dict(resolvers), self.scoreboard.rank([name for name, _ in resolvers]), {}
+        executor = executor or ThreadPoolExecutor(max_workers=len(queue))
+        def _launch(name: str):
+            start_time = time.perf_counter()
+            future = executor.submit(funcs[name]); running[future] = name
+            future.add_done_callback(lambda f: self._record(name, f, start_time))
+        try:
+            for _ in range(min(self.top_k, len(queue))): _launch(queue.pop(0))
+            while running:
+                done, _ = wait(list(running.keys()), timeout=(self.hedge_delay if queue else None), return_when=FIRST_COMPLETED)
+                if not done: _launch(queue.pop(0)); continue
+                for future in done:
+                    running.pop(future)
+                    try: result = future.result()
+                    except Exception: result = None
+                    if result is not None and self.isvalid(result): return result
+                    # a failed mirror frees its slot for the next best one right away
+                    if queue: _launch(queue.pop(0))
+        finally:
+            # mirrors not started yet are dropped, the ones in flight finish in the background and still feed the scoreboard
+            executor.shutdown(wait=False, cancel_futures=True)
+        return default
@@ -20,9 +20,13 @@ import functools
 import json_repair
 import unicodedata
 from io import BytesIO
+from typing import Any
 from pathlib import Path
+from dataclasses import dataclass
 from bs4 import BeautifulSoup
 from .importutils import optionalimport
+from .linkcache import LinkStatusCache
+from fake_useragent import UserAgent
 from mutagen import File as MutagenFile
 from pathvalidate import sanitize_filepath, sanitize_filename
 
@@ -208,40 +212,45 @@ def cachecookies(client_name: str = '', cache_cookie_path: str = '', client_cook
         pickle.dump(cookies, fp)
 
 
+'''RequestContext'''
+@dataclass(frozen=True)
+class RequestContext:
+    # which phase (search / download / parse) the context belongs to
+    phase: str
+    # headers, cookies and impersonation switch configured for this phase on the client
+    headers: dict
+    cookies: dict
+    enable_curl_cffi: bool
+    # session owned by the thread which resolved the context
+    session: Any
+    # generation of the client when resolving, contexts are re-resolved lazily once the client calls _initsession again
+    generation: int = 0
+
+
+'''userequestcontext'''
+def userequestcontext(phase: str):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if not hasattr(self, 'requestcontext'): return func(self, *args, **kwargs)
+            with self.requestcontext(phase): return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
 '''usedownloadheaderscookies'''
 def usedownloadheaderscookies(func):
-    @functools.wraps(func)
-    def wrapper(self, *args, **kwargs):
-        self.default_headers = self.default_download_headers
-        if hasattr(self, 'default_download_cookies'): self.default_cookies = self.default_download_cookies
-        if hasattr(self, 'enable_download_curl_cffi'): self.enable_curl_cffi = self.enable_download_curl_cffi
-        if hasattr(self, '_initsession'): self._initsession()
-        return func(self, *args, **kwargs)
-    return wrapper
+    return userequestcontext('download')(func)
 
 
 '''useparseheaderscookies'''
 def useparseheaderscookies(func):
-    @functools.wraps(func)
-    def wrapper(self, *args, **kwargs):
-        self.default_headers = self.default_parse_headers
-        if hasattr(self, 'default_parse_cookies'): self.default_cookies = self.default_parse_cookies
-        if hasattr(self, 'enable_parse_curl_cffi'): self.enable_curl_cffi = self.enable_parse_curl_cffi
-        if hasattr(self, '_initsession'): self._initsession()
-        return func(self, *args, **kwargs)
-    return wrapper
+    return userequestcontext('parse')(func)
 
 
 '''usesearchheaderscookies'''
 def usesearchheaderscookies(func):
-    @functools.wraps(func)
-    def wrapper(self, *args, **kwargs):
-        self.default_headers = self.default_search_headers
-        if hasattr(self, 'default_search_cookies'): self.default_cookies = self.default_search_cookies
-        if hasattr(self, 'enable_search_curl_cffi'): self.enable_curl_cffi = self.enable_search_curl_cffi
-        if hasattr(self, '_initsession'): self._initsession()
-        return func(self, *args, **kwargs)
-    return wrapper
+    return userequestcontext('search')(func)
 
 
 '''searchdictbykey'''
@@ -256,6 +265,29 @@ def searchdictbykey(obj, target_key: str):
     return results
 
 
+'''cachelinkstatus'''
+def cachelinkstatus(is_ok):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, url: str, request_overrides: dict = None, *args, **kwargs):
+            link_status_cache = getattr(self, 'link_status_cache', None)
+            if link_status_cache is None or not url: return func(self, url, request_overrides, *args, **kwargs)
+            key = (func.__name__, link_status_cache.normalizeurl(url))
+            if (outputs := link_status_cache.get(key)) is not None: return outputs
+            outputs = func(self, url, request_overrides, *args, **kwargs)
+            link_status_cache.set(key, outputs, url=url, ok=is_ok(outputs))
+            return outputs
+        return wrapper
+    return decorator
+
+
+'''shareduseragent'''
+@functools.lru_cache(maxsize=1)
+def shareduseragent() -> UserAgent:
+    # building a UserAgent parses the bundled browsers database (~100ms), one instance serves every client and thread
+    return UserAgent()
+
+
 '''AudioLinkTester'''
 class AudioLinkTester(object):
     MAGIC = [
@@ -269,8 +301,9 @@ class AudioLinkTester(object):
         "audio/mpeg": "mp3", "audio/mp3": "mp3", "audio/mp4": "m4a", "audio/x-m4a": "m4a", "audio/aac": "aac", "audio/wav": "wav", "video/mp4": "mp4",
         "audio/x-wav": "wav", "audio/flac": "flac", "audio/x-flac": "flac", "audio/ogg": "ogg", "audio/opus": "opus", "audio/x-aac": "ogg",
     }
-    def __init__(self, timeout=(5, 15), headers: dict = None, cookies: dict = None):
+    def __init__(self, timeout=(5, 15), headers: dict = None, cookies: dict = None, link_status_cache: LinkStatusCache = None):
         self.session = requests.Session()
+        self.link_status_cache = link_status_cache
         self.timeout = timeout
         self.headers = {'Accept': '*/*', 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36'}
         self.headers.update(headers or {})
@@ -289,6 +322,7 @@ class AudioLinkTester(object):
         if len(b) >= 2 and b[0] == 0xFF and (b[1] & 0xF0) == 0xF0: return "aac/adts"
         return None
     '''probe'''
+    @cachelinkstatus(lambda outputs: outputs.get('file_size') not in (None, 'NULL'))
     def probe(self, url: str, request_overrides: dict = None):
         request_overrides, naive_guess_ext = request_overrides or {}, url.split('?')[0].split('.')[-1]
         if 'headers' not in request_overrides: request_overrides['headers'] = self.headers
@@ -324,6 +358,7 @@ class AudioLinkTester(object):
             outputs = dict(file_size='NULL', ctype='NULL', ext='NULL', download_url=url, final_url='NULL')
         return outputs
     '''test'''
+    @cachelinkstatus(lambda outputs: bool(outputs.get('ok')))
     def test(self, url: str, request_overrides: dict = None):
         request_overrides, naive_guess_ext = request_overrides or {}, url.split('?')[0].split('.')[-1]
         if 'headers' not in request_overrides: request_overrides['headers'] = self.headers
@@ -361,4 +396,45 @@ class AudioLinkTester(object):
         except Exception as err:
             outputs["reason"] = f"RANGEGET error: {err}"
         # return
+        return outputs
+    '''inspect'''
+    @cachelinkstatus(lambda outputs: bool(outputs.get('ok')))
+    def inspect(self, url: str, request_overrides: dict = None, num_range_bytes: int = 1024):
+        # one ranged GET yields both the test() and the probe() results, the latter is nested under probe_status as the sources expect
+        request_overrides, naive_guess_ext, num_range_bytes = dict(request_overrides or {}), url.split('?')[0].split('.')[-1], max(16, int(num_range_bytes))
+        request_overrides['headers'] = {k: v for k, v in (request_overrides.get('headers') or self.headers).items() if str(k).lower() != 'range'}
+        request_overrides['headers']['Range'] = f'bytes=0-{num_range_bytes - 1}'
+        if 'timeout' not in request_overrides: request_overrides['timeout'] = self.timeout
+        if 'cookies' not in request_overrides: request_overrides['cookies'] = self.cookies
+        outputs = dict(ok=False, status=0, method="RANGEGET", final_url=None, ctype=None, clen=None, range=None, fmt=None, reason="")
+        probe_outputs = dict(file_size='NULL', ctype='NULL', ext='NULL', download_url=url, final_url='NULL')
+        try:
+            resp = self.session.get(url, stream=True, allow_redirects=True, **request_overrides)
+            # a few servers reject the range outright, the plain streamed GET is the only extra round trip inspect() ever makes
+            if resp.status_code == 416:
+                resp.close(); request_overrides['headers'].pop('Range')
+                resp = self.session.get(url, stream=True, allow_redirects=True, **request_overrides)
+            outputs.update(dict(status=resp.status_code, final_url=str(resp.url)))
+            if resp.status_code not in (200, 206):
+                resp.close(); outputs["reason"] = f"RANGEGET error: response status {resp.status_code}"; outputs['probe_status'] = probe_outputs
+                return outputs
+            # drain the small ranged body so the connection goes back to the pool, a server ignoring Range only costs the first chunk
+            if resp.status_code == 206: chunk = resp.raw.read(num_range_bytes, decode_content=False) or b""
+            else: chunk = next(resp.iter_content(chunk_size=16), b"")
+            resp.close()
+            ctype = resp.headers.get("Content-Type")
+            if ctype == 'image/jpg; charset=UTF-8' or ctype == 'image/jpg': ctype = 'audio/mpeg'
+            if ctype == 'text/plain' and naive_guess_ext == 'm4s': ctype = 'audio/mp4'
+            clen = (resp.headers.get("Content-Range") or "").split("/")[-1] if resp.status_code == 206 else resp.headers.get("Content-Length")
+            outputs.update(dict(ctype=ctype, clen=int(clen) if clen and str(clen).isdigit() else None, fmt=self.sniffmagic(chunk)))
+            outputs["range"] = (resp.status_code == 206) or (resp.headers.get("Accept-Ranges") or "").lower() == "bytes"
+            if self.isaudioct(outputs["ctype"]) or outputs["fmt"] or (naive_guess_ext in ('m4s',)): outputs.update(dict(ok=True, reason="RANGEGET success"))
+            else: outputs.update(dict(ok=False, reason="RANGEGET error: Not audio-like (CT/magic)"))
+            ext = self.CTYPE_TO_EXT.get(ctype, 'NULL')
+            if ext == 'NULL' and outputs["fmt"]: ext = {'mp4/m4a': 'm4a', 'aac/adts': 'aac', 'midi': 'mid'}.get(outputs["fmt"], outputs["fmt"])
+            probe_outputs = dict(file_size=byte2mb(outputs["clen"]) if outputs["clen"] else 'NULL', ctype=ctype or 'NULL', ext=ext, download_url=url, final_url=str(resp.url))
+        except Exception as err:
+            outputs["reason"] = f"RANGEGET error: {err}"
+        # return
+        outputs['probe_status'] = probe_outputs
         return outputs
\ No newline at end of file
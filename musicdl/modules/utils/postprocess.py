@@ -0,0 +1,74 @@
+'''
+Function:
+    Implementation of PostProcessPool
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import time
+import queue
+import threading
+from typing import Any, Callable
+from concurrent.futures import Future
+
+
+'''PostProcessPool'''
+class PostProcessPool():
+    def __init__(self, max_workers: int = 4, max_queue_size: int = 64, thread_name_prefix: str = 'musicdl.postprocess'):
+        # stage behind the downloads: tech info, tags, covers and library bookkeeping of finished files, so a download slot is free again as soon as its bytes are on disk
+        self.max_workers = max(1, int(max_workers))
+        # finished files waiting here are bounded, a full queue makes the next finished download wait (backpressure) instead of piling up
+        self.max_queue_size = max(1, int(max_queue_size))
+        self.thread_name_prefix = thread_name_prefix
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_queue_size)
+        self._threads: list[threading.Thread] = []
+        # per stage counters (e.g., 'download' recorded by the client, 'postprocess' by the workers here), see stats
+        self._stages: dict[str, dict] = {}
+        self._peak_queued = 0
+        self._lock = threading.Lock()
+    '''__deepcopy__'''
+    def __deepcopy__(self, memo):
+        return self
+    '''submit'''
+    def submit(self, fn: Callable[..., Any], /, *args, **kwargs) -> Future:
+        future = Future()
+        with self._lock:
+            if len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._workerloop, name=f'{self.thread_name_prefix}{len(self._threads)}', daemon=True)
+                self._threads.append(thread); thread.start()
+        self._queue.put((future, fn, args, kwargs, time.monotonic()))
+        with self._lock: self._peak_queued = max(self._peak_queued, self._queue.qsize())
+        return future
+    '''_workerloop'''
+    def _workerloop(self):
+        while True:
+            future, fn, args, kwargs, enqueued_at = self._queue.get()
+            if not future.set_running_or_notify_cancel(): continue
+            started_at, result, error = time.monotonic(), None, None
+            try: result = fn(*args, **kwargs)
+            except BaseException as err: error = err
+            self.record('postprocess', started_at, time.monotonic(), failed=error is not None, waited=started_at - enqueued_at)
+            if error is not None: future.set_exception(error)
+            else: future.set_result(result)
+            del future, fn, args, kwargs, result, error
+    '''record'''
+    def record(self, stage: str, started_at: float, finished_at: float, num_bytes: int = 0, failed: bool = False, waited: float = 0.0):
+        # started_at / finished_at are time.monotonic() values
+        with self._lock:
+            metrics = self._stages.setdefault(stage, dict(count=0, failed=0, bytes=0, busy_s=0.0, wait_s=0.0, first_started_at=started_at, last_finished_at=finished_at))
+            metrics['count'] += 1; metrics['failed'] += int(bool(failed)); metrics['bytes'] += int(num_bytes or 0)
+            metrics['busy_s'] += max(0.0, finished_at - started_at); metrics['wait_s'] += max(0.0, waited)
+            metrics['first_started_at'], metrics['last_finished_at'] = min(metrics['first_started_at'], started_at), max(metrics['last_finished_at'], finished_at)
+    '''stats'''
+    def stats(self) -> dict:
+        with self._lock:
+            stages = {}
+            for stage, metrics in self._stages.items():
+                # throughput over the wall time the stage was active, busy_s / wall_s is the average number of items in progress
+                wall_s = max(1e-9, metrics['last_finished_at'] - metrics['first_started_at'])
+                stages[stage] = {
+                    'count': metrics['count'], 'failed': metrics['failed'], 'bytes': metrics['bytes'], 'busy_s': round(metrics['busy_s'], 3), 'wait_s': round(metrics['wait_s'], 3), 'wall_s': round(wall_s, 3),
+                    'items_per_s': round(metrics['count'] / wall_s, 3), 'mb_per_s': round(metrics['bytes'] / wall_s / 1024 / 1024, 3), 'avg_s': round(metrics['busy_s'] / max(1, metrics['count']), 3),
+                }
+            return {'max_workers': self.max_workers, 'num_threads': len(self._threads), 'queued': self._queue.qsize(), 'peak_queued': self._peak_queued, 'stages': stages}
@@ -0,0 +1,76 @@
+'''
+Function:
+    Implementation of StartupProbeCache
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import os
+import json
+import threading
+from types import ModuleType
+from typing import Any, Callable
+from platformdirs import user_cache_dir
+from importlib.metadata import version as packageversion
+
+
+'''StartupProbeCache'''
+class StartupProbeCache():
+    _shared_instance, _shared_lock = None, threading.Lock()
+    def __init__(self, path: str = None):
+        self.path = path
+        # name -> {'fingerprint': ..., 'value': ...}, loaded lazily from disk and memoized for the lifetime of the process
+        self._entries: dict[str, dict] = None
+        self._lock = threading.RLock()
+    '''shared'''
+    @classmethod
+    def shared(cls) -> 'StartupProbeCache':
+        with cls._shared_lock:
+            if cls._shared_instance is None: cls._shared_instance = cls(path=os.path.join(user_cache_dir(appname='musicdl', appauthor='zcjin'), 'startup_probes.json'))
+            return cls._shared_instance
+    '''packagefingerprint'''
+    @staticmethod
+    def packagefingerprint(module: ModuleType) -> list:
+        # version plus mtimes of the package dir and its entry file, reinstalling or upgrading the package invalidates the entry
+        root_file = os.path.abspath(module.__file__)
+        try: module_version = packageversion(module.__name__.split('.')[0])
+        except Exception: module_version = str(getattr(module, '__version__', ''))
+        return [module.__name__, module_version, root_file, os.stat(root_file).st_mtime_ns, os.stat(os.path.dirname(root_file)).st_mtime_ns]
+    '''_load'''
+    def _load(self) -> dict:
+        if self._entries is not None: return self._entries
+        self._entries = {}
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as fp: entries = json.load(fp)
+                self._entries.update({k: v for k, v in entries.items() if isinstance(v, dict) and {'fingerprint', 'value'} <= v.keys()})
+            except Exception:
+                pass
+        return self._entries
+    '''_save'''
+    def _save(self):
+        if not self.path: return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as fp: json.dump(self._entries, fp)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            pass
+    '''fetch'''
+    def fetch(self, name: str, fingerprint: Any, probefunc: Callable[[], Any]):
+        # probefunc must return something json serializable, it only runs when no entry with the same fingerprint exists
+        fingerprint = json.loads(json.dumps(fingerprint, default=str))
+        with self._lock:
+            entry = self._load().get(name)
+            if entry is not None and entry['fingerprint'] == fingerprint: return entry['value']
+            value = probefunc()
+            self._entries[name] = {'fingerprint': fingerprint, 'value': value}
+            self._save()
+            return value
+    '''clear'''
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            if self.path and os.path.exists(self.path): os.remove(self.path)
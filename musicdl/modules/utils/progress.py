@@ -0,0 +1,162 @@
+'''
+Function:
+    Implementation of ProgressSink, ThrottledProgress, NullProgress and EventProgress
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import sys
+import json
+import time
+import threading
+from typing import Any, Callable, TextIO
+from rich.progress import Progress
+
+
+'''ProgressTask'''
+class ProgressTask():
+    def __init__(self, id: int, description: str, total: float = None, completed: float = 0, fields: dict = None):
+        self.id, self.description, self.total, self.completed, self.fields = id, description, total, completed, dict(fields or {})
+        # throttling state, an update is only handed to the sink once it is due (see ProgressSink.update)
+        self.dirty, self.emitted_at, self.pending = False, 0.0, 0
+    '''finished'''
+    @property
+    def finished(self) -> bool:
+        return self.total is not None and self.completed >= self.total
+    '''todict'''
+    def todict(self) -> dict:
+        return {'task_id': self.id, 'description': self.description, 'total': self.total, 'completed': self.completed, 'finished': self.finished, **self.fields}
+
+
+'''ProgressSink'''
+class ProgressSink():
+    def __init__(self, min_interval: float = 0.1, min_bytes: int = None):
+        # drop-in for the subset of rich.progress.Progress used by the downloaders (add_task / update / advance / tasks / context manager), updates of a task are
+        # coalesced and handed to _emit at most every min_interval seconds (or every min_bytes advanced), task creation and completion are emitted right away
+        self.min_interval, self.min_bytes = max(0.0, float(min_interval or 0)), min_bytes
+        self._tasks: list[ProgressTask] = []
+        self._lock = threading.RLock()
+        self._stop_event, self._flusher = threading.Event(), None
+    '''__enter__'''
+    def __enter__(self):
+        self.start()
+        return self
+    '''__exit__'''
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+    '''start'''
+    def start(self):
+        # the last update of a task that stalls (e.g., an error description) would stay pending, a background flush every min_interval picks it up
+        if self.min_interval <= 0 or self._flusher is not None: return
+        self._stop_event.clear()
+        self._flusher = threading.Thread(target=self._flushloop, name=f'{type(self).__name__}.flusher', daemon=True)
+        self._flusher.start()
+    '''stop'''
+    def stop(self):
+        self._stop_event.set()
+        if self._flusher is not None: self._flusher.join(); self._flusher = None
+        self.flush()
+    '''_flushloop'''
+    def _flushloop(self):
+        while not self._stop_event.wait(self.min_interval): self.flush()
+    '''tasks'''
+    @property
+    def tasks(self) -> list[ProgressTask]:
+        # task ids are list indices, like rich.progress.Progress.tasks
+        with self._lock: return list(self._tasks)
+    '''add_task'''
+    def add_task(self, description: str, start: bool = True, total: float = None, completed: float = 0, visible: bool = True, **fields: Any) -> int:
+        with self._lock:
+            task = ProgressTask(len(self._tasks), description, total=total, completed=completed, fields=fields)
+            self._tasks.append(task)
+            self._emit(task, 'add'); task.emitted_at = time.monotonic()
+            return task.id
+    '''update'''
+    def update(self, task_id: int, *, total: float = None, completed: float = None, advance: float = None, description: str = None, visible: bool = None, refresh: bool = False, **fields: Any):
+        with self._lock:
+            task = self._tasks[task_id]
+            if total is not None: task.total = total
+            if completed is not None: task.completed = completed
+            if advance: task.completed += advance; task.pending += advance
+            if description is not None: task.description = description
+            task.fields.update(fields); task.dirty = True
+            now = time.monotonic()
+            if refresh or task.finished or now - task.emitted_at >= self.min_interval or (self.min_bytes and task.pending >= self.min_bytes): self._emittask(task, now)
+    '''advance'''
+    def advance(self, task_id: int, advance: float = 1):
+        self.update(task_id, advance=advance)
+    '''flush'''
+    def flush(self):
+        with self._lock:
+            now = time.monotonic()
+            for task in self._tasks:
+                if task.dirty: self._emittask(task, now)
+    '''_emittask'''
+    def _emittask(self, task: ProgressTask, now: float):
+        self._emit(task, 'update'); task.dirty, task.emitted_at, task.pending = False, now, 0
+    '''_emit'''
+    def _emit(self, task: ProgressTask, event: str):
+        raise NotImplementedError('not to be implemented')
+
+
+'''NullProgress'''
+class NullProgress(ProgressSink):
+    def __init__(self, **kwargs):
+        # headless sink (api servers, mcp over stdio, batch jobs), tasks are still tracked so callers can read them, nothing is rendered
+        super(NullProgress, self).__init__(min_interval=0)
+    '''update'''
+    def update(self, task_id: int, *, total: float = None, completed: float = None, advance: float = None, description: str = None, visible: bool = None, refresh: bool = False, **fields: Any):
+        with self._lock:
+            task = self._tasks[task_id]
+            if total is not None: task.total = total
+            if completed is not None: task.completed = completed
+            if advance: task.completed += advance
+            if description is not None: task.description = description
+            task.fields.update(fields)
+    '''_emit'''
+    def _emit(self, task: ProgressTask, event: str):
+        pass
+
+
+'''EventProgress'''
+class EventProgress(ProgressSink):
+    def __init__(self, callback: Callable[[dict], None] = None, stream: TextIO = None, min_interval: float = 0.5, min_bytes: int = None):
+        # structured sink for servers, every emitted update is a dict handed to callback and / or written to stream as one json line
+        super(EventProgress, self).__init__(min_interval=min_interval, min_bytes=min_bytes)
+        self.callback, self.stream = callback, stream
+    '''_emit'''
+    def _emit(self, task: ProgressTask, event: str):
+        data = {'event': event, 'time': time.time(), **task.todict()}
+        if self.callback is not None: self.callback(data)
+        if self.stream is not None: self.stream.write(json.dumps(data, ensure_ascii=False, default=str) + '\n'); self.stream.flush()
+
+
+'''ThrottledProgress'''
+class ThrottledProgress(ProgressSink):
+    def __init__(self, progress: Progress, min_interval: float = 0.1, min_bytes: int = None):
+        # rich rendering with coalesced updates, per chunk calls only touch the task here instead of formatting and locking the rich progress every time
+        super(ThrottledProgress, self).__init__(min_interval=min_interval, min_bytes=min_bytes)
+        self.progress, self._rich_task_ids = progress, {}
+    '''__enter__'''
+    def __enter__(self):
+        self.progress.__enter__()
+        return super(ThrottledProgress, self).__enter__()
+    '''__exit__'''
+    def __exit__(self, exc_type, exc_value, traceback):
+        super(ThrottledProgress, self).__exit__(exc_type, exc_value, traceback)
+        self.progress.__exit__(exc_type, exc_value, traceback)
+    '''_emit'''
+    def _emit(self, task: ProgressTask, event: str):
+        if event == 'add': self._rich_task_ids[task.id] = self.progress.add_task(task.description, total=task.total, completed=task.completed, **task.fields); return
+        self.progress.update(self._rich_task_ids[task.id], total=task.total, completed=task.completed, description=task.description, **task.fields)
+
+
+'''buildprogress'''
+def buildprogress(progress_cfg: dict = None, richprogressfactory: Callable[[], Progress] = None) -> ProgressSink:
+    # progress_cfg: {'mode': 'rich' | 'null' | 'events', 'min_interval': seconds, 'min_bytes': bytes, 'callback': callable for 'events' (json lines on stdout without one)}
+    progress_cfg = dict(progress_cfg or {}); mode = progress_cfg.pop('mode', 'rich')
+    if mode in {'null', 'none', None}: return NullProgress()
+    if mode == 'events': return EventProgress(callback=progress_cfg.get('callback'), stream=None if progress_cfg.get('callback') else sys.stdout, min_interval=progress_cfg.get('min_interval', 0.5), min_bytes=progress_cfg.get('min_bytes'))
+    assert mode == 'rich', f'unsupported progress mode {mode}'
+    return ThrottledProgress(richprogressfactory(), min_interval=progress_cfg.get('min_interval', 0.1), min_bytes=progress_cfg.get('min_bytes'))
@@ -0,0 +1,58 @@
+'''
+Function:
+    Implementation of QualityLadderResolver
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+from typing import Any, Callable
+from concurrent.futures import Executor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+'''QualityLadderResolver'''
+class QualityLadderResolver():
+    def __init__(self, window: int = 3, stop_on_error: bool = True, isvalid: Callable[[Any], bool] = None):
+        # window: max number of quality tiers in flight, None or 0 means all tiers at once
+        self.window = window
+        # stop_on_error: a tier raising stops launching the tiers below it, like the `except: break` of the serial loops
+        self.stop_on_error = stop_on_error
+        self.isvalid = isvalid or (lambda song_info: bool(getattr(song_info, 'with_valid_download_url', False)))
+    '''resolve'''
+    def resolve(self, qualities: list, resolvefunc: Callable[[Any], Any], default: Any = None, executor: Executor = None):
+        # resolvefunc(quality) returns a candidate (usually SongInfo) or None to skip the tier, qualities are ordered from best to worst
+        qualities = list(qualities)
+        if not qualities: return default
+        window = max(1, min(self.window or len(qualities), len(qualities)))
+        if window == 1: return self._resolveserially(qualities, resolvefunc, default)
+        running, best_idx, best_result, next_idx, stop_idx = {}, None, default, 0, len(qualities)
+        # the window is what bounds the tiers in flight, an injected executor decides where they run (e.g., an urgent TaskScheduler view)
+        executor = executor or ThreadPoolExecutor(max_workers=window)
+        try:
+            while True:
+                # --keep the window full, tiers below a validated one are never launched
+                while len(running) < window and next_idx < min(stop_idx, len(qualities) if best_idx is None else best_idx):
+                    running[executor.submit(resolvefunc, qualities[next_idx])] = next_idx; next_idx += 1
+                if not running: break
+                done, _ = wait(list(running.keys()), return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx = running.pop(future)
+                    try: result = future.result()
+                    except Exception: stop_idx = min(stop_idx, idx + 1) if self.stop_on_error else stop_idx; continue
+                    if result is not None and self.isvalid(result) and (best_idx is None or idx < best_idx): best_idx, best_result = idx, result
+                if best_idx is None: continue
+                # --a validated tier makes every lower tier pointless, only better tiers still in flight are awaited
+                for future in [f for f, idx in running.items() if idx > best_idx]: future.cancel(); running.pop(future)
+                if not running: break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return best_result
+    '''_resolveserially'''
+    def _resolveserially(self, qualities: list, resolvefunc: Callable[[Any], Any], default: Any = None):
+        for quality in qualities:
+            try: result = resolvefunc(quality)
+            except Exception:
+                if self.stop_on_error: break
+                continue
+            if result is not None and self.isvalid(result): return result
+        return default
@@ -0,0 +1,102 @@
+'''
+Function:
+    Implementation of ResumeJournal
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import os
+import json
+import time
+import threading
+
+
+'''ResourceChangedError'''
+class ResourceChangedError(RuntimeError):
+    pass
+
+
+'''ResumeJournal'''
+class ResumeJournal():
+    def __init__(self, path: str, save_interval: float = 1.0):
+        # sidecar of a .part file: which url / version of the resource it holds and which byte ranges (inclusive, merged) are already on disk
+        self.path, self.save_interval = path, float(save_interval)
+        self.url, self.etag, self.last_modified, self.total_size, self.ranges = None, None, None, None, []
+        self._lock, self._last_saved_at = threading.RLock(), 0.0
+    '''load'''
+    @classmethod
+    def load(cls, path: str, save_interval: float = 1.0) -> 'ResumeJournal':
+        journal = cls(path, save_interval=save_interval)
+        if not os.path.exists(path): return journal
+        try:
+            with open(path, 'r', encoding='utf-8') as fp: data = json.load(fp)
+            journal.url, journal.etag, journal.last_modified, journal.total_size = data.get('url'), data.get('etag'), data.get('last_modified'), data.get('total_size')
+            for start, end in data.get('ranges', []): journal.addrange(int(start), int(end))
+        except Exception:
+            journal.reset()
+        return journal
+    '''reset'''
+    def reset(self):
+        with self._lock: self.etag, self.last_modified, self.total_size, self.ranges = None, None, None, []
+    '''validate'''
+    def validate(self, total_size: int = None) -> bool:
+        # a journal written for a resource of another length is worthless, an unknown length on either side is given the benefit of the doubt
+        with self._lock:
+            if self.total_size and total_size and int(self.total_size) != int(total_size): self.reset(); self.total_size = int(total_size); return False
+            if total_size and not self.total_size: self.total_size = int(total_size)
+            return True
+    '''observe'''
+    def observe(self, headers) -> None:
+        # validators of every response are checked against the recorded ones, the first response records them
+        etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+        with self._lock:
+            if self.ranges and ((self.etag and etag and etag != self.etag) or (self.last_modified and last_modified and last_modified != self.last_modified)):
+                raise ResourceChangedError(f'resource changed since the partial download (ETag {self.etag} -> {etag}, Last-Modified {self.last_modified} -> {last_modified})')
+            self.etag, self.last_modified = self.etag or etag, self.last_modified or last_modified
+    '''addrange'''
+    def addrange(self, start: int, end: int):
+        if end < start: return
+        with self._lock:
+            merged = []
+            for s, e in sorted(self.ranges + [[start, end]]):
+                if merged and s <= merged[-1][1] + 1: merged[-1][1] = max(merged[-1][1], e)
+                else: merged.append([s, e])
+            self.ranges = merged
+    '''completedbytes'''
+    @property
+    def completedbytes(self) -> int:
+        with self._lock: return sum(e - s + 1 for s, e in self.ranges)
+    '''contiguousprefix'''
+    @property
+    def contiguousprefix(self) -> int:
+        # number of bytes from offset 0 that are on disk, a single stream can only resume from there
+        with self._lock: return self.ranges[0][1] + 1 if self.ranges and self.ranges[0][0] == 0 else 0
+    '''missingranges'''
+    def missingranges(self, total_size: int) -> list[tuple[int, int]]:
+        with self._lock:
+            missing, cursor = [], 0
+            for s, e in self.ranges:
+                if s > cursor: missing.append((cursor, min(s, total_size) - 1))
+                cursor = max(cursor, e + 1)
+            if cursor < total_size: missing.append((cursor, total_size - 1))
+            return [(s, e) for s, e in missing if e >= s]
+    '''save'''
+    def save(self, force: bool = False):
+        # throttled to save_interval while bytes are streaming in, force on completion / failure
+        with self._lock:
+            if not force and time.monotonic() - self._last_saved_at < self.save_interval: return
+            self._last_saved_at = time.monotonic()
+            data = dict(url=self.url, etag=self.etag, last_modified=self.last_modified, total_size=self.total_size, ranges=self.ranges)
+            try:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                tmp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as fp: json.dump(data, fp)
+                os.replace(tmp_path, self.path)
+            except Exception:
+                pass
+    '''discard'''
+    def discard(self):
+        with self._lock:
+            self.reset()
+            if os.path.exists(self.path): os.remove(self.path)
@@ -0,0 +1,179 @@
+'''
+Function:
+    Implementation of TaskScheduler
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import os
+import threading
+from collections import deque, defaultdict
+from typing import Any, Callable, Hashable
+from concurrent.futures import Executor, Future, wait as waitfutures
+
+
+'''_Task'''
+class _Task():
+    def __init__(self, key: Hashable, nested: bool, future: Future, fn: Callable, args: tuple, kwargs: dict):
+        self.key, self.nested, self.future = key, nested, future
+        self.fn, self.args, self.kwargs = fn, args, kwargs
+    '''run'''
+    def run(self):
+        if not self.future.set_running_or_notify_cancel(): return
+        try: result = self.fn(*self.args, **self.kwargs)
+        except BaseException as err: self.future.set_exception(err)
+        else: self.future.set_result(result)
+
+
+'''TaskScheduler'''
+class TaskScheduler():
+    def __init__(self, max_workers: int = None, default_quota: int = None, quotas: dict = None, thread_name_prefix: str = 'musicdl', reserved_workers: int = None):
+        # max_workers: global cap on tasks in flight, which is also the number of worker threads, the work is io bound so a few per core
+        self.max_workers = max(1, int(max_workers or min(32, (os.cpu_count() or 1) * 4)))
+        # reserved_workers: extra threads only for urgent work (see submiturgent) while all max_workers are busy, they never take top-level work beyond max_workers
+        self.reserved_workers = max(0, int(reserved_workers if reserved_workers is not None else max(2, self.max_workers // 4)))
+        # quotas: key (usually a source name) -> cap on its top-level tasks in flight, keys without one only obey default_quota / max_workers
+        self.default_quota, self.quotas = default_quota, dict(quotas or {})
+        self.thread_name_prefix = thread_name_prefix
+        self._queues: dict[Hashable, deque] = {}
+        self._ready_keys, self._urgent = deque(), deque()
+        self._inflight: dict[Hashable, int] = defaultdict(int)
+        self._threads: list[threading.Thread] = []
+        # idle: workers not running a task (just spawned or back from one), each picks up one queued task without being spawned for it
+        self._num_idle, self._num_running, self._num_queued = 0, 0, 0
+        self._counters = dict(submitted=0, nested=0, urgent=0, reserved=0, inline=0, peak_in_flight=0)
+        self._cond = threading.Condition()
+        self._tls = threading.local()
+    '''deepcopy'''
+    def __deepcopy__(self, memo):
+        # per-source cfgs are deep copied by BuildMusicClient, every client must still submit into the same scheduler
+        return self
+    '''setquota'''
+    def setquota(self, key: Hashable, quota: int = None):
+        with self._cond:
+            self.quotas[key] = quota
+            self._cond.notify_all()
+    '''quotafor'''
+    def quotafor(self, key: Hashable) -> int:
+        quota = self.quotas.get(key, self.default_quota)
+        return self.max_workers if not quota else max(1, int(quota))
+    '''isworkerthread'''
+    def isworkerthread(self) -> bool:
+        return getattr(self._tls, 'scheduler', None) is self
+    '''submit'''
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        future = Future()
+        with self._cond:
+            self._counters['submitted'] += 1
+            if not self.isworkerthread():
+                # top-level work is queued per key and handed out round robin, so one source with many pages cannot starve the others
+                task = _Task(key, False, future, fn, args, kwargs)
+                if not (queue := self._queues.setdefault(key, deque())): self._ready_keys.append(key)
+                queue.append(task); self._num_queued += 1; self._spawnworkerifneeded(); self._cond.notify()
+                return future
+            # nested work (segment ranges, hls segments of a running task) is awaited by a parent that holds a worker, so it never queues behind
+            # top-level work: it takes a free worker right away or runs inline in the parent, which keeps the total bounded and rules out deadlocks. callers that
+            # wait with a timeout (mirror hedging, the quality ladder window) use submiturgent instead, an inline run would serialize them
+            task = _Task(key, True, future, fn, args, kwargs)
+            self._counters['nested'] += 1
+            if self._num_idle - len(self._urgent) > 0 or len(self._threads) < self.max_workers:
+                self._urgent.append(task); self._spawnworkerifneeded(); self._cond.notify()
+                return future
+            self._counters['inline'] += 1
+        task.run()
+        return future
+    '''submiturgent'''
+    def submiturgent(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        # for callers that wait with a timeout (mirror hedging, the quality ladder window): the task skips the quota queues and gets a free worker, a new one
+        # below max_workers or one of reserved_workers extra threads, so it never runs inline while the scheduler has room. only with the reserve used up as
+        # well it runs inline, which keeps the total bounded and rules out deadlocks of parents waiting on their own children
+        future = Future()
+        with self._cond:
+            self._counters['submitted'] += 1; self._counters['urgent'] += 1
+            task = _Task(key, True, future, fn, args, kwargs)
+            if self._num_idle - len(self._urgent) > 0 or len(self._threads) < self.max_workers + self.reserved_workers:
+                if self._num_idle - len(self._urgent) <= 0 and len(self._threads) >= self.max_workers: self._counters['reserved'] += 1; self._spawnworker()
+                self._urgent.append(task); self._spawnworkerifneeded(); self._cond.notify()
+                return future
+            self._counters['inline'] += 1
+        task.run()
+        return future
+    '''executor'''
+    def executor(self, key: Hashable, urgent: bool = False) -> 'ScheduledExecutor':
+        return ScheduledExecutor(self, key, urgent=urgent)
+    '''_spawnworkerifneeded'''
+    def _spawnworkerifneeded(self):
+        # one worker per pending task (urgent and queued top-level alike) until max_workers, a burst of submits must not wait for a single idle worker
+        if self._num_idle >= len(self._urgent) + self._num_queued or len(self._threads) >= self.max_workers: return
+        self._spawnworker()
+    '''_spawnworker'''
+    def _spawnworker(self):
+        thread = threading.Thread(target=self._workerloop, name=f'{self.thread_name_prefix}.worker{len(self._threads)}', daemon=True)
+        self._threads.append(thread); self._num_idle += 1
+        thread.start()
+    '''_nexttask'''
+    def _nexttask(self) -> _Task | None:
+        if self._urgent: return self._urgent.popleft()
+        # reserve threads exist for urgent work only, top-level work never runs more than max_workers at a time
+        if self._num_running >= self.max_workers: return None
+        for _ in range(len(self._ready_keys)):
+            key = self._ready_keys[0]; self._ready_keys.rotate(-1)
+            if self._inflight[key] >= self.quotafor(key): continue
+            queue = self._queues[key]; task = queue.popleft(); self._num_queued -= 1
+            if not queue: self._ready_keys.pop()
+            self._inflight[key] += 1
+            return task
+        return None
+    '''_workerloop'''
+    def _workerloop(self):
+        self._tls.scheduler = self
+        while True:
+            with self._cond:
+                while (task := self._nexttask()) is None: self._cond.wait()
+                self._num_idle -= 1; self._num_running += 1
+                self._counters['peak_in_flight'] = max(self._counters['peak_in_flight'], self._num_running)
+            try:
+                task.run()
+            finally:
+                with self._cond:
+                    self._num_idle += 1; self._num_running -= 1
+                    if not task.nested:
+                        self._inflight[task.key] -= 1
+                        # the freed quota slot may unblock queued work of this key for another waiting worker
+                        if self._queues.get(task.key): self._cond.notify()
+                        # keys are often short lived (e.g., one per hls song), an idle key with nothing queued is dropped so the tables do not grow forever
+                        if self._inflight[task.key] <= 0 and not self._queues.get(task.key): self._inflight.pop(task.key, None); self._queues.pop(task.key, None)
+                del task
+    '''stats'''
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                'max_workers': self.max_workers, 'num_threads': len(self._threads), 'num_running': self._num_running, **self._counters,
+                'in_flight': {k: v for k, v in self._inflight.items() if v}, 'queued': {k: len(q) for k, q in self._queues.items() if q}, 'num_urgent': len(self._urgent),
+            }
+
+
+'''ScheduledExecutor'''
+class ScheduledExecutor(Executor):
+    def __init__(self, scheduler: TaskScheduler, key: Hashable, urgent: bool = False):
+        # Executor view of a TaskScheduler, drop-in for the private ThreadPoolExecutor of a call site, shutdown only touches the futures of this view.
+        # urgent views submit through TaskScheduler.submiturgent
+        self.scheduler, self.key, self.urgent = scheduler, key, urgent
+        self._futures: set[Future] = set()
+        self._lock = threading.Lock()
+    '''submit'''
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = (self.scheduler.submiturgent if self.urgent else self.scheduler.submit)(self.key, fn, *args, **kwargs)
+        with self._lock: self._futures.add(future)
+        future.add_done_callback(self._discard)
+        return future
+    '''_discard'''
+    def _discard(self, future: Future):
+        with self._lock: self._futures.discard(future)
+    '''shutdown'''
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        with self._lock: futures = list(self._futures)
+        if cancel_futures:
+            for future in futures: future.cancel()
+        if wait: waitfutures(futures)
@@ -0,0 +1,83 @@
+'''
+Function:
+    Implementation of SegmentedRangeDownloader
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import os
+import threading
+from typing import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor, as_completed
+
+
+'''RangeNotSupportedError'''
+class RangeNotSupportedError(RuntimeError):
+    pass
+
+
+'''SegmentedRangeDownloader'''
+class SegmentedRangeDownloader():
+    def __init__(self, chunk_size: int = 1024 * 1024, executor: Executor = None):
+        self.chunk_size = max(1024, int(chunk_size or 1024 * 1024))
+        # segments run on this executor when given (e.g., a TaskScheduler view), otherwise on a private pool with one worker per segment
+        self.executor = executor
+        self._write_lock = threading.Lock()
+    '''plan'''
+    @staticmethod
+    def plan(total_size: int, num_segments: int, min_segment_size: int = 4 * 1024 * 1024) -> list[tuple[int, int]]:
+        # inclusive (start, end) byte ranges, fewer than two means the file is not worth splitting
+        total_size, num_segments = int(total_size or 0), int(num_segments or 0)
+        num_segments = min(num_segments, total_size // max(1, int(min_segment_size or 1)))
+        if num_segments < 2: return []
+        segment_size = -(-total_size // num_segments)
+        return [(start, min(start + segment_size, total_size) - 1) for start in range(0, total_size, segment_size)]
+    '''intersect'''
+    @staticmethod
+    def intersect(ranges: list[tuple[int, int]], allowed: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        # pieces of the planned segments that are still missing, e.g., when resuming with the ranges of a ResumeJournal
+        return [(max(s, a), min(e, b)) for s, e in ranges for a, b in allowed if max(s, a) <= min(e, b)]
+    '''download'''
+    def download(self, fetchrange: Callable[[int, int], object], save_path: str, total_size: int, ranges: list[tuple[int, int]], onprogress: Callable[[int], None] = None,
+                 onwritten: Callable[[int, int], None] = None, resume: bool = False):
+        # fetchrange(start, end) returns a streamed response (context manager) for `Range: bytes=start-end`, any failure raises and leaves the caller to fall back
+        # onwritten(offset, length) reports every write so a journal can track completed bytes, resume keeps the bytes of an existing (.part) file
+        with open(save_path, 'r+b' if resume and os.path.exists(save_path) else 'wb') as fp: fp.truncate(total_size)
+        fd, abort_event = os.open(save_path, os.O_RDWR | getattr(os, 'O_BINARY', 0)), threading.Event()
+        executor = self.executor or ThreadPoolExecutor(max_workers=len(ranges))
+        try:
+            futures = [executor.submit(self._fetchsegment, fetchrange, fd, start, end, onprogress, onwritten, abort_event) for start, end in ranges]
+            try:
+                for future in as_completed(futures): future.result()
+            except BaseException:
+                abort_event.set(); raise
+        finally:
+            # segments still running notice the abort at their next chunk, the file descriptor is only closed once all of them returned
+            executor.shutdown(wait=True, cancel_futures=True)
+            os.close(fd)
+    '''_fetchsegment'''
+    def _fetchsegment(self, fetchrange: Callable[[int, int], object], fd: int, start: int, end: int, onprogress: Callable[[int], None], onwritten: Callable[[int, int], None], abort_event: threading.Event):
+        offset = start
+        with fetchrange(start, end) as resp:
+            resp.raise_for_status()
+            # a server answering 200 or another window would scatter the whole body over this segment
+            if resp.status_code != 206 or not str(resp.headers.get('Content-Range') or '').startswith(f'bytes {start}-'): raise RangeNotSupportedError(f'range {start}-{end} not honored (status {resp.status_code})')
+            for chunk in resp.iter_content(chunk_size=self.chunk_size):
+                if abort_event.is_set(): raise RuntimeError('aborted since another segment failed')
+                if not chunk: continue
+                if offset + len(chunk) > end + 1: raise RangeNotSupportedError(f'range {start}-{end} returned more bytes than requested')
+                self._pwrite(fd, chunk, offset)
+                if onwritten is not None: onwritten(offset, len(chunk))
+                offset += len(chunk)
+                if onprogress is not None: onprogress(len(chunk))
+        if offset != end + 1: raise IOError(f'range {start}-{end} ended early at byte {offset}')
+    '''_pwrite'''
+    def _pwrite(self, fd: int, data: bytes, offset: int):
+        if hasattr(os, 'pwrite'):
+            while data: written = os.pwrite(fd, data, offset); data, offset = data[written:], offset + written
+            return
+        # no positional writes on windows, seek + write of one segment must not interleave with another
+        with self._write_lock:
+            os.lseek(fd, offset, os.SEEK_SET)
+            while data: written = os.write(fd, data); data = data[written:]
@@ -0,0 +1,115 @@
+'''
+Function:
+    Implementation of SessionPool
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import requests
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from .importutils import optionalimport
+
+
+'''SessionPool'''
+class SessionPool():
+    def __init__(self, pool_size: int = 10, max_hosts: int = 64):
+        self.pool_size = max(1, int(pool_size))
+        self.max_hosts = max(1, int(max_hosts))
+        # idle sessions keyed by (backend, scheme, netloc), each session is checked out by exactly one thread at a time
+        self._idle_sessions: OrderedDict[tuple, list] = OrderedDict()
+        self._live_sessions: set = set()
+        self._retired_counters = dict(requests=0, handshakes=0)
+        self._num_created = 0
+        self._lock = threading.Lock()
+    '''poolkey'''
+    @staticmethod
+    def poolkey(url: str, enable_curl_cffi: bool = False) -> tuple:
+        parts = urlsplit(str(url))
+        return ('curl_cffi' if enable_curl_cffi else 'requests', (parts.scheme or 'http').lower(), (parts.netloc or '').lower())
+    '''_newsession'''
+    def _newsession(self, enable_curl_cffi: bool = False):
+        curl_cffi = optionalimport('curl_cffi')
+        if enable_curl_cffi and curl_cffi is not None:
+            session = curl_cffi.requests.Session()
+        else:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+            session.mount('http://', adapter); session.mount('https://', adapter)
+        session._musicdl_num_acquires = 0
+        return session
+    '''acquire'''
+    def acquire(self, url: str, enable_curl_cffi: bool = False):
+        key = self.poolkey(url, enable_curl_cffi)
+        with self._lock:
+            idle = self._idle_sessions.get(key)
+            session = idle.pop() if idle else None
+            if session is None:
+                session = self._newsession(enable_curl_cffi)
+                self._live_sessions.add(session); self._num_created += 1
+            session._musicdl_num_acquires += 1
+        return session
+    '''release'''
+    def release(self, url: str, session, enable_curl_cffi: bool = False):
+        key, evicted = self.poolkey(url, enable_curl_cffi), []
+        with self._lock:
+            if session not in self._live_sessions: return
+            idle = self._idle_sessions.setdefault(key, [])
+            self._idle_sessions.move_to_end(key)
+            if len(idle) < self.pool_size: idle.append(session)
+            else: evicted.append(session)
+            while len(self._idle_sessions) > self.max_hosts: evicted.extend(self._idle_sessions.popitem(last=False)[1])
+            for s in evicted: self._retire(s)
+        for s in evicted:
+            try: s.close()
+            except Exception: pass
+    '''session'''
+    @contextmanager
+    def session(self, url: str, enable_curl_cffi: bool = False):
+        session = self.acquire(url, enable_curl_cffi=enable_curl_cffi)
+        try: yield session
+        finally: self.release(url, session, enable_curl_cffi=enable_curl_cffi)
+    '''_retire'''
+    def _retire(self, session):
+        num_requests, num_handshakes = self._sessioncounters(session)
+        self._retired_counters['requests'] += num_requests
+        self._retired_counters['handshakes'] += num_handshakes
+        self._live_sessions.discard(session)
+    '''_sessioncounters'''
+    @staticmethod
+    def _sessioncounters(session) -> tuple:
+        if not isinstance(session, requests.Session):
+            # curl_cffi keeps its connection cache inside the curl handle, treat the first request of each session as the handshake
+            num_acquires = getattr(session, '_musicdl_num_acquires', 0)
+            return num_acquires, min(num_acquires, 1)
+        num_requests, num_handshakes = 0, 0
+        for adapter in set(session.adapters.values()):
+            managers = [getattr(adapter, 'poolmanager', None)] + list((getattr(adapter, 'proxy_manager', None) or {}).values())
+            for manager in filter(None, managers):
+                for pool_key in list(manager.pools.keys()):
+                    try: pool = manager.pools[pool_key]
+                    except KeyError: continue
+                    num_requests += getattr(pool, 'num_requests', 0); num_handshakes += getattr(pool, 'num_connections', 0)
+        return num_requests, num_handshakes
+    '''stats'''
+    def stats(self) -> dict:
+        with self._lock:
+            num_requests, num_handshakes = self._retired_counters['requests'], self._retired_counters['handshakes']
+            for session in list(self._live_sessions):
+                r, h = self._sessioncounters(session)
+                num_requests, num_handshakes = num_requests + r, num_handshakes + h
+            num_idle = sum(len(v) for v in self._idle_sessions.values())
+            return dict(sessions=self._num_created, idle_sessions=num_idle, requests=num_requests, handshakes=num_handshakes, reuses=max(0, num_requests - num_handshakes))
+    '''close'''
+    def close(self):
+        with self._lock:
+            sessions = list(self._live_sessions)
+            for session in sessions: self._retire(session)
+            self._idle_sessions.clear()
+        for session in sessions:
+            try: session.close()
+            except Exception: pass
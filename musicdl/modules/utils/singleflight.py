@@ -0,0 +1,94 @@
+'''
+Function:
+    Implementation of SingleFlight
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import json
+import time
+import hashlib
+import threading
+from typing import Any, Callable, Hashable
+from collections import OrderedDict
+from .linkcache import LinkStatusCache
+
+
+'''_Call'''
+class _Call():
+    def __init__(self):
+        self.event = threading.Event()
+        self.result, self.error = None, None
+
+
+'''SingleFlight'''
+class SingleFlight():
+    def __init__(self, memo_ttl: float = 0.0, max_memo_entries: int = 256):
+        # memo_ttl: seconds a finished result keeps being handed out after the call returned, 0 only coalesces calls that overlap in time
+        self.memo_ttl = float(memo_ttl or 0)
+        self.max_memo_entries = max(0, int(max_memo_entries))
+        self._calls: dict[Hashable, _Call] = {}
+        self._memo: OrderedDict[Hashable, tuple] = OrderedDict()
+        self._counters = dict(calls=0, shared=0, memo_hits=0)
+        self._lock = threading.Lock()
+    '''digest'''
+    @staticmethod
+    def digest(obj: Any) -> str:
+        if obj is None: return ''
+        if isinstance(obj, str): obj = obj.encode('utf-8')
+        if not isinstance(obj, (bytes, bytearray)):
+            try: obj = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8')
+            except Exception: obj = repr(obj).encode('utf-8')
+        return hashlib.sha1(obj).hexdigest()
+    '''requestkey'''
+    @staticmethod
+    def requestkey(method: str, url: str, **kwargs) -> tuple:
+        # headers and cookies are part of the key, so authenticated or ranged requests never share a response with a different identity or byte range
+        return (method.upper(), LinkStatusCache.normalizeurl(url), SingleFlight.digest(kwargs.get('params')), SingleFlight.digest(kwargs.get('data')), SingleFlight.digest(kwargs.get('json')), SingleFlight.digest(SingleFlight.normalizeheaders(kwargs.get('headers'))), SingleFlight.digest(SingleFlight.normalizecookies(kwargs.get('cookies'))))
+    '''normalizeheaders'''
+    @staticmethod
+    def normalizeheaders(headers) -> dict:
+        return {str(k).lower(): str(v) for k, v in dict(headers or {}).items()}
+    '''normalizecookies'''
+    @staticmethod
+    def normalizecookies(cookies) -> dict | str:
+        if not cookies or isinstance(cookies, str): return cookies or ''
+        try: return {str(k): str(v) for k, v in dict(cookies).items()}
+        except Exception: return {str(getattr(c, 'name', c)): str(getattr(c, 'value', '')) for c in cookies}
+    '''do'''
+    def do(self, key: Hashable, func: Callable[[], Any], memo_ttl: float = None):
+        memo_ttl = self.memo_ttl if memo_ttl is None else float(memo_ttl)
+        with self._lock:
+            memo = self._memo.get(key)
+            if memo is not None and memo[0] > time.monotonic():
+                self._memo.move_to_end(key); self._counters['memo_hits'] += 1
+                return memo[1]
+            if memo is not None: self._memo.pop(key, None)
+            if (call := self._calls.get(key)) is not None:
+                self._counters['shared'] += 1; is_leader = False
+            else:
+                call = self._calls[key] = _Call(); self._counters['calls'] += 1; is_leader = True
+        # followers block on the leader and share its result or its exception
+        if not is_leader:
+            call.event.wait()
+            if call.error is not None: raise call.error
+            return call.result
+        try:
+            call.result = func()
+        except BaseException as err:
+            call.error = err; raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+                if call.error is None and memo_ttl > 0 and self.max_memo_entries > 0:
+                    self._memo[key] = (time.monotonic() + memo_ttl, call.result); self._memo.move_to_end(key)
+                    while len(self._memo) > self.max_memo_entries: self._memo.popitem(last=False)
+            call.event.set()
+        return call.result
+    '''forget'''
+    def forget(self, key: Hashable):
+        with self._lock: self._memo.pop(key, None)
+    '''stats'''
+    def stats(self) -> dict:
+        with self._lock: return dict(inflight=len(self._calls), memo_entries=len(self._memo), **self._counters)
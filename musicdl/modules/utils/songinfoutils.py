@@ -22,6 +22,11 @@ from mutagen.mp4 import MP4Cover
 from .misc import seconds2hms, byte2mb
 from mutagen.id3 import ID3, APIC, USLT
 from .importutils import optionalimportfrom
+from .singleflight import SingleFlight
+
+
+'''cover downloads shared by the tracks of an album, kept for a minute so sequentially tagged tracks reuse them too'''
+COVER_SINGLE_FLIGHT = SingleFlight(memo_ttl=60, max_memo_entries=16)
 
 
 '''SongInfoUtils'''
@@ -83,11 +88,13 @@ class SongInfoUtils:
             data = path.read_bytes()
             mime = (guess_type(str(path))[0] or "image/jpeg").split(";")[0]
             return data, mime
-        # network image url
-        resp = requests.get(cover_str, stream=True, timeout=timeout, headers=headers, allow_redirects=True)
-        resp.raise_for_status()
-        ctype = (resp.headers.get("Content-Type") or "").split(";")[0].strip().lower()
-        mime, data = (ctype or (guess_type(cover_str)[0] or "image/jpeg")).split(";")[0], resp.content
+        # network image url, tracks of the same album share one download of their cover
+        def _fetchcover():
+            resp = requests.get(cover_str, stream=True, timeout=timeout, headers=headers, allow_redirects=True)
+            resp.raise_for_status()
+            return (resp.headers.get("Content-Type") or "").split(";")[0].strip().lower(), resp.content
+        ctype, data = COVER_SINGLE_FLIGHT.do(SingleFlight.requestkey('GET', cover_str, headers=headers), _fetchcover)
+        mime = (ctype or (guess_type(cover_str)[0] or "image/jpeg")).split(";")[0]
         if not mime.startswith("image/"):
             sig = data[:12]
             if sig.startswith(b"\xFF\xD8\xFF"): mime = "image/jpeg"
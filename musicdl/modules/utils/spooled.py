@@ -0,0 +1,109 @@
+'''
+Function:
+    Implementation of SpooledContents
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import os
+import hashlib
+import tempfile
+import threading
+from .misc import replacefile
+
+
+'''SpooledContents'''
+class SpooledContents():
+    def __init__(self, max_memory_size: int = 1024 * 1024, spool_dir: str = None):
+        # audio bodies fetched at search time (see SongInfo.downloaded_contents), kept in memory up to max_memory_size bytes and spilled to a named file in spool_dir beyond that
+        self.max_memory_size, self.spool_dir = max(0, int(max_memory_size)), spool_dir
+        self.path, self.size = None, 0
+        self._chunks, self._fp, self._hasher = [], None, hashlib.sha256()
+        self._lock = threading.Lock()
+    '''fromresponse'''
+    @classmethod
+    def fromresponse(cls, resp, max_memory_size: int = 1024 * 1024, spool_dir: str = None, chunk_size: int = 1024 * 1024) -> 'SpooledContents':
+        contents = cls(max_memory_size=max_memory_size, spool_dir=spool_dir)
+        try:
+            for chunk in resp.iter_content(chunk_size=chunk_size): contents.write(chunk)
+            contents.seal()
+        except BaseException:
+            contents.close(); raise
+        return contents
+    '''frombytes'''
+    @classmethod
+    def frombytes(cls, data: bytes) -> 'SpooledContents':
+        # wraps bytes set by older parsers without copying them
+        contents = cls(max_memory_size=len(data))
+        contents.write(data)
+        return contents
+    '''__deepcopy__'''
+    def __deepcopy__(self, memo):
+        # _download deep copies the SongInfo of every finished song, the body must not be duplicated along with it
+        return self
+    '''__reduce__'''
+    def __reduce__(self):
+        # the spool file is private to this process, pickled search / download results keep an empty body like the ones without contents
+        return (bytes, ())
+    '''__len__'''
+    def __len__(self) -> int:
+        return self.size
+    '''__bool__'''
+    def __bool__(self) -> bool:
+        return self.size > 0
+    '''__sizeof__'''
+    def __sizeof__(self) -> int:
+        return self.size
+    '''sha256'''
+    @property
+    def sha256(self) -> str:
+        return self._hasher.hexdigest()
+    '''inmemory'''
+    @property
+    def inmemory(self) -> bool:
+        return self.path is None
+    '''write'''
+    def write(self, chunk: bytes):
+        if not chunk: return
+        with self._lock:
+            self._hasher.update(chunk); self.size += len(chunk)
+            if self.path is None and self.size <= self.max_memory_size: self._chunks.append(chunk); return
+            if self.path is None:
+                # over the threshold, whatever was buffered moves to the spool file first
+                if self.spool_dir: os.makedirs(self.spool_dir, exist_ok=True)
+                fd, self.path = tempfile.mkstemp(suffix='.spool', dir=self.spool_dir)
+                self._fp = os.fdopen(fd, 'wb'); self._fp.writelines(self._chunks); self._chunks = []
+            if self._fp is None: self._fp = open(self.path, 'ab')
+            self._fp.write(chunk)
+    '''seal'''
+    def seal(self):
+        # the body is complete, a spool file is closed so a search with many results does not hold one descriptor per result
+        with self._lock:
+            if self._fp is not None: self._fp.close(); self._fp = None
+    '''getvalue'''
+    def getvalue(self) -> bytes:
+        with self._lock:
+            if self.path is None: return b''.join(self._chunks)
+            if self._fp is not None: self._fp.flush()
+            with open(self.path, 'rb') as fp: return fp.read()
+    '''movetofile'''
+    def movetofile(self, dest_path: str):
+        # a spilled body is renamed into place (copied across devices), an in-memory one written once, either way the contents are consumed afterwards
+        with self._lock:
+            if self.path is not None:
+                if self._fp is not None: self._fp.close(); self._fp = None
+                replacefile(self.path, dest_path); self.path = None
+            else:
+                with open(dest_path, 'wb') as fp: fp.writelines(self._chunks)
+            self._chunks, self.size = [], 0
+    '''close'''
+    def close(self):
+        with self._lock:
+            if self._fp is not None: self._fp.close(); self._fp = None
+            if self.path is not None and os.path.exists(self.path): os.remove(self.path)
+            self.path, self._chunks, self.size = None, [], 0
+    '''__del__'''
+    def __del__(self):
+        try: self.close()
+        except Exception: pass
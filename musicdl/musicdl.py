@@ -8,17 +8,20 @@ WeChat Official Account (微信公众号):
 '''
 import sys
 import copy
+import queue
+import asyncio
 import click
 import json_repair
-from threading import Lock
+from itertools import chain
+from threading import Lock, Event
 from concurrent.futures import ThreadPoolExecutor
 from rich.progress import Progress, TextColumn, BarColumn, TimeRemainingColumn, MofNCompleteColumn
 if __name__ == '__main__':
     from __init__ import __version__
-    from modules import BuildMusicClient, LoggerHandle, MusicClientBuilder, smarttrunctable, colorize, printfullline, cursorpickintable
+    from modules import BuildMusicClient, BaseMusicClient, LoggerHandle, LinkStatusCache, SearchDeadline, TaskScheduler, PostProcessPool, SearchResults, MusicClientBuilder, smarttrunctable, colorize, printfullline, cursorpickintable
 else:
     from .__init__ import __version__
-    from .modules import BuildMusicClient, LoggerHandle, MusicClientBuilder, smarttrunctable, colorize, printfullline, cursorpickintable
+    from .modules import BuildMusicClient, BaseMusicClient, LoggerHandle, LinkStatusCache, SearchDeadline, TaskScheduler, PostProcessPool, SearchResults, MusicClientBuilder, smarttrunctable, colorize, printfullline, cursorpickintable
 
 
 '''settings'''
@@ -36,12 +39,14 @@ Instructions:
         Press Esc or q to cancel selection
 Music Files Save Path:
     %s (root dir is the current directory if using relative path).'''
+SEARCH_DEADLINE_GRACE_S = 0.5
 DEFAULT_MUSIC_SOURCES = ['MiguMusicClient', 'NeteaseMusicClient', 'QQMusicClient', 'KuwoMusicClient', 'QianqianMusicClient']
 
 
 '''MusicClient'''
 class MusicClient():
-    def __init__(self, music_sources: list = [], init_music_clients_cfg: dict = {}, clients_threadings: dict = {}, requests_overrides: dict = {}, search_rules: dict = {}):
+    def __init__(self, music_sources: list = [], init_music_clients_cfg: dict = {}, clients_threadings: dict = {}, requests_overrides: dict = {}, search_rules: dict = {}, search_budget_ms: float = None, speculative_resolve_top_k: int = 3,
+                 max_in_flight: int = None, progress_cfg: dict = None, postprocess_cfg: dict = None):
         # assert
         assert isinstance(music_sources, list) and isinstance(init_music_clients_cfg, dict) and isinstance(clients_threadings, dict) and \
                isinstance(requests_overrides, dict) and isinstance(search_rules, dict)
@@ -50,12 +55,21 @@ class MusicClient():
         # set attributes
         self.work_dirs = {}
         self.search_rules = search_rules
+        self.search_budget_ms = search_budget_ms
+        self.speculative_resolve_top_k = speculative_resolve_top_k
+        self.progress_cfg = progress_cfg
         self.clients_threadings = clients_threadings
         self.requests_overrides = requests_overrides
         self.music_sources = music_sources if music_sources else DEFAULT_MUSIC_SOURCES
         self.music_sources = list(set(self.music_sources))
         # init
         self.logger_handle, self.music_clients = LoggerHandle(), dict()
+        self.link_status_cache = LinkStatusCache()
+        # one bounded scheduler for every source: max_in_flight caps the tasks in flight overall, clients_threadings becomes the quota of each source
+        self.scheduler = TaskScheduler(max_workers=max_in_flight, thread_name_prefix='musicdl')
+        # one post-processing pool (tech info, tags, library) behind the downloads of every source, instead of max_workers threads per source
+        postprocess_cfg = {'max_workers': 4, 'max_queue_size': 64, **(postprocess_cfg or {})}
+        self.postprocess_pool = PostProcessPool(max_workers=postprocess_cfg['max_workers'], max_queue_size=postprocess_cfg['max_queue_size'], thread_name_prefix='musicdl.postprocess')
         for music_source in self.music_sources:
             if music_source not in MusicClientBuilder.REGISTERED_MODULES.keys(): continue
             init_music_client_cfg = {
@@ -63,12 +77,15 @@ class MusicClient():
                 'disable_print': True, 'work_dir': 'musicdl_outputs', 'default_search_cookies': {}, 'default_download_cookies': {}, 'default_parse_cookies': {}, 'type': music_source,
                 'search_size_per_page': 10, 'strict_limit_search_size_per_page': True, 'quark_parser_config': {}, 'freeproxy_settings': None, 'enable_download_curl_cffi': False,
                 'enable_parse_curl_cffi': False, 'enable_search_curl_cffi': False,
+                # objects this MusicClient owns and shares with every source, all other options keep the defaults of BaseMusicClient
+                'link_status_cache': self.link_status_cache, 'scheduler': self.scheduler, 'postprocess_pool': self.postprocess_pool, 'progress_cfg': progress_cfg,
             }
             if music_source in {'GDStudioMusicClient', 'XimalayaMusicClient', 'LizhiMusicClient', 'QingtingMusicClient'}: init_music_client_cfg['search_size_per_source'] = 3
             init_music_client_cfg.update(init_music_clients_cfg.get(music_source, {}))
             self.music_clients[music_source] = BuildMusicClient(module_cfg=init_music_client_cfg)
             self.work_dirs[music_source] = init_music_client_cfg['work_dir']
             if music_source not in self.clients_threadings: self.clients_threadings[music_source] = 5 if music_source not in {'GDStudioMusicClient'} else 10
+            self.scheduler.setquota(music_source, self.clients_threadings[music_source])
             if music_source not in self.requests_overrides: self.requests_overrides[music_source] = {}
             if music_source not in self.search_rules: self.search_rules[music_source] = {}
     '''printbasicinfo'''
@@ -90,6 +107,8 @@ class MusicClient():
                     search_result['duration'], search_result['album'], colorize('|'.join([s.upper() for s in [search_result['source'].removesuffix('MusicClient'), search_result['root_source']] if s]), 'highlight'),
                 ])
         print(smarttrunctable(headers=print_titles, rows=print_items, no_trunc_cols=[0, 1, 3, 4, 6]))
+        # rows of a lazy search are shown right away, the top ones start resolving in the background while the user is picking
+        self.speculativeresolve(list(song_infos.values())[:self.speculative_resolve_top_k])
         picked_ids = cursorpickintable(print_titles, print_items, row_ids, no_trunc_cols=[0, 1, 3, 4, 6])
         id2row = dict(zip(row_ids, print_items))
         selected_rows = [id2row[i] for i in picked_ids if i in id2row]
@@ -108,31 +127,121 @@ class MusicClient():
                 if song_info.episodes: final_selected_song_infos.extend(self.printandselectsearchresults({song_info.source: song_info.episodes}))
                 else: final_selected_song_infos.append(song_info)
             self.download(final_selected_song_infos)
-    '''search'''
-    def search(self, keyword):
+    '''_itersearchpages'''
+    def _itersearchpages(self, keyword, budget_ms: float = None, metadata: dict = None):
         self.logger_handle.info(f'Searching {colorize(keyword, "highlight")} From {colorize("|".join(self.music_sources), "highlight")}')
-        max_workers, main_progress_lock = min(len(self.music_sources), 10), Lock()
+        # one lightweight coordinator per source builds its search urls and waits for its pages, the page work itself runs on the shared scheduler
+        max_workers, main_progress_lock, pages, stop_event = max(1, len(self.music_sources)), Lock(), queue.Queue(), Event()
+        # one deadline for the whole query, every source and page spends from the same budget
+        deadline = SearchDeadline.frombudgetms(self.search_budget_ms if budget_ms is None else budget_ms)
+        metadata = metadata if metadata is not None else {}
+        for ms in self.music_sources: metadata[ms] = {'timed_out': False}
         with Progress(TextColumn("{task.description}"), BarColumn(bar_width=None), MofNCompleteColumn(), TimeRemainingColumn(), refresh_per_second=10) as main_process_context:
             main_progress_id = main_process_context.add_task(f"ALL sources >>> completed (0/0)", total=0)
             def _search(ms):
                 try:
-                    return ms, self.music_clients[ms].search(
-                        keyword=keyword, num_threadings=self.clients_threadings[ms], request_overrides=self.requests_overrides[ms], rule=self.search_rules[ms], 
-                        main_process_context=main_process_context, main_progress_id=main_progress_id, main_progress_lock=main_progress_lock,
+                    page_iterator = self.music_clients[ms]._itersearchpages(
+                        keyword=keyword, num_threadings=self.clients_threadings[ms], request_overrides=self.requests_overrides[ms], rule=self.search_rules[ms],
+                        main_process_context=main_process_context, main_progress_id=main_progress_id, main_progress_lock=main_progress_lock, deadline=deadline, metadata=metadata[ms],
                     )
+                    for page_idx, batch in page_iterator:
+                        if stop_event.is_set(): page_iterator.close(); break
+                        pages.put((ms, page_idx, batch))
                 except Exception as err:
                     self.logger_handle.error(f'MusicClient.{ms}.search >>> {keyword} (Error: {err})')
+                finally:
+                    pages.put((ms, None, None))
+            ex = ThreadPoolExecutor(max_workers=max_workers)
+            try:
+                for ms in self.music_sources: ex.submit(_search, ms)
+                pending_sources = set(self.music_sources)
+                while pending_sources:
+                    # sources hand over their partial pages right at the deadline, a short grace period collects them
+                    try: ms, page_idx, batch = pages.get(timeout=(deadline.remaining(grace=SEARCH_DEADLINE_GRACE_S) if deadline is not None else None))
+                    except queue.Empty:
+                        deadline.cancel()
+                        for ms in pending_sources: metadata[ms]['timed_out'] = True
+                        self.logger_handle.warning(f'MusicClient.search >>> {keyword} (Warning: search budget exhausted, {"|".join(sorted(pending_sources))} did not finish in time)')
+                        break
+                    if page_idx is None: pending_sources.discard(ms); continue
+                    yield ms, page_idx, batch
+            finally:
+                # sources still in flight stop at their next page once the consumer is gone
+                stop_event.set(); ex.shutdown(wait=False, cancel_futures=True)
+    '''itersearch'''
+    def itersearch(self, keyword, budget_ms: float = None, metadata: dict = None):
+        # yields (source, list[SongInfo]) as soon as any search page of any source completes, metadata (if given) is filled with per source search stats
+        for ms, _, batch in self._itersearchpages(keyword, budget_ms=budget_ms, metadata=metadata): yield ms, batch
+    '''aitersearch'''
+    async def aitersearch(self, keyword, budget_ms: float = None, metadata: dict = None):
+        # asyncio counterpart of itersearch, the threaded page iterator is advanced off the event loop
+        page_iterator = self.itersearch(keyword, budget_ms=budget_ms, metadata=metadata)
+        try:
+            while (item := await asyncio.to_thread(next, page_iterator, None)) is not None: yield item
+        finally:
+            await asyncio.to_thread(page_iterator.close)
+    '''search'''
+    def search(self, keyword, budget_ms: float = None) -> SearchResults:
+        # collector over itersearch, results of each source keep the order of its search pages and SearchResults.metadata tells which sources timed out
+        pages, metadata = {ms: [] for ms in self.music_sources}, {}
+        for ms, page_idx, batch in self._itersearchpages(keyword, budget_ms=budget_ms, metadata=metadata): pages[ms].append((page_idx, batch))
+        return SearchResults({ms: list(chain.from_iterable(batch for _, batch in sorted(ms_pages, key=lambda page: page[0]))) for ms, ms_pages in pages.items()}, metadata=metadata)
+    '''asearch'''
+    async def asearch(self, keyword, budget_ms: float = None):
+        self.logger_handle.info(f'Searching {colorize(keyword, "highlight")} From {colorize("|".join(self.music_sources), "highlight")}')
+        # one deadline for the whole query, as in _itersearchpages, every source and page spends from the same budget
+        main_progress_lock, deadline = Lock(), SearchDeadline.frombudgetms(self.search_budget_ms if budget_ms is None else budget_ms)
+        with Progress(TextColumn("{task.description}"), BarColumn(bar_width=None), MofNCompleteColumn(), TimeRemainingColumn(), refresh_per_second=10) as main_process_context:
+            main_progress_id = main_process_context.add_task(f"ALL sources >>> completed (0/0)", total=0)
+            async def _asearch(ms):
+                try:
+                    return ms, await self.music_clients[ms].asearch(
+                        keyword=keyword, num_threadings=self.clients_threadings[ms], request_overrides=self.requests_overrides[ms], rule=self.search_rules[ms], 
+                        main_process_context=main_process_context, main_progress_id=main_progress_id, main_progress_lock=main_progress_lock, deadline=deadline,
+                    )
+                except Exception as err:
+                    self.logger_handle.error(f'MusicClient.{ms}.asearch >>> {keyword} (Error: {err})')
                     return ms, []
-            with ThreadPoolExecutor(max_workers=max_workers) as ex:
-                return dict(ex.map(_search, self.music_sources))
+            return dict(await asyncio.gather(*[_asearch(ms) for ms in self.music_sources]))
+    '''speculativeresolve'''
+    def speculativeresolve(self, song_infos: list[dict]):
+        classified_song_infos = {}
+        for song_info in song_infos:
+            if song_info['source'] in classified_song_infos: classified_song_infos[song_info['source']].append(song_info)
+            else: classified_song_infos[song_info['source']] = [song_info]
+        return list(chain.from_iterable(
+            self.music_clients[source].speculativeresolve(song_infos=source_song_infos, top_k=len(source_song_infos), request_overrides=self.requests_overrides[source]) for source, source_song_infos in classified_song_infos.items()
+        ))
+    '''resolve'''
+    def resolve(self, song_infos: list[dict]):
+        # fills in download urls of lazy search rows, download does it on its own so this is only needed to inspect picked items beforehand
+        classified_song_infos = {}
+        for song_info in song_infos:
+            if song_info['source'] in classified_song_infos: classified_song_infos[song_info['source']].append(song_info)
+            else: classified_song_infos[song_info['source']] = [song_info]
+        return list(chain.from_iterable(
+            self.music_clients[source].resolve(song_infos=source_song_infos, num_threadings=self.clients_threadings[source], request_overrides=self.requests_overrides[source]) for source, source_song_infos in classified_song_infos.items()
+        ))
     '''download'''
     def download(self, song_infos: list[dict]):
-        classified_song_infos = {}
+        classified_song_infos, downloaded_song_infos = {}, {}
         for song_info in song_infos:
             if song_info['source'] in classified_song_infos: classified_song_infos[song_info['source']].append(song_info)
             else: classified_song_infos[song_info['source']] = [song_info]
-        for source, source_song_infos in classified_song_infos.items():
-            self.music_clients[source].download(song_infos=source_song_infos, num_threadings=self.clients_threadings[source], request_overrides=self.requests_overrides[source])
+        if not classified_song_infos: return downloaded_song_infos
+        # all sources download at the same time into one progress view, each of them bounded by its clients_threadings quota of the shared scheduler
+        def _download(source):
+            try:
+                return self.music_clients[source].download(song_infos=classified_song_infos[source], num_threadings=self.clients_threadings[source], request_overrides=self.requests_overrides[source], progress=progress)
+            except Exception as err:
+                self.logger_handle.error(f'MusicClient.{source}.download (Error: {err})')
+                return []
+        with BaseMusicClient.downloadprogress(self.progress_cfg) as progress, ThreadPoolExecutor(max_workers=len(classified_song_infos)) as ex:
+            for source, future in [(source, ex.submit(_download, source)) for source in classified_song_infos]: downloaded_song_infos[source] = future.result()
+        return downloaded_song_infos
+    '''adownload'''
+    async def adownload(self, song_infos: list[dict]):
+        return await asyncio.to_thread(self.download, song_infos)
     '''parseplaylist'''
     def parseplaylist(self, playlist_url):
         song_infos = []
@@ -179,7 +288,10 @@ class MusicClient():
 @click.option(
     '-s', '--search-rules', '--search_rules', default=None, help='Search rules for each music client as a JSON string.', type=str, show_default=True,
 )
-def MusicClientCMD(keyword: str, playlist_url: str, music_sources: str, init_music_clients_cfg: str, requests_overrides: str, clients_threadings: str, search_rules: str):
+@click.option(
+    '-b', '--search-budget-ms', '--search_budget_ms', default=None, help='Overall time budget of a search in milliseconds, sources still running when it runs out return partial results.', type=float, show_default=True,
+)
+def MusicClientCMD(keyword: str, playlist_url: str, music_sources: str, init_music_clients_cfg: str, requests_overrides: str, clients_threadings: str, search_rules: str, search_budget_ms: float):
     # parse playlist url
     assert keyword is None or playlist_url is None, '"playlist_url" and "keyword" could be set simultaneously'
     # load json string
@@ -190,7 +302,7 @@ def MusicClientCMD(keyword: str, playlist_url: str, music_sources: str, init_mus
     search_rules = safe_load_func(search_rules)
     # instance music client
     music_sources = music_sources.replace(' ', '').split(',')
-    music_client = MusicClient(music_sources=music_sources, init_music_clients_cfg=init_music_clients_cfg, clients_threadings=clients_threadings, requests_overrides=requests_overrides, search_rules=search_rules)
+    music_client = MusicClient(music_sources=music_sources, init_music_clients_cfg=init_music_clients_cfg, clients_threadings=clients_threadings, requests_overrides=requests_overrides, search_rules=search_rules, search_budget_ms=search_budget_ms)
     # switch according to keyword and playlist_url
     if (keyword is None) and (playlist_url is None):
         music_client.startcmdui()
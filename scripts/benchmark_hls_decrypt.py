@@ -0,0 +1,118 @@
+'''
+Function:
+    Implementation of HLS Decryption Micro-Benchmark
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import os
+import re
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import http.server
+from functools import partial
+from musicdl.modules.utils.hls import HLSDownloader, HLSEngine, DecryptPlan
+from musicdl.modules.utils.progress import NullProgress
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+
+'''RangeRequestHandler'''
+class RangeRequestHandler(http.server.SimpleHTTPRequestHandler):
+    '''do_GET'''
+    def do_GET(self):
+        path = self.translate_path(self.path)
+        if not os.path.isfile(path): return self.send_error(404)
+        with open(path, 'rb') as fp: data = fp.read()
+        if (matched := re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range') or '')):
+            start = int(matched.group(1)); end = min(int(matched.group(2) or len(data) - 1), len(data) - 1); body = data[start: end + 1]
+            self.send_response(206); self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        else:
+            body = data; self.send_response(200)
+        self.send_header('Content-Length', str(len(body))); self.send_header('Accept-Ranges', 'bytes'); self.end_headers(); self.wfile.write(body)
+    '''log_message'''
+    def log_message(self, *args):
+        pass
+
+
+'''buildplaylists'''
+def buildplaylists(root: str, num_segments: int, segment_size: int) -> dict:
+    # one AES-128 playlist with a file per segment and one addressing a single continuously encrypted file through EXT-X-BYTERANGE
+    key, iv = os.urandom(16), bytes(range(16))
+    with open(os.path.join(root, 'k.key'), 'wb') as fp: fp.write(key)
+    encrypt = lambda data: (ctx := Cipher(algorithms.AES(key), modes.CBC(iv)).encryptor()).update(data + bytes((-len(data)) % 16)) + ctx.finalize()
+    header = ['#EXTM3U', '#EXT-X-VERSION:4', '#EXT-X-TARGETDURATION:2', '#EXT-X-KEY:METHOD=AES-128,URI="k.key",IV=0x000102030405060708090a0b0c0d0e0f']
+    segments = [os.urandom(segment_size) for _ in range(num_segments)]
+    lines = list(header)
+    for idx, segment in enumerate(segments):
+        with open(os.path.join(root, f'seg{idx}.ts'), 'wb') as fp: fp.write(encrypt(segment))
+        lines += ['#EXTINF:2,', f'seg{idx}.ts']
+    with open(os.path.join(root, 'segments.m3u8'), 'w') as fp: fp.write('\n'.join(lines + ['#EXT-X-ENDLIST']) + '\n')
+    with open(os.path.join(root, 'single.ts'), 'wb') as fp: fp.write(encrypt(b''.join(segments)))
+    lines = list(header)
+    for idx in range(num_segments): lines += ['#EXTINF:2,', f'#EXT-X-BYTERANGE:{segment_size}@{idx * segment_size}', 'single.ts']
+    with open(os.path.join(root, 'byterange.m3u8'), 'w') as fp: fp.write('\n'.join(lines + ['#EXT-X-ENDLIST']) + '\n')
+    return dict(key=key, iv=iv, ciphertexts=[encrypt(segment) for segment in segments])
+
+
+'''benchmarkdecrypt'''
+def benchmarkdecrypt(key: bytes, iv: bytes, ciphertexts: list, repeats: int) -> dict:
+    total_size, results, sink = sum(len(c) for c in ciphertexts) * repeats, {}, open(os.devnull, 'wb')
+    # baseline: a cipher object per segment, update + finalize concatenated, then the byterange cut as a sliced copy, written out like the other path
+    started_at = time.perf_counter()
+    for _ in range(repeats):
+        for ciphertext in ciphertexts:
+            ctx = Cipher(algorithms.AES(key), modes.CBC(iv)).decryptor(); plaintext = ctx.update(ciphertext) + ctx.finalize(); sink.write(plaintext[16:])
+    results['baseline'] = total_size / (time.perf_counter() - started_at) / 1e6
+    # HLSDownloader path: cached key object, update_into a per-thread buffer, the byterange cut as a view
+    downloader = HLSDownloader(output_dir=tempfile.gettempdir(), disable_print=True)
+    started_at = time.perf_counter()
+    for _ in range(repeats):
+        for ciphertext in ciphertexts: sink.write(downloader._decryptraw(ciphertext, DecryptPlan(mode='CBC', key=key, iv=iv, drop=16)))
+    results['update_into'] = total_size / (time.perf_counter() - started_at) / 1e6
+    sink.close()
+    return results
+
+
+'''benchmarkdownload'''
+def benchmarkdownload(base_url: str, output_dir: str, concurrency: int) -> dict:
+    # private pools of a standalone HLSDownloader, then the HLSEngine path the clients use (shared sessions, key cache and scheduler), one engine across all songs like a client
+    results, engine = {}, HLSEngine(concurrency=concurrency)
+    for name, coalesce_max_bytes, use_engine in [(f'{prefix}{name}', coalesce_max_bytes, prefix == 'engine_') for prefix in ('', 'engine_') for name, coalesce_max_bytes in [('segments', 0), ('byterange', 0), ('byterange_coalesced', 8 * 1024 * 1024)]]:
+        progress = NullProgress(); progress_id = progress.add_task(name)
+        downloader = HLSDownloader(output_dir=output_dir, disable_print=True, concurrency=concurrency, coalesce_max_bytes=coalesce_max_bytes, engine=engine if use_engine else None)
+        output_path = os.path.join(output_dir, f'{name}.ts'); started_at = time.perf_counter()
+        downloader.download(f"{base_url}/{name.removeprefix('engine_').split('_')[0]}.m3u8", output_path, progress=progress, progress_id=progress_id)
+        results[name] = os.path.getsize(output_path) / (time.perf_counter() - started_at) / 1e6
+    return results
+
+
+'''run'''
+def run(num_segments: int = 200, segment_size: int = 256 * 1024, repeats: int = 5, concurrency: int = 8):
+    root = tempfile.mkdtemp(prefix='musicdl_hls_bench_')
+    try:
+        playlist_root = os.path.join(root, 'www'); os.makedirs(playlist_root)
+        data = buildplaylists(playlist_root, num_segments, segment_size)
+        for name, mbps in benchmarkdecrypt(data['key'], data['iv'], data['ciphertexts'], repeats).items(): print(f'decrypt  {name:<28s} {mbps:10.1f} MB/s')
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), partial(RangeRequestHandler, directory=playlist_root)); server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            for name, mbps in benchmarkdownload(f'http://127.0.0.1:{server.server_address[1]}', os.path.join(root, 'out'), concurrency).items(): print(f'download {name:<28s} {mbps:10.1f} MB/s')
+        finally:
+            server.shutdown()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+'''main'''
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Micro-benchmark of the HLS decryption path over synthetic AES-128 playlists.')
+    parser.add_argument('--segments', type=int, default=200)
+    parser.add_argument('--segment-size', type=int, default=256 * 1024)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+    run(num_segments=args.segments, segment_size=args.segment_size, repeats=args.repeats, concurrency=args.concurrency)
@@ -0,0 +1,108 @@
+'''
+Function:
+    Implementation of Concurrency Regression Checks (TaskScheduler bursts, urgent work, HLSEngine segment fetches)
+Author:
+    Zhenchao Jin
+WeChat Official Account (微信公众号):
+    Charles的皮卡丘
+'''
+import os
+import sys
+import time
+import shutil
+import tempfile
+import threading
+import http.server
+from functools import partial
+from musicdl.modules.utils.scheduler import TaskScheduler
+from musicdl.modules.utils.hls import HLSDownloader, HLSEngine
+from musicdl.modules.utils.progress import NullProgress
+
+
+'''SlowRequestHandler'''
+class SlowRequestHandler(http.server.SimpleHTTPRequestHandler):
+    delay, lock, active, peak = 0.0, threading.Lock(), 0, 0
+    '''do_GET'''
+    def do_GET(self):
+        # segments are answered after delay seconds, the peak of requests in flight at once tells whether the client fetched them concurrently
+        cls = type(self)
+        with cls.lock: cls.active += 1; cls.peak = max(cls.peak, cls.active)
+        try:
+            if self.path.endswith('.ts'): time.sleep(cls.delay)
+            super().do_GET()
+        finally:
+            with cls.lock: cls.active -= 1
+    '''log_message'''
+    def log_message(self, *args):
+        pass
+
+
+'''checkschedulerburst'''
+def checkschedulerburst(num_tasks: int = 8, duration: float = 0.5):
+    # a burst of top-level submits must fan out to max_workers threads, serially it would take num_tasks * duration
+    for name, submit in [('direct', lambda s: (lambda fn, *args: s.submit('burst', fn, *args))), ('executor', lambda s: s.executor('burst').submit)]:
+        scheduler = TaskScheduler(max_workers=num_tasks, quotas={'burst': num_tasks})
+        started_at = time.perf_counter(); futures = [submit(scheduler)(time.sleep, duration) for _ in range(num_tasks)]
+        for future in futures: future.result()
+        elapsed, stats = time.perf_counter() - started_at, scheduler.stats()
+        print(f'scheduler burst ({name}): {elapsed:.2f}s, num_threads={stats["num_threads"]}, peak_in_flight={stats["peak_in_flight"]}')
+        assert elapsed < duration * 2, f'burst of {num_tasks} tasks ran serially ({elapsed:.2f}s)'
+        assert stats['peak_in_flight'] == num_tasks, stats
+
+
+'''checkschedulerurgent'''
+def checkschedulerurgent(max_workers: int = 2, duration: float = 0.2):
+    # urgent children of parents that hold every worker run on reserved threads in parallel, top-level work never exceeds max_workers
+    scheduler, lock, active, peak = TaskScheduler(max_workers=max_workers, reserved_workers=2), threading.Lock(), [0], [0]
+    def _parent():
+        with lock: active[0] += 1; peak[0] = max(peak[0], active[0])
+        started_at = time.perf_counter(); futures = [scheduler.submiturgent('urgent', time.sleep, duration) for _ in range(2)]
+        for future in futures: future.result()
+        with lock: active[0] -= 1
+        return time.perf_counter() - started_at
+    elapsed = max(future.result() for future in [scheduler.submit('urgent', _parent) for _ in range(max_workers)])
+    print(f'scheduler urgent: children {elapsed:.2f}s, peak top-level={peak[0]}, stats={scheduler.stats()}')
+    assert peak[0] <= max_workers, peak
+    assert scheduler.stats()['reserved'] > 0 and len(scheduler._threads) <= max_workers + 2, scheduler.stats()
+
+
+'''checkhlsengineoverlap'''
+def checkhlsengineoverlap(num_segments: int = 32, concurrency: int = 8, delay: float = 0.1):
+    # segments of one song fetched through the shared HLSEngine overlap up to its concurrency, serially it would take num_segments * delay
+    root = tempfile.mkdtemp(prefix='musicdl_check_hls_')
+    try:
+        www = os.path.join(root, 'www'); os.makedirs(www); lines = ['#EXTM3U', '#EXT-X-VERSION:3', '#EXT-X-TARGETDURATION:2']
+        for idx in range(num_segments):
+            with open(os.path.join(www, f'seg{idx}.ts'), 'wb') as fp: fp.write(os.urandom(1024))
+            lines += ['#EXTINF:2,', f'seg{idx}.ts']
+        with open(os.path.join(www, 'index.m3u8'), 'w') as fp: fp.write('\n'.join(lines + ['#EXT-X-ENDLIST']) + '\n')
+        SlowRequestHandler.delay, SlowRequestHandler.peak = delay, 0
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), partial(SlowRequestHandler, directory=www)); server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            engine = HLSEngine(concurrency=concurrency)
+            downloader = HLSDownloader(output_dir=os.path.join(root, 'out'), disable_print=True, concurrency=concurrency, engine=engine)
+            progress = NullProgress(); started_at = time.perf_counter()
+            downloader.download(f'http://127.0.0.1:{server.server_address[1]}/index.m3u8', os.path.join(root, 'out', 'song.ts'), progress=progress, progress_id=progress.add_task('song'))
+            elapsed = time.perf_counter() - started_at
+        finally:
+            server.shutdown()
+        print(f'hls engine: {num_segments} segments in {elapsed:.2f}s, peak requests in flight={SlowRequestHandler.peak}, scheduler={engine.stats()["scheduler"]}')
+        assert SlowRequestHandler.peak >= concurrency // 2, f'segment fetches did not overlap (peak {SlowRequestHandler.peak})'
+        assert elapsed < num_segments * delay / 2, f'segments were fetched serially ({elapsed:.2f}s)'
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+'''run'''
+def run():
+    checkschedulerburst()
+    checkschedulerurgent()
+    checkhlsengineoverlap()
+    print('all checks passed')
+
+
+'''main'''
+if __name__ == '__main__':
+    try: run()
+    except AssertionError as err: print(f'check failed: {err}'); sys.exit(1)